@@ -14,6 +14,9 @@ CHANGELOG:
 Sun Apr 10 13:02:16 2016 - 1.0.0 - alek - Issued the first draft version.
 """
 
+from plotTools import export # Before pyplot to select the backend.
+if export.cached('A',inputs=[__file__]): # Nothing changed since the last export.
+    raise SystemExit
 import matplotlib.pyplot, numpy
 matplotlib.pyplot.xkcd()
 
@@ -48,4 +51,4 @@ ax.annotate('Misalignments intentional', xy=(2, 1.2), xytext=(3, -1.5),
 
 matplotlib.pyplot.subplots_adjust(left=0.1, right=0.95, top=0.95, bottom=0.1)
 
-fig.show()
+export.show(fig,'A')
@@ -14,6 +14,9 @@ Created on Tue Apr  7 07:46:47 2015
 @author: Alek
 """
 
+from plotTools import export # Before pyplot to select the backend.
+if export.cached('Discovery',inputs=[__file__]): # Nothing changed since the last export.
+    raise SystemExit
 import matplotlib.pyplot, numpy
 matplotlib.pyplot.xkcd() # :D Maybe I should add this to all my plots.
 
@@ -51,4 +54,4 @@ ax.text(2, 140, "Will this ever end?", size=10, rotation='vertical', color='blue
 
 matplotlib.pyplot.subplots_adjust(left=0.1, right=0.95, top=0.8, bottom=0.0)
 
-fig.show()
+export.show(fig,'Discovery')
@@ -13,6 +13,9 @@ CHANGELOG:
 Sun Feb 14 13:02:16 2016 - 1.0.0 - alek - Issued the first draft version.
 """
 
+from plotTools import export # Before pyplot to select the backend.
+if export.cached('loveIsInTheMath',inputs=[__file__]): # Nothing changed since the last export.
+    raise SystemExit
 import matplotlib.pyplot, numpy
 matplotlib.pyplot.xkcd()
 
@@ -46,4 +49,4 @@ ax.text(-8, 0, "And you've got them all", size=20, rotation='horizontal', color=
 
 matplotlib.pyplot.subplots_adjust(left=0.1, right=0.95, top=0.95, bottom=0.1)
 
-fig.show()
+export.show(fig,'loveIsInTheMath')
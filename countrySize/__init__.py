@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Compare the true sizes of countries by overlaying them on maps of other regions.
+
+Use :class:`CountryOverlay` from Python or render many countries in one
+process from the command line::
+
+    python -m countrySize JPN ARG BRA --region Europe
+
+or measure them without drawing anything, see :mod:`countrySize.geodesy`::
+
+    python -m countrySize JPN ARG BRA --sizes sizes.csv
+
+The shape data were aquired from [Global Administrative Areas](http://www.gadm.org/country)
+website. Thus, their **redistribution, or commercial use is not allowed without
+prior permission**.
+
+@author: Alek
+"""
+from .plotting import plotPrefecture, plotPrefectures
+from .overlay import (CountryOverlay, COUNTRIES, REGIONS, BORDERS_DIR, loadLevel,
+                      levelFile, levelIndex, inputFiles, drawMap, FIGURES,
+                      plotComparison)
+from .geodesy import measure, measureLayer, sizeTable, MEASURES
+from .mapCache import getMap, clearMaps
+from .projection import MapProjection, loadDataset, datasetFile, findDataset
+from .shapeCache import loadLayer, buildLayer, CachedLayer, CachedShape
+from .simplify import vertexImportance, mapTolerance, simplifyMask
+from .spatialIndex import RegionIndex
+from .transforms import (transformCoords, rotationMatrix, rotationMatrices, rotateCoords,
+                         splitParts, relocationMatrix, relocateCoords, relocateShapes)
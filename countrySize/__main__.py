@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Render the size comparison figures of any number of countries in one process,
+so the shapefiles and maps shared between them are only loaded once.
+
+Run `python -m countrySize --help` for the usage.
+
+@author: Alek
+"""
+import argparse, os, csv, matplotlib, matplotlib.pyplot
+from plotTools import FigureSpec, renderFigures, export
+from .overlay import (CountryOverlay, COUNTRIES, REGIONS, BORDERS_DIR, FIGURES,
+                      plotComparison, inputFiles, levelFile)
+from .geodesy import sizeTable
+from .plotting import ticksFontSize
+
+def main(argv=None):
+    """ Parse the command line arguments in `argv` and plot the countries. """
+    parser=argparse.ArgumentParser(prog='python -m countrySize',
+        description='Overlay countries on a region to compare their sizes.')
+    parser.add_argument('countries',nargs='+',choices=sorted(COUNTRIES),
+                        help='codes of the countries to overlay')
+    parser.add_argument('--region',default='Europe',choices=sorted(REGIONS),
+                        help='region over which to overlay the countries')
+    parser.add_argument('--offset',nargs=2,type=float,metavar=('LAT','LON'),
+                        help='deg, offset of the countries, defaults to the '
+                             'offset of every country')
+    parser.add_argument('--great-circle',action='store_true',
+                        help='move the countries along great circles, which '
+                             'keeps their true size')
+    parser.add_argument('--borders',default=BORDERS_DIR,
+                        help='directory with the GADM shapefiles')
+    parser.add_argument('--output',metavar='DIR',
+                        help='save the figures in this directory instead of '
+                             'showing them, defaults to XKCD_OUTPUT_DIR if '
+                             'XKCD_EXPORT is set, see plotTools.export')
+    parser.add_argument('--format',nargs='+',choices=export.SUPPORTED_FORMATS,
+                        default=export.FORMATS or ['png'],
+                        help='formats to save the figures in')
+    parser.add_argument('--dpi',type=float,default=export.DPI,
+                        help='resolution of the saved figures')
+    parser.add_argument('--sizes',metavar='FILE',
+                        help='write the areas, perimeters, extents and centroids '
+                             'of the countries to this CSV file instead of '
+                             'plotting them')
+    parser.add_argument('--processes',type=int,default=None,
+                        help='number of processes rendering the figures to '
+                             '--output, defaults to the number of CPUs')
+    args=parser.parse_args(argv)
+    overlayKwargs=dict(region=args.region,offset=args.offset,
+                       greatCircle=args.great_circle,bordersDir=args.borders)
+    rc={'xtick.labelsize':ticksFontSize,'ytick.labelsize':ticksFontSize}
+
+    if args.sizes is not None:
+        table=sizeTable([levelFile(countryCode,0,args.borders)
+                         for countryCode in args.countries])
+        with open(args.sizes,'w',newline='') as sizesFile:
+            writer=csv.writer(sizesFile)
+            writer.writerow(table.dtype.names)
+            writer.writerows(table.tolist())
+        return
+
+    if args.output is None and export.EXPORTING:
+        args.output=export.OUTPUT_DIR
+    if args.output is not None:
+        matplotlib.use('Agg') # Don't need a GUI to save the figures.
+        # Every figure is independent, so render them all in parallel. The
+        # workers memory-map the same shapefile caches, so the geometry is
+        # shared by the OS rather than pickled.
+        os.makedirs(args.output,exist_ok=True)
+        specs=[FigureSpec(plotComparison,dict(countryCode=countryCode,
+                                              figure=figure,**overlayKwargs),
+                          export.fileNames('{}_{}'.format(countryCode,figure),
+                                           args.format,args.output),
+                          inputFiles(countryCode,args.borders))
+               for countryCode in args.countries for figure in FIGURES]
+        for fNames in renderFigures(specs,processes=args.processes,dpi=args.dpi,
+                                    rc=rc):
+            print('\n'.join(fNames))
+        return
+
+    matplotlib.pyplot.xkcd() # Here we go.
+    matplotlib.rcParams.update(rc)
+    for countryCode in args.countries:
+        CountryOverlay(countryCode,**overlayKwargs).plotAll()
+    matplotlib.pyplot.show()
+
+if __name__=='__main__':
+    main()
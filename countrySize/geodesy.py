@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Measure the true sizes of shapes on the Earth, without drawing them.
+
+Every quantity is computed for all the edges of all the parts of a layer at
+once on the flat coordinate arrays of :mod:`countrySize.shapeCache`, and then
+summed per part or per shape with :func:`numpy.add.reduceat`. This gives, for
+every shape:
+
+* area - the WGS84 ellipsoid is mapped onto the sphere with the same area
+  using the authalic latitude, where every edge contributes its exact
+  spherical excess,
+* perimeter - great circle length of all the rings,
+* north-south extent - meridian arc between the southernmost and the
+  northernmost point,
+* east-west extent - arc of the parallel through the centroid between the
+  westernmost and the easternmost point,
+* centroid - centre of mass of the surface on the sphere.
+
+Rings are oriented like in shapefiles, i.e. outer rings clockwise and holes
+anticlockwise, so the holes are subtracted. Lengths are in km, areas in km^2.
+
+@author: Alek
+"""
+import numpy, os
+from .shapeCache import loadLayer
+
+EARTH_RADIUS=6371.0088 # km, mean radius, used for the lengths on the sphere.
+WGS84_A=6378.137 # km, semi-major axis of the WGS84 ellipsoid.
+WGS84_F=1/298.257223563 # Flattening of the WGS84 ellipsoid.
+
+_E2=WGS84_F*(2-WGS84_F) # Eccentricity squared.
+_E=numpy.sqrt(_E2)
+
+# Measurements of every shape or part, see measure().
+MEASURES=('area','perimeter','northSouth','eastWest','lat','lon')
+
+def _q(sinLat):
+    """ Authalic `q` of the sines of geodetic latitudes. """
+    eSin=_E*sinLat
+    return (1-_E2)*(sinLat/(1-eSin*eSin)-numpy.log((1-eSin)/(1+eSin))/(2*_E))
+
+AUTHALIC_RADIUS=WGS84_A*numpy.sqrt(_q(1.)/2) # km, sphere with the area of WGS84.
+
+def authalicLatitude(lat):
+    """ Authalic latitudes in rad of geodetic latitudes `lat` in rad, i.e. the
+    latitudes on a sphere of :data:`AUTHALIC_RADIUS` with the same area south
+    of them as on the ellipsoid. """
+    return numpy.arcsin(numpy.clip(_q(numpy.sin(lat))/_q(1.),-1,1))
+
+def meridianDistance(lat):
+    """ Distance in km along the WGS84 meridian from the equator to geodetic
+    latitudes `lat` in rad. """
+    e4,e6=_E2*_E2,_E2*_E2*_E2
+    return WGS84_A*((1-_E2/4-3*e4/64-5*e6/256)*lat
+                    -(3*_E2/8+3*e4/32+45*e6/1024)*numpy.sin(2*lat)
+                    +(15*e4/256+45*e6/1024)*numpy.sin(4*lat)
+                    -35*e6/3072*numpy.sin(6*lat))
+
+def parallelRadius(lat):
+    """ Radius in km of the WGS84 parallels at geodetic latitudes `lat` in rad. """
+    sinLat=numpy.sin(lat)
+    return WGS84_A*numpy.cos(lat)/numpy.sqrt(1-_E2*sinLat*sinLat)
+
+def _wrap(angle):
+    """ `angle` in rad wrapped to [-pi,pi). """
+    return (angle+numpy.pi)%(2*numpy.pi)-numpy.pi
+
+def _reduce(ufunc,values,starts,empty=0.):
+    """ `ufunc` reduced over the ranges of `values` between (K+1,) `starts`,
+    `empty` for the empty ranges. """
+    out=numpy.full((starts.size-1,)+values.shape[1:],empty,dtype=float)
+    full=numpy.flatnonzero(starts[1:]>starts[:-1])
+    if full.size:
+        out[full]=ufunc.reduceat(values,starts[full],axis=0)
+    return out
+
+def measure(coords,partStarts,shapeStarts=None,ellipsoid=True):
+    """ Areas, perimeters, extents and centroids of shapes.
+
+    Args
+    -------
+    * coords - (N,2) lon/lat in deg of all the points,
+    * partStarts - (P+1,) index in `coords` where every part starts, the last
+      point of every part is joined to the first one,
+    * shapeStarts - (S+1,) index in `partStarts` where every shape starts, None
+      to measure every part on its own,
+    * ellipsoid (bool): whether to use the WGS84 ellipsoid for the areas and
+      extents, or a sphere of :data:`EARTH_RADIUS`.
+
+    Returns
+    -------
+    (S,) structured numpy.ndarray with float64 fields :data:`MEASURES`: area
+    in km^2, perimeter and extents in km, centroid lat and lon in deg. Empty
+    shapes have zero area and NaN centroids.
+    """
+    coords=numpy.asarray(coords,dtype=float)
+    partStarts=numpy.asarray(partStarts,dtype=numpy.int64)
+    shapeStarts=numpy.arange(partStarts.size) if shapeStarts is None else \
+                numpy.asarray(shapeStarts,dtype=numpy.int64)
+    starts=partStarts[shapeStarts] # Point ranges of the shapes.
+    lon,lat=numpy.radians(coords[:,0]),numpy.radians(coords[:,1])
+
+    # Edge from every point to the next one in its part.
+    nxt=numpy.arange(1,lat.size+1)
+    lengths=numpy.diff(partStarts)
+    full=lengths>0
+    nxt[partStarts[1:][full]-1]=partStarts[:-1][full]
+    dLon=_wrap(lon[nxt]-lon)
+
+    # Signed area, anticlockwise positive, from the spherical excess of every edge.
+    beta=authalicLatitude(lat) if ellipsoid else lat
+    radius=AUTHALIC_RADIUS if ellipsoid else EARTH_RADIUS
+    t1,t2=numpy.tan(beta/2),numpy.tan(beta[nxt]/2)
+    excess=-2*numpy.arctan2(numpy.tan(dLon/2)*(t1+t2),1+t1*t2)
+    # That's the area between the rings and the equator, which differs from the
+    # enclosed one by a hemisphere for every turn of a ring around a pole. Of
+    # the two regions bounded by a ring, the smaller one is measured.
+    turns=numpy.round(_reduce(numpy.add,dLon,starts)/(2*numpy.pi))
+    signedArea=_wrap((_reduce(numpy.add,excess,starts)+2*numpy.pi*turns)/2)*2*radius**2
+
+    # Great circle lengths and the integral of the position over the surface.
+    cosLat=numpy.cos(lat)
+    vectors=numpy.column_stack((cosLat*numpy.cos(lon),cosLat*numpy.sin(lon),numpy.sin(lat)))
+    cross=numpy.cross(vectors,vectors[nxt])
+    sinArc=numpy.linalg.norm(cross,axis=1)
+    arc=numpy.arctan2(sinArc,numpy.einsum('ij,ij->i',vectors,vectors[nxt]))
+    normals=numpy.divide(cross*arc[:,None],sinArc[:,None],out=numpy.zeros_like(cross),
+                         where=sinArc[:,None]>0)
+    moment=_reduce(numpy.add,normals,starts)*numpy.sign(signedArea)[:,None]
+
+    out=numpy.zeros(shapeStarts.size-1,dtype=[(name,numpy.float64) for name in MEASURES])
+    out['area']=numpy.abs(signedArea)
+    out['perimeter']=_reduce(numpy.add,arc,starts)*EARTH_RADIUS
+    with numpy.errstate(invalid='ignore'):
+        centre=moment/numpy.linalg.norm(moment,axis=1)[:,None]
+    latC=numpy.arcsin(numpy.clip(centre[:,2],-1,1))
+    lonC=numpy.arctan2(centre[:,1],centre[:,0])
+    out['lat'],out['lon']=numpy.degrees(latC),numpy.degrees(lonC)
+
+    latMin=_reduce(numpy.minimum,lat,starts,numpy.nan)
+    latMax=_reduce(numpy.maximum,lat,starts,numpy.nan)
+    # Longitudes relative to the centroid, so shapes across the antimeridian work.
+    sizes=numpy.diff(starts)
+    relLon=_wrap(lon-numpy.repeat(numpy.nan_to_num(lonC),sizes))
+    lonSpan=_reduce(numpy.maximum,relLon,starts,numpy.nan)-_reduce(numpy.minimum,relLon,
+                                                                    starts,numpy.nan)
+    if ellipsoid:
+        out['northSouth']=meridianDistance(latMax)-meridianDistance(latMin)
+        out['eastWest']=parallelRadius(latC)*lonSpan
+    else:
+        out['northSouth']=(latMax-latMin)*EARTH_RADIUS
+        out['eastWest']=numpy.cos(latC)*lonSpan*EARTH_RADIUS
+    return out
+
+def measureLayer(layer,parts=False,ellipsoid=True):
+    """ :func:`measure` every shape, or every part, of a
+    :class:`countrySize.shapeCache.CachedLayer`. """
+    return measure(layer.coords,layer.partStarts,None if parts else layer.shapeStarts,
+                   ellipsoid)
+
+def sizeTable(fNames,ellipsoid=True):
+    """ Measure all the shapes of many shapefiles, e.g. adm0 of every country.
+
+    Args
+    -------
+    * fNames (list of str): shapefiles without the extension, see
+      :func:`countrySize.shapeCache.loadLayer`,
+    * ellipsoid (bool): see :func:`measure`.
+
+    Returns
+    -------
+    Structured numpy.ndarray with one row per shape, with the 'file' name, the
+    index of the 'shape' in it and the :data:`MEASURES`, sorted by decreasing
+    area.
+    """
+    names=[os.path.basename(fName) for fName in fNames]
+    dtype=[('file','U{}'.format(max([len(name) for name in names]+[1]))),
+           ('shape',numpy.int64)]+[(name,numpy.float64) for name in MEASURES]
+    tables=[numpy.zeros(0,dtype=dtype)]
+    for fName,name in zip(fNames,names):
+        sizes=measureLayer(loadLayer(fName),ellipsoid=ellipsoid)
+        table=numpy.zeros(sizes.size,dtype=dtype)
+        table['file']=name
+        table['shape']=numpy.arange(sizes.size)
+        for measurement in MEASURES:
+            table[measurement]=sizes[measurement]
+        tables.append(table)
+    table=numpy.concatenate(tables)
+    return table[numpy.argsort(-table['area'],kind='stable')]
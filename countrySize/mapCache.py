@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Keyed cache of :class:`countrySize.projection.MapProjection` instances.
+
+Maps are kept in memory for the lifetime of the process, so every map projects
+the coastlines and country borders only once, however many figures it's used
+in. The coastline shapefiles themselves are memory-mapped from the cache of
+:mod:`countrySize.shapeCache`.
+
+@author: Alek
+"""
+from .projection import MapProjection
+
+_MAPS={} # Maps constructed so far.
+
+def mapKey(**kwargs):
+    """ Get the key of a map constructed with `kwargs`, e.g. projection and
+    resolution, used to identify it in the cache. """
+    return tuple(sorted(kwargs.items()))
+
+def getMap(**kwargs):
+    """ Get a :class:`countrySize.projection.MapProjection` with the given `kwargs`.
+
+    Maps are constructed once per process and reused, so they are not bound to
+    any axes - always pass `ax` to their drawing methods.
+    """
+    key=mapKey(**kwargs)
+    if not key in _MAPS:
+        _MAPS[key]=MapProjection(**kwargs)
+    return _MAPS[key]
+
+def clearMaps():
+    """ Forget the maps cached in memory. """
+    _MAPS.clear()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Make the coarse Natural Earth line datasets shipped with :mod:`countrySize`.
+
+The maps draw the coastlines and the land borders of the countries, see
+:data:`countrySize.projection.DATASETS`. The 1:110m ones in this directory are
+derived from the public domain
+[Natural Earth](https://www.naturalearthdata.com) admin 0 countries, e.g.
+`naturalearth_lowres.shp` distributed with geopandas<1.0, whose shared borders
+have exactly the same vertices on both sides:
+
+* edges of one country only are the coastlines,
+* edges of two countries are the land borders, kept once.
+
+Edges along the antimeridian and the South Pole, where the polygons are cut,
+are dropped. To make the files again::
+
+    python makeDatasets.py path/to/naturalearth_lowres.shp
+
+The finer datasets, e.g. ne_50m_coastline for resolution 'l', are downloaded
+from the Natural Earth website into `borders/naturalEarth`, see
+:data:`countrySize.overlay.NATURAL_EARTH_DIR`.
+
+@author: Alek
+"""
+import numpy, shapefile, os, sys
+
+def _isCut(p,q):
+    """ Whether the edges between (E,2) `p` and `q` lie on the antimeridian or
+    at the South Pole, where the polygons are cut. """
+    return ((numpy.abs(p[:,0])==180) & (p[:,0]==q[:,0])) | ((p[:,1]<=-89.99) & (q[:,1]<=-89.99))
+
+def splitCountries(fName):
+    """ Coastlines and land borders of the countries in shapefile `fName`.
+
+    Returns
+    -------
+    2-tuple of lists of (M,2) lon/lat polylines, the coastlines and the borders.
+    """
+    shapeRdr=shapefile.Reader(fName)
+    rings=[]
+    for shp in shapeRdr.shapes():
+        points=numpy.asarray(shp.points,dtype=float)
+        rings+=numpy.split(points,shp.parts[1:])
+    shapeRdr.close()
+
+    starts=numpy.concatenate([ring[:-1] for ring in rings])
+    ends=numpy.concatenate([ring[1:] for ring in rings])
+    ringIds=numpy.repeat(numpy.arange(len(rings)),[len(ring)-1 for ring in rings])
+    # The same undirected edge in every ring that has it, lowest end first.
+    swap=(starts[:,0]>ends[:,0]) | ((starts[:,0]==ends[:,0]) & (starts[:,1]>ends[:,1]))
+    keys=numpy.where(swap[:,None],numpy.hstack([ends,starts]),numpy.hstack([starts,ends]))
+    _,first,inverse,counts=numpy.unique(keys,axis=0,return_index=True,return_inverse=True,
+                                        return_counts=True)
+    inverse=inverse.reshape(-1)
+    coast=counts[inverse]==1
+    border=(counts[inverse]>1) & (first[inverse]==numpy.arange(inverse.size)) # Once.
+    cut=_isCut(starts,ends) & _isCut(ends,starts)
+    return [_chains(starts,ends,ringIds,keep & ~cut) for keep in (coast,border)]
+
+def _chains(starts,ends,ringIds,keep):
+    """ Polylines of consecutive kept edges of the same ring. """
+    idx=numpy.flatnonzero(keep)
+    if not idx.size:
+        return []
+    joined=(idx[1:]==idx[:-1]+1) & (ringIds[idx[1:]]==ringIds[idx[:-1]])
+    breaks=numpy.flatnonzero(~joined)+1
+    return [numpy.vstack([starts[run],ends[run[-1:]]]) for run in numpy.split(idx,breaks)]
+
+def writeLines(fName,lines):
+    """ Save polylines `lines` to shapefile `fName` with one shape per line. """
+    with shapefile.Writer(fName,shapeType=shapefile.POLYLINE) as shapeWtr:
+        shapeWtr.field('featurecla','C',size=20)
+        for line in lines:
+            shapeWtr.line([numpy.round(line,6).tolist()])
+            shapeWtr.record('Line')
+
+if __name__=='__main__':
+    outDir=os.path.dirname(os.path.abspath(__file__))
+    coastlines,borders=splitCountries(sys.argv[1])
+    writeLines(os.path.join(outDir,'ne_110m_coastline'),coastlines)
+    writeLines(os.path.join(outDir,'ne_110m_admin_0_boundary_lines_land'),borders)
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""
+Overlay the shape of a country on a map of another region, e.g. Japan over
+Europe, to see how big it really is. This used to be done by the copy-pasted
+JapanSize.py, ArgentinaSize.py and BrazilSize.py scripts.
+
+Shapefiles and :class:`countrySize.projection.MapProjection` instances are
+loaded once per process and shared between all the :class:`CountryOverlay`
+instances, so comparing many countries costs one load of each file and map,
+see :mod:`countrySize.mapCache`.
+
+The shape data were aquired from [Global Administrative Areas](http://www.gadm.org/country)
+website. Thus, their **redistribution, or commercial use is not allowed without
+prior permission**.
+
+@author: Alek
+"""
+import numpy, shapefile, os, matplotlib.pyplot, matplotlib.cm, matplotlib.colors
+from .plotting import plotPrefecture, plotPrefectures, titleFontSize
+from .shapeCache import loadLayer
+from .mapCache import getMap
+from .projection import DATASETS, BUNDLED_DIR, datasetFile
+from .transforms import relocationMatrix
+from .spatialIndex import RegionIndex
+
+BORDERS_DIR='borders' # Where the GADM shapefiles are.
+NATURAL_EARTH_DIR='naturalEarth' # Finer coastlines in BORDERS_DIR, see countrySize.projection.
+
+# Shapefile locations and plotting settings for every country. Lat/lon in deg.
+# * shpDir, shpName - directory in BORDERS_DIR and file name with a placeholder
+#   for the admin level,
+# * nameField - index of the country name in the adm0 records,
+# * lat,lon - where to centre the map of this country,
+# * offset - by how much to offset the lat and lon of the country to overlay
+#   it on the region,
+# * flipUpsideDown - whether to flip the country to the other hemisphere,
+# * prefectureField,prefectureType - only plot adm1 shapes with this type
+#   in this field of the records, None to plot them all,
+# * annotation - label, lon and lat of the point and of the text to annotate
+#   on the true latitude map or None,
+# * regionWindows - Mercator map corners of the REGIONS to use for this country
+#   instead of the default ones, keyed by the region.
+COUNTRIES={
+    'JPN':dict(shpDir='gadm28_JPN_shp',shpName='JPN_adm{}',nameField=4,
+               lat=37,lon=138,offset=(50-37,10-138),colour='gold',
+               flipUpsideDown=False,prefectureField=9,prefectureType='Prefecture',
+               annotation=('Here',130.834730,33.8924837,110.834730,45.8924837),
+               regionWindows={}),
+    'ARG':dict(shpDir='gadm41_ARG_shp',shpName='gadm41_ARG_{}',nameField=1,
+               lat=-40,lon=-67,offset=(0,20+67),colour='deepskyblue',
+               flipUpsideDown=True,prefectureField=None,prefectureType=None,
+               annotation=('Ushuaia',-68.280358,-54.813148,-70.280358,-58.813148),
+               regionWindows={'Europe':dict(llcrnrlat=20)}),
+    'BRA':dict(shpDir='gadm41_BRA_shp',shpName='gadm41_BRA_{}',nameField=1,
+               lat=-13,lon=-50,offset=(40,10+50),colour='limegreen',
+               flipUpsideDown=True,prefectureField=None,prefectureType=None,
+               annotation=None,regionWindows={'Europe':dict(llcrnrlat=20)}),
+    }
+
+# Regions over which to overlay the countries. Lat/lon in deg.
+# * lat,lon - where to centre the orthographic map of the region,
+# * llcrnrlat,urcrnrlat,llcrnrlon,urcrnrlon - Mercator map corners.
+REGIONS={
+    'Europe':dict(lat=40,lon=10,llcrnrlat=30,urcrnrlat=75,llcrnrlon=-25,
+                  urcrnrlon=40),
+    }
+
+_LEVELS={} # Shapes and records of every admin level read so far.
+_INDICES={} # Spatial indices of every admin level built so far.
+
+def levelFile(countryCode,level,bordersDir=BORDERS_DIR):
+    """ Shapefile name, without the extension, of one admin level of a country. """
+    country=COUNTRIES[countryCode]
+    return os.path.join(bordersDir,country['shpDir'],country['shpName'].format(level))
+
+def loadLevel(countryCode,level,bordersDir=BORDERS_DIR):
+    """ Read shapes and records of one admin level of a country.
+
+    Every file is read only once per process, subsequent calls return the
+    same lists. The shapes and records are memory-mapped from the cache in
+    :mod:`countrySize.shapeCache`.
+
+    Args
+    -------
+    * countryCode (str): key in :data:`COUNTRIES`,
+    * level (int): admin level, 0 for the country, 1 for prefectures etc.,
+    * bordersDir (str): directory with the GADM shapefiles.
+
+    Returns
+    -------
+    2-tuple with a list of :class:`countrySize.shapeCache.CachedShape` and a
+    structured array of records, see :class:`countrySize.shapeCache.CachedLayer`.
+    """
+    fName=levelFile(countryCode,level,bordersDir)
+    if not fName in _LEVELS:
+        layer=loadLayer(fName)
+        _LEVELS[fName]=(layer.shapes(),layer.records())
+    return _LEVELS[fName]
+
+def levelIndex(countryCode,level,bordersDir=BORDERS_DIR):
+    """ Get the :class:`countrySize.spatialIndex.RegionIndex` of one admin
+    level of a country, built once per process.
+
+    Args
+    -------
+    * countryCode (str): key in :data:`COUNTRIES`,
+    * level (int): admin level, 0 for the country, 1 for prefectures etc.,
+    * bordersDir (str): directory with the GADM shapefiles.
+    """
+    fName=levelFile(countryCode,level,bordersDir)
+    if not fName in _INDICES:
+        _INDICES[fName]=RegionIndex(loadLayer(fName))
+    return _INDICES[fName]
+
+def inputFiles(countryCode,bordersDir=BORDERS_DIR):
+    """ Files whose contents define the figures of a country.
+
+    Args
+    -------
+    * countryCode (str): key in :data:`COUNTRIES`,
+    * bordersDir (str): directory with the GADM shapefiles.
+
+    Returns
+    -------
+    List of the existing shapefiles of the plotted admin levels and of the
+    sources of this package, see :mod:`plotTools.figureCache`.
+    """
+    packageDir=os.path.dirname(os.path.abspath(__file__))
+    files=[os.path.join(packageDir,fName) for fName in sorted(os.listdir(packageDir))
+           if fName.endswith('.py')]
+    for level in (0,1):
+        fName=levelFile(countryCode,level,bordersDir)
+        files+=[fName+ext for ext in ('.shp','.shx','.dbf') if os.path.isfile(fName+ext)]
+    for dataset in DATASETS: # Coastlines of the maps, downloaded or shipped.
+        for resolution in ('c','l'):
+            for dataDir in (os.path.join(bordersDir,NATURAL_EARTH_DIR),BUNDLED_DIR):
+                fName=datasetFile(dataset,resolution,dataDir)
+                files+=[fName+ext for ext in ('.shp','.shx','.dbf')
+                        if os.path.isfile(fName+ext)]
+    return files
+
+def drawMap(bMap,axes,parallels,meridians):
+    """ Draw coastlines, countries and graticule of `bMap` on `axes`. """
+    bMap.drawcoastlines(linewidth=0.5,ax=axes)
+    bMap.drawcountries(linewidth=0.25,ax=axes)
+    bMap.drawparallels(parallels,ax=axes)
+    bMap.drawmeridians(meridians,ax=axes)
+
+class CountryOverlay(object):
+    """ Overlay a country on a map of another region to compare their sizes.
+
+    Attributes
+    -------
+    * countryCode (str): key in :data:`COUNTRIES`,
+    * region (dict): region where the country is overlaid, see :data:`REGIONS`,
+    * regionKey (str): key of `region` in :data:`REGIONS`, None for other regions,
+    * latOff,longOff (float): deg, by how much to offset the country,
+    * greatCircle (bool): whether to move the country along a great circle
+      instead of offsetting its lat and lon,
+    * country (dict): settings of the country from :data:`COUNTRIES`,
+    * shape: adm0 shape of the country,
+    * name (str): name of the country from the adm0 records.
+    """
+    def __init__(self,countryCode,region='Europe',offset=None,greatCircle=False,
+                 bordersDir=BORDERS_DIR):
+        """
+        Args
+        -------
+        * countryCode (str): key in :data:`COUNTRIES`,
+        * region (str or dict): key in :data:`REGIONS`, whose corners can be
+          overridden by the country's `regionWindows`, or a dict with the same
+          keys as the values of :data:`REGIONS`,
+        * offset (2-tuple of floats): deg, latitude and longitude offsets of the
+          country. Defaults to the one in :data:`COUNTRIES`,
+        * greatCircle (bool): whether to move the centre of the country by
+          `offset` along a great circle, which keeps its true size, instead of
+          offsetting the lat and lon of every vertex,
+        * bordersDir (str): directory with the GADM shapefiles.
+        """
+        self.countryCode=countryCode
+        self.country=COUNTRIES[countryCode]
+        self.regionKey=region if isinstance(region,str) else None
+        if isinstance(region,str):
+            region=dict(REGIONS[region],**self.country['regionWindows'].get(region,{}))
+        self.region=region
+        self.latOff,self.longOff=self.country['offset'] if offset is None else offset
+        self.greatCircle=greatCircle
+        self.bordersDir=bordersDir
+
+        shapes,records=loadLevel(countryCode,0,bordersDir)
+        self.shape=shapes[0]
+        if self.shape.shapeType!=shapefile.POLYGON:
+            raise ValueError('Shape not polygon with shapeType={}'.format(
+                             self.shape.shapeType))
+        self.name=records[0][self.country['nameField']]
+
+    def prefectures(self):
+        """ Get adm1 shapes of the country together with their record indices. """
+        shapes,records=loadLevel(self.countryCode,1,self.bordersDir)
+        field,kind=self.country['prefectureField'],self.country['prefectureType']
+        if field is None: # Plot all of them.
+            idx=numpy.arange(len(records))
+        else:
+            idx=numpy.flatnonzero(records[records.dtype.names[field]]==kind)
+        return [shapes[i] for i in idx],idx
+
+    def locatePrefectures(self,points):
+        """ Find the adm1 records of the country in which `points` are.
+
+        Args
+        -------
+        * points - (N,2) lon/lat in deg, e.g. user or office locations.
+
+        Returns
+        -------
+        (N,) int64 numpy.ndarray with indices of the adm1 records, -1 for the
+        points outside the country.
+        """
+        return levelIndex(self.countryCode,1,self.bordersDir).locate(points)
+
+    def regionPrefectures(self):
+        """ Get indices of the adm1 records of the country that intersect the
+        Mercator window of the region once the country's lat and lon have been
+        offset, i.e. not along a great circle. """
+        region=self.region
+        lonMin,lonMax=region['llcrnrlon']-self.longOff,region['urcrnrlon']-self.longOff
+        if self.country['flipUpsideDown']: # Flipped first, then offset.
+            latMin,latMax=self.latOff-region['urcrnrlat'],self.latOff-region['llcrnrlat']
+        else:
+            latMin,latMax=region['llcrnrlat']-self.latOff,region['urcrnrlat']-self.latOff
+        return levelIndex(self.countryCode,1,self.bordersDir).intersecting(
+            (lonMin,latMin,lonMax,latMax))
+
+    def moveKwargs(self):
+        """ Get the kwargs of :func:`countrySize.plotting.plotPrefecture` that
+        move the country over the region.
+
+        With `greatCircle`, the geodesic centroid of the country, see
+        :func:`countrySize.geodesy.measure`, is moved by `offset` along a great
+        circle, which keeps the true size of the country.
+        """
+        flipUpsideDown=self.country['flipUpsideDown']
+        if not self.greatCircle:
+            return dict(latOff=self.latOff,longOff=self.longOff,
+                        flipUpsideDown=flipUpsideDown)
+        partStarts=numpy.append(self.shape.parts,len(self.shape.points))
+        rotation=relocationMatrix(self.shape.points,partStarts,(self.latOff,self.longOff),
+                                  flipUpsideDown,relative=True)
+        return dict(rotation=rotation,flipUpsideDown=flipUpsideDown)
+
+    def getMap(self,**kwargs):
+        """ Get a map with the coastlines in `bordersDir`, see
+        :func:`countrySize.mapCache.getMap` for the `kwargs`. """
+        return getMap(dataDir=os.path.join(self.bordersDir,NATURAL_EARTH_DIR),**kwargs)
+
+    def regionMercator(self):
+        """ Get the Mercator :class:`countrySize.projection.MapProjection` of the region. """
+        return self.getMap(projection='merc',llcrnrlat=self.region['llcrnrlat'],
+                      urcrnrlat=self.region['urcrnrlat'],
+                      llcrnrlon=self.region['llcrnrlon'],
+                      urcrnrlon=self.region['urcrnrlon'],lat_ts=10,resolution='l')
+
+    def _drawRegionMercator(self,axes):
+        """ Draw the Mercator map of the region on `axes` and return it. """
+        mercMapE=self.regionMercator()
+        drawMap(mercMapE,axes,numpy.arange(mercMapE.latmin,mercMapE.latmax,10.),
+                numpy.arange(mercMapE.lonmin,mercMapE.lonmax,15.))
+        return mercMapE
+
+    def plotMercator(self):
+        """ Mercator projection, a.k.a. "the things you learn in schools". """
+        fig,ax=matplotlib.pyplot.subplots(1,2,figsize=(16,8))
+
+        # The whole Planet.
+        mercMapP=self.getMap(projection='merc',llcrnrlat=-80,urcrnrlat=80,
+                        llcrnrlon=-180,urcrnrlon=180,lat_ts=10,resolution='c')
+        drawMap(mercMapP,ax[0],numpy.arange(-90.,91.,30.),
+                numpy.arange(-180.,181.,60.))
+        ax[0].set_title(r'$Our\ Planet$',fontsize=titleFontSize)
+        plotPrefecture(shp=self.shape,colour=self.country['colour'],lwdth=1,
+                       bMap=mercMapP,axes=ax[0])
+
+        # Only the region.
+        mercMapE=self._drawRegionMercator(ax[1])
+        ax[1].set_title(r'${}$'.format(self.regionName()),fontsize=titleFontSize)
+        plotPrefecture(shp=self.shape,colour=self.country['colour'],lwdth=2,
+                       bMap=mercMapE,axes=ax[1],**self.moveKwargs())
+        return fig
+
+    def plotOrthographic(self):
+        """ Orthographic maps centred on the country and on the region. """
+        fig,ax=matplotlib.pyplot.subplots(1,2,figsize=(16,8))
+
+        # Centred on the country.
+        ortnMapC=self.getMap(projection='ortho',lat_0=self.country['lat'],
+                        lon_0=self.country['lon'],resolution='c')
+        drawMap(ortnMapC,ax[0],numpy.arange(-90,90,30),numpy.arange(0,360,30))
+        ax[0].set_title(r'${}$'.format(self.name),fontsize=titleFontSize)
+        plotPrefecture(shp=self.shape,colour=self.country['colour'],lwdth=2,
+                       bMap=ortnMapC,axes=ax[0])
+
+        # Plot all the prefectures.
+        prefectures,idx=self.prefectures()
+        nRecords=len(loadLevel(self.countryCode,1,self.bordersDir)[1])
+        cNorm=matplotlib.colors.Normalize(vmin=0,vmax=nRecords)
+        scalarMap=matplotlib.cm.ScalarMappable(norm=cNorm,cmap='viridis')
+        plotPrefectures(shps=prefectures,colours=scalarMap.to_rgba(idx),
+                        lwdth=0.5,bMap=ortnMapC,axes=ax[0])
+
+        # Centred on the region.
+        ortnMapE=self.getMap(projection='ortho',lat_0=self.region['lat'],
+                        lon_0=self.region['lon'],resolution='c')
+        drawMap(ortnMapE,ax[1],numpy.arange(-90,90,30),numpy.arange(0,360,30))
+        ax[1].set_title(r'${}\ over\ {}$'.format(self.name,self.regionName()),
+                        fontsize=titleFontSize)
+        plotPrefecture(shp=self.shape,colour=self.country['colour'],lwdth=2,
+                       bMap=ortnMapE,axes=ax[1],**self.moveKwargs())
+        return fig
+
+    def plotTrueLatitude(self):
+        """ The country overlaid on the region at its true latitude. """
+        fig,ax=matplotlib.pyplot.subplots(1,1,figsize=(16,8))
+        mercMapE=self._drawRegionMercator(ax)
+        ax.set_title(r'${},\ true\ lat.$'.format(self.regionName()),
+                     fontsize=titleFontSize)
+        plotPrefecture(shp=self.shape,colour=self.country['colour'],lwdth=2,
+                       bMap=mercMapE,axes=ax,latOff=0,longOff=self.longOff,
+                       flipUpsideDown=self.country['flipUpsideDown'])
+
+        if self.country['annotation'] is not None:
+            label,lon,lat,lonTxt,latTxt=self.country['annotation']
+            if self.country['flipUpsideDown']:
+                lat,latTxt=-lat,-latTxt
+            # Show annotation at the true latitude.
+            xPt,yPt=mercMapE.projtran(lon+self.longOff,lat)
+            xTXT,yTXT=mercMapE.projtran(lonTxt+self.longOff,latTxt)
+            ax.scatter([xPt],[yPt],s=50,c='crimson')
+            ax.annotate(label,xy=(xPt,yPt),xytext=(xTXT,yTXT),color='crimson',
+                        arrowprops=dict(facecolor='crimson',shrink=0.05))
+        return fig
+
+    def plotAll(self):
+        """ Plot all the comparison figures and return them in a list. """
+        return [self.plotMercator(),self.plotOrthographic(),self.plotTrueLatitude()]
+
+    def regionName(self):
+        """ Name of the region to be used in the plot titles. """
+        if self.regionKey is not None: # Its window may be the country's own.
+            return self.regionKey
+        for name,region in REGIONS.items():
+            if region is self.region:
+                return name
+        return r'the\ region'
+
+FIGURES=('mercator','orthographic','trueLatitude') # See plotComparison.
+
+def plotComparison(countryCode,figure,**kwargs):
+    """ Plot one comparison figure of a country.
+
+    Module-level, so that it can be rendered in another process, see
+    :class:`plotTools.FigureSpec`.
+
+    Args
+    -------
+    * countryCode (str): key in :data:`COUNTRIES`,
+    * figure (str): one of :data:`FIGURES`,
+    * kwargs: passed to :class:`CountryOverlay`.
+
+    Returns
+    -------
+    The :class:`matplotlib.figure.Figure`.
+    """
+    overlay=CountryOverlay(countryCode,**kwargs)
+    return {'mercator':overlay.plotMercator,
+            'orthographic':overlay.plotOrthographic,
+            'trueLatitude':overlay.plotTrueLatitude}[figure]()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Plot shapes from the [Global Administrative Areas](http://www.gadm.org/country)
+shapefiles on :class:`countrySize.projection.MapProjection` maps.
+
+Started as a copy of `plotPrefecture` from JapanSize.py, ArgentinaSize.py and
+BrazilSize.py, which were identical bar the `flipUpsideDown` option.
+
+@author: Alek
+"""
+import numpy, matplotlib.collections
+from .simplify import mapTolerance, simplifyMask
+from .transforms import transformCoords
+
+# Various font sizes.
+ticksFontSize=18
+labelsFontSizeSmall=20
+labelsFontSize=30
+titleFontSize=34
+legendFontSize=20
+
+def plotPrefectures(*,shps,colours,bMap,axes,latOff=0,longOff=0,lwdth=0.5,
+                    flipUpsideDown=False,rotation=None,pixelTolerance=0.5):
+    """ Plot many prefectures from a shapefile as one line collection.
+
+    The vertices of every part of every shape are concatenated, projected and
+    clipped to the visible side of the globe and the map with a single call to
+    :meth:`countrySize.projection.MapProjection.clipLines` and drawn as one
+    :class:`matplotlib.collections.LineCollection`. This way a whole admin level
+    is one artist, not one :class:`matplotlib.lines.Line2D` per island.
+
+    Shapes from :mod:`countrySize.shapeCache` are simplified to the level of
+    detail that can be seen on `axes`, given the extent of `bMap` and the size
+    and DPI of the figure, see :mod:`countrySize.simplify`.
+
+    Kwargs
+    -------
+    * shps - sequence of shapes as returned by :func:`shapefile.Reader.shapes`,
+    * colours - sequence of colours accepted by
+      :class:`matplotlib.collections.LineCollection`, one per shape in `shps`,
+    * bMap - instance of :class:`countrySize.projection.MapProjection` used to
+      project the shapes onto a map,
+    * axes - :class:`matplotlib.pyplot.Axes` instance where to plot,
+    * latOff,longOff - deg, by how much to offset the `shps` lattitudes and
+      longitudes before plotting,
+    * lwdth - line width as accepted by :func:`matplotlib.pyplot.Axes.plot',
+    * flipUpsideDown - whether to flip the shapes in lattitude to from one
+      hemisphere to the other,
+    * rotation - (3,3) matrix to move the shapes along a great circle before
+      offsetting them, see :func:`countrySize.transforms.rotationMatrix`,
+    * pixelTolerance - by how many pixels the simplified shapes may deviate
+      from the original ones, None to plot all the vertices.
+
+    Returns
+    -------
+    The :class:`matplotlib.collections.LineCollection` added to `axes`.
+    """
+    vertices=[] # Coordinates of all the shapes.
+    partStarts=[] # Index in the concatenated vertices where every part starts.
+    partColours=[] # Colour of every part.
+    nPoints=0 # Number of vertices of the shapes processed so far.
+    for shp,colour in zip(shps,colours):
+        vertices.append(numpy.asarray(shp.points,dtype=float).reshape(-1,2))
+        partStarts.extend(nPoints+numpy.asarray(shp.parts,dtype=int))
+        partColours.extend([colour]*len(shp.parts))
+        nPoints+=len(shp.points)
+    vertices=numpy.concatenate(vertices) if vertices else numpy.empty((0,2))
+
+    if pixelTolerance is not None and all(hasattr(shp,'importance') for shp in shps):
+        importance=numpy.concatenate([shp.importance for shp in shps]+[[]])
+        keep=simplifyMask(importance,mapTolerance(bMap,axes,pixelTolerance))
+        # Parts start after all the vertices kept in the preceding parts.
+        keptBefore=numpy.concatenate(([0],numpy.cumsum(keep)))
+        partStarts=keptBefore[numpy.asarray(partStarts,dtype=int)].tolist()
+        vertices=vertices[keep]
+
+    # Move all the vertices in place, they're already a copy of the shapes.
+    transformCoords(vertices,latOff=latOff,longOff=longOff,
+                    flipUpsideDown=flipUpsideDown,rotation=rotation,out=vertices)
+
+    # Project, cull and clip everything at once, so only the visible pieces of
+    # the parts reach the renderer.
+    segments,parts=bMap.clipLines(vertices,numpy.append(partStarts,len(vertices)))
+
+    lines=matplotlib.collections.LineCollection(segments,
+                                                colors=[partColours[i] for i in parts],
+                                                linewidths=lwdth,linestyles='-')
+    axes.add_collection(lines)
+    bMap.set_axes_limits(ax=axes)
+    return lines
+
+def plotPrefecture(*,shp,colour,bMap,axes,latOff=0,longOff=0,lwdth=0.5,
+                   flipUpsideDown=False,rotation=None,pixelTolerance=0.5):
+    """ Plot a prefecture from a shapefile.
+
+    All the parts of the shape (islands, disjoint regions and what-not) are
+    drawn as one artist, see :func:`plotPrefectures`.
+
+    Kwargs
+    -------
+    * shp - shape as returned by :func:`shapefile.Reader.shapes`,
+    * colour - colour accepted by :func:`matplotlib.pyplot.Axes.plot',
+    * bMap - instance of :class:`countrySize.projection.MapProjection` used to
+      project the shape onto a map,
+    * axes - :class:`matplotlib.pyplot.Axes` instance where to plot,
+    * latOff,longOff - deg, by how much to offset the `shp` lattitudes and
+      longitudes before plotting,
+    * lwdth - line width as accepted by :func:`matplotlib.pyplot.Axes.plot',
+    * flipUpsideDown - whether to flip the shape in lattitude to from one
+      hemisphere to the other,
+    * rotation - (3,3) matrix to move the shape along a great circle before
+      offsetting it, see :func:`countrySize.transforms.rotationMatrix`,
+    * pixelTolerance - by how many pixels the simplified shape may deviate
+      from the original one, None to plot all the vertices.
+
+    Returns
+    -------
+    The :class:`matplotlib.collections.LineCollection` added to `axes`.
+    """
+    return plotPrefectures(shps=[shp],colours=[colour],bMap=bMap,axes=axes,
+                           latOff=latOff,longOff=longOff,lwdth=lwdth,
+                           flipUpsideDown=flipUpsideDown,rotation=rotation,
+                           pixelTolerance=pixelTolerance)
@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorised map projections instead of :class:`mpl_toolkits.basemap.Basemap`.
+
+Only a handful of Basemap features were used: the forward Mercator and
+orthographic projections, `projtran`, coastlines, country borders and
+graticules. :class:`MapProjection` implements those with NumPy on whole
+coordinate arrays and has the same attribute and method names, e.g.
+`drawcoastlines` or `llcrnrx`, so it's a drop-in replacement for the maps of
+:mod:`countrySize`. Constructing one only computes its corners, so it takes
+microseconds instead of the seconds it took Basemap to read and clip its
+coastline databases.
+
+Coastlines and country borders are read from the
+[Natural Earth](https://www.naturalearthdata.com) shapefiles in
+:data:`DATA_DIR`, e.g. `ne_50m_coastline.shp`, through
+:mod:`countrySize.shapeCache`, i.e. they're parsed once and memory-mapped
+afterwards. The 1:110m datasets are shipped in :data:`BUNDLED_DIR`, so the
+maps have coastlines out of the box. Finer resolutions that haven't been
+downloaded fall back to those with a warning.
+
+Supported projections:
+
+* merc - Mercator, the map needs all four corners,
+* ortho - orthographic, the points on the far side of the globe are NaN and
+  the lines are cut at the horizon, see :meth:`MapProjection.clipLines`,
+* laea - Lambert azimuthal equal-area, the whole globe fits in the map.
+
+@author: Alek
+"""
+import numpy, os, warnings, matplotlib.pyplot, matplotlib.collections, \
+       matplotlib.patches
+from .shapeCache import loadLayer
+from .transforms import splitParts, toUnitVectors
+
+EARTH_RADIUS=6370997. # m, radius of the sphere, the same as Basemap's.
+PROJECTIONS=('merc','ortho','laea')
+DATA_DIR=os.path.join('borders','naturalEarth') # Where the Natural Earth shapefiles are.
+# Natural Earth datasets shipped with the package, see naturalEarth/makeDatasets.py.
+BUNDLED_DIR=os.path.join(os.path.dirname(os.path.abspath(__file__)),'naturalEarth')
+BUNDLED_RESOLUTION='c'
+# Natural Earth scales of the Basemap resolutions.
+RESOLUTIONS={'c':'110m','l':'50m','i':'10m','h':'10m','f':'10m'}
+# Natural Earth line datasets, with a placeholder for the scale.
+DATASETS={'coastlines':'ne_{}_coastline',
+          'countries':'ne_{}_admin_0_boundary_lines_land'}
+GRATICULE_STEP=0.5 # deg, between the points of the parallels and meridians.
+MAX_MERCATOR_LAT=89.9 # deg, Mercator is infinite at the poles.
+
+_DATASETS={} # Coordinates and part starts of the datasets read so far.
+
+def datasetFile(dataset,resolution='c',dataDir=DATA_DIR):
+    """ Shapefile name, without the extension, of a Natural Earth dataset.
+
+    Args
+    -------
+    * dataset (str): key in :data:`DATASETS`,
+    * resolution (str): key in :data:`RESOLUTIONS`,
+    * dataDir (str): directory with the Natural Earth shapefiles.
+    """
+    return os.path.join(dataDir,DATASETS[dataset].format(RESOLUTIONS[resolution]))
+
+def findDataset(dataset,resolution='c',dataDir=DATA_DIR):
+    """ Shapefile name, without the extension, of a Natural Earth dataset to
+    draw: in `dataDir`, else in :data:`BUNDLED_DIR` at `resolution` or, with a
+    warning, at :data:`BUNDLED_RESOLUTION`.
+
+    Raises
+    -------
+    FileNotFoundError if the dataset is nowhere.
+    """
+    for directory,res in ((dataDir,resolution),(BUNDLED_DIR,resolution),
+                          (BUNDLED_DIR,BUNDLED_RESOLUTION)):
+        fName=datasetFile(dataset,res,directory)
+        if os.path.isfile(fName+'.shp'):
+            if res!=resolution:
+                warnings.warn('{}.shp not found, drawing the {} at resolution {}. '
+                    'Download it from https://www.naturalearthdata.com'.format(
+                    datasetFile(dataset,resolution,dataDir),dataset,res))
+            return fName
+    raise FileNotFoundError('No {} at resolution {} in {} or {}. Download them from '
+        'https://www.naturalearthdata.com'.format(dataset,resolution,dataDir,BUNDLED_DIR))
+
+def loadDataset(dataset,resolution='c',dataDir=DATA_DIR):
+    """ Get (N,2) lon/lat and (P+1,) part starts of a Natural Earth dataset,
+    see :func:`findDataset`. Read once per process. """
+    fName=findDataset(dataset,resolution,dataDir)
+    if not fName in _DATASETS:
+        layer=loadLayer(fName)
+        _DATASETS[fName]=(layer.coords,layer.partStarts)
+    return _DATASETS[fName]
+
+def clipIntervals(partStarts,t0,t1):
+    """ Keep only an interval of every edge of polylines and split them where
+    the kept intervals don't join.
+
+    Args
+    -------
+    * partStarts - (P+1,) index of the point where every polyline starts, the
+      last entry is the number of points N,
+    * t0,t1 - (N-1,) start and end of the kept interval of the edge from every
+      point to the next one, 0 at the point and 1 at the next one. The edges
+      with `t0`>`t1` and those between polylines are dropped.
+
+    Returns
+    -------
+    4-tuple with (M,) int64 edge and (M,) float interval parameter of every
+    point of the clipped polylines, (K+1,) int64 index of the point where every
+    clipped polyline starts and (K,) int64 index of the polyline it comes from.
+    """
+    partStarts=numpy.asarray(partStarts,dtype=numpy.int64)
+    n=partStarts[-1]
+    if n<2:
+        empty=numpy.zeros(0,dtype=numpy.int64)
+        return empty,numpy.zeros(0),numpy.zeros(1,dtype=numpy.int64),empty
+    first=numpy.zeros(n+1,dtype=bool)
+    first[partStarts]=True
+    kept=~first[1:n] & (t0<=t1)
+    # Edges that carry on from the end of the previous edge of the polyline.
+    joined=kept & (t0<=0) & ~first[:n-1] & numpy.r_[False,kept[:-1] & (t1[:-1]>=1)]
+    begins=kept & ~joined # Start a new polyline with the point at t0.
+    counts=kept.astype(numpy.int64)+begins
+    edge=numpy.repeat(numpy.arange(n-1),counts)
+    t=numpy.repeat(t1,counts)
+    starts=(numpy.cumsum(counts)-counts)[begins]
+    t[starts]=t0[begins]
+    parts=numpy.repeat(numpy.arange(partStarts.size-1),numpy.diff(partStarts))
+    return edge,t,numpy.append(starts,edge.size),parts[edge[starts]]
+
+class MapProjection(object):
+    """ Forward map projection with the drawing methods of a Basemap.
+
+    Projected coordinates are in metres with the lower left corner of the map
+    at (0,0), like in Basemap.
+
+    Attributes
+    -------
+    * projection (str): one of :data:`PROJECTIONS`,
+    * resolution (str): of the coastlines, key in :data:`RESOLUTIONS`,
+    * lat_0,lon_0 (float): deg, centre of the map,
+    * rmajor,rminor (float): m, radius of the sphere,
+    * lat_ts (float): deg, latitude of true scale of 'merc',
+    * llcrnrx,llcrnry,urcrnrx,urcrnry (float): m, corners of the map,
+    * latmin,latmax,lonmin,lonmax (float): deg, extent of the map,
+    * fullDisk (bool): whether the map shows the whole visible globe,
+    * dataDir (str): directory with the Natural Earth shapefiles.
+    """
+    def __init__(self,projection,llcrnrlat=None,urcrnrlat=None,llcrnrlon=None,
+                 urcrnrlon=None,lat_0=0.,lon_0=None,lat_ts=0.,resolution='c',
+                 rsphere=EARTH_RADIUS,dataDir=DATA_DIR):
+        """
+        Args
+        -------
+        * projection (str): one of :data:`PROJECTIONS`,
+        * llcrnrlat,urcrnrlat,llcrnrlon,urcrnrlon (float): deg, corners of the
+          map, the whole globe if not given for 'ortho' and 'laea',
+        * lat_0,lon_0 (float): deg, centre of the map, `lon_0` defaults to the
+          middle of the corners,
+        * lat_ts (float): deg, latitude of true scale of 'merc',
+        * resolution (str): of the coastlines, key in :data:`RESOLUTIONS`,
+        * rsphere (float): m, radius of the sphere,
+        * dataDir (str): directory with the Natural Earth shapefiles.
+        """
+        if not projection in PROJECTIONS:
+            raise ValueError('Unknown projection {}, use one of {}'.format(projection,
+                             PROJECTIONS))
+        corners=(llcrnrlat,urcrnrlat,llcrnrlon,urcrnrlon)
+        self.fullDisk=any(corner is None for corner in corners)
+        if projection=='merc' and self.fullDisk:
+            raise ValueError('Mercator maps need all four corners')
+        self.projection=projection
+        self.resolution=resolution
+        self.dataDir=dataDir
+        self.rmajor=self.rminor=rsphere
+        self.lat_0=lat_0
+        self.lat_ts=lat_ts
+        if lon_0 is None:
+            lon_0=0. if self.fullDisk else (llcrnrlon+urcrnrlon)/2.
+        self.lon_0=lon_0
+        self._scale=rsphere*numpy.cos(numpy.radians(lat_ts)) if projection=='merc' \
+                    else rsphere
+        self._sinLat0=numpy.sin(numpy.radians(lat_0))
+        self._cosLat0=numpy.cos(numpy.radians(lat_0))
+        # Unit vectors of the centre of the map and of east and north there.
+        self._centre=toUnitVectors(numpy.array([[lon_0,lat_0]],dtype=float))[0]
+        sinLon0,cosLon0=numpy.sin(numpy.radians(lon_0)),numpy.cos(numpy.radians(lon_0))
+        self._axes=numpy.array([[-sinLon0,cosLon0,0.],
+                                [-self._sinLat0*cosLon0,-self._sinLat0*sinLon0,self._cosLat0]])
+        self._lines={} # Projected datasets.
+
+        self._x0=self._y0=0.
+        self.llcrnrx=self.llcrnry=0.
+        if self.fullDisk: # Disk centred on (lat_0,lon_0).
+            radius=rsphere if projection=='ortho' else 2*rsphere
+            self._x0=self._y0=radius
+            self.urcrnrx=self.urcrnry=2*radius
+            self.latmin,self.latmax=-90.,90.
+            self.lonmin,self.lonmax=lon_0-180.,lon_0+180.
+        else:
+            x,y=self([llcrnrlon,urcrnrlon],[llcrnrlat,urcrnrlat])
+            if not numpy.isfinite([x,y]).all():
+                raise ValueError('Corners of the map not visible in {}'.format(projection))
+            self._x0,self._y0=-x[0],-y[0]
+            self.urcrnrx,self.urcrnry=x[1]-x[0],y[1]-y[0]
+            self.latmin,self.latmax=llcrnrlat,urcrnrlat
+            self.lonmin,self.lonmax=llcrnrlon,urcrnrlon
+
+    def _cosDistance(self,lonRad,latRad):
+        """ Cosine of the angular distance from the centre of the map. """
+        return self._sinLat0*numpy.sin(latRad)+\
+               self._cosLat0*numpy.cos(latRad)*numpy.cos(lonRad-numpy.radians(self.lon_0))
+
+    def visible(self,lon,lat):
+        """ Whether the points at `lon` and `lat` in deg are on the map side of
+        the globe, i.e. not on the back of 'ortho' or at the antipode of 'laea'. """
+        lon,lat=numpy.radians(lon),numpy.radians(lat)
+        if self.projection=='merc':
+            return numpy.ones(numpy.broadcast(lon,lat).shape,dtype=bool)
+        cosDistance=self._cosDistance(lon,lat)
+        return cosDistance>=0 if self.projection=='ortho' else cosDistance>-1
+
+    def __call__(self,lon,lat):
+        """ Project `lon` and `lat` in deg to x and y in m, NaN where not
+        :meth:`visible`. """
+        lon=numpy.radians(numpy.asarray(lon,dtype=float))
+        lat=numpy.radians(numpy.asarray(lat,dtype=float))
+        if self.projection=='merc':
+            limit=numpy.radians(MAX_MERCATOR_LAT)
+            x=self._scale*(lon-numpy.radians(self.lon_0))
+            y=self._scale*numpy.arctanh(numpy.sin(numpy.clip(lat,-limit,limit)))
+        else:
+            dLon=lon-numpy.radians(self.lon_0)
+            cosLat=numpy.cos(lat)
+            cosDistance=self._cosDistance(lon,lat)
+            if self.projection=='ortho':
+                k=numpy.where(cosDistance>=0,1.,numpy.nan)
+            else:
+                with numpy.errstate(divide='ignore',invalid='ignore'):
+                    k=numpy.sqrt(2/(1+cosDistance))
+                k=numpy.where(numpy.isfinite(k),k,numpy.nan)
+            x=self._scale*k*cosLat*numpy.sin(dLon)
+            y=self._scale*k*(self._cosLat0*numpy.sin(lat)-self._sinLat0*cosLat*numpy.cos(dLon))
+        return x+self._x0,y+self._y0
+
+    projtran=__call__ # Basemap name of the forward projection.
+
+    def maxScaleFactor(self):
+        """ Largest ratio of the lengths on the map to those on the sphere.
+
+        For 'merc' it's at the latitude furthest from the equator on the map,
+        'ortho' shrinks everything away from the centre, and 'laea' stretches
+        the lengths across the radius by up to sqrt(2) on the near hemisphere.
+        """
+        if self.projection=='merc':
+            lat=min(max(abs(self.latmin),abs(self.latmax)),MAX_MERCATOR_LAT)
+            return numpy.cos(numpy.radians(self.lat_ts))/numpy.cos(numpy.radians(lat))
+        return 1. if self.projection=='ortho' else numpy.sqrt(2.)
+
+    def set_axes_limits(self,ax=None):
+        """ Show the whole map on `ax` with equal aspect and no ticks, and the
+        edge of the globe for full disk maps. """
+        ax=matplotlib.pyplot.gca() if ax is None else ax
+        ax.set_xlim(self.llcrnrx,self.urcrnrx)
+        ax.set_ylim(self.llcrnry,self.urcrnry)
+        ax.set_aspect('equal',anchor='C')
+        ax.set_xticks([])
+        ax.set_yticks([])
+        if self.fullDisk and not any(p.get_gid()=='mapBoundary' for p in ax.patches):
+            ax.set_frame_on(False)
+            ax.add_patch(matplotlib.patches.Circle((self._x0,self._y0),self._x0,
+                         fill=False,linewidth=1.,gid='mapBoundary'))
+
+    def clipLines(self,coords,partStarts):
+        """ Project lon/lat polylines and keep only what's on the map.
+
+        Everything is done on all the points at once, before any artist is
+        created:
+
+        1. The edges are cut at the horizon of 'ortho' maps, where the
+           polylines go behind the globe, and at the points with no
+           projection, e.g. the antipode of 'laea',
+        2. The projected edges are clipped to the corners of the map, e.g. the
+           `llcrnrlat` and `urcrnrlon` of 'merc'.
+
+        Args
+        -------
+        * coords - (N,2) lon/lat in deg of all the points,
+        * partStarts - (P+1,) index in `coords` where every polyline starts,
+          the last entry is N.
+
+        Returns
+        -------
+        2-tuple with a list of (M,2) x/y in m of the visible pieces of the
+        polylines and an int64 numpy.ndarray with the index of the polyline of
+        every piece.
+        """
+        coords=numpy.asarray(coords,dtype=float).reshape(-1,2)
+        partStarts=numpy.asarray(partStarts,dtype=numpy.int64)
+        if self.projection=='ortho':
+            # Chords between the points cross the horizon where the great
+            # circle arcs do, and orthographic x/y are linear in the vectors.
+            vectors=toUnitVectors(coords)
+            distance=vectors.dot(self._centre)
+            da,db=distance[:-1],distance[1:]
+            with numpy.errstate(divide='ignore',invalid='ignore'):
+                horizon=da/(da-db)
+            t0=numpy.where(da>=0,0.,horizon)
+            t1=numpy.where(db>=0,1.,horizon)
+            hidden=(da<0) & (db<0) # Behind the globe.
+            t0[hidden],t1[hidden]=1.,0.
+            edge,t,starts,parts=clipIntervals(partStarts,t0,t1)
+            points=vectors[edge]+(vectors[edge+1]-vectors[edge])*t[:,None]
+            points/=numpy.linalg.norm(points,axis=1)[:,None]
+            xy=self._scale*points.dot(self._axes.T)+(self._x0,self._y0)
+        else:
+            x,y=self(coords[:,0],coords[:,1])
+            xy=numpy.column_stack((x,y))
+            finite=numpy.isfinite(xy).all(axis=1)
+            both=finite[:-1] & finite[1:]
+            edge,t,starts,parts=clipIntervals(partStarts,numpy.where(both,0.,1.),
+                                              numpy.where(both,1.,0.))
+            xy=xy[edge+(t>0.5)]
+
+        if not self.fullDisk: # Liang-Barsky against the corners of the map.
+            dxy=numpy.diff(xy,axis=0)
+            t0,t1=numpy.zeros(dxy.shape[0]),numpy.ones(dxy.shape[0])
+            with numpy.errstate(divide='ignore',invalid='ignore'):
+                for p,q in ((-dxy[:,0],xy[:-1,0]-self.llcrnrx),(dxy[:,0],self.urcrnrx-xy[:-1,0]),
+                            (-dxy[:,1],xy[:-1,1]-self.llcrnry),(dxy[:,1],self.urcrnry-xy[:-1,1])):
+                    r=q/p
+                    t0=numpy.where(p<0,numpy.maximum(t0,r),t0)
+                    t1=numpy.where(p>0,numpy.minimum(t1,r),t1)
+                    outside=(p==0) & (q<0) # Parallel to the edge of the map, outside.
+                    t0,t1=numpy.where(outside,1.,t0),numpy.where(outside,0.,t1)
+            edge,t,starts,pieces=clipIntervals(starts,t0,t1)
+            xy=xy[edge]+dxy[edge]*t[:,None]
+            parts=parts[pieces]
+        return (splitParts(xy,starts[:-1]) if parts.size else []),parts
+
+    def projectLines(self,coords,partStarts):
+        """ Project lon/lat polylines and get the visible pieces, see :meth:`clipLines`. """
+        return self.clipLines(coords,partStarts)[0]
+
+    def _drawLines(self,segments,ax,**kwargs):
+        """ Add `segments` to `ax` as one line collection and return it. """
+        ax=matplotlib.pyplot.gca() if ax is None else ax
+        lines=matplotlib.collections.LineCollection(segments,**kwargs)
+        ax.add_collection(lines)
+        self.set_axes_limits(ax=ax)
+        return lines
+
+    def _drawDataset(self,dataset,ax,**kwargs):
+        """ Draw a Natural Earth `dataset`, projected once per map. """
+        if not dataset in self._lines:
+            self._lines[dataset]=self.projectLines(*loadDataset(dataset,self.resolution,
+                                                                self.dataDir))
+        return self._drawLines(self._lines[dataset],ax,**kwargs)
+
+    def drawcoastlines(self,linewidth=1.,linestyle='solid',color='k',ax=None,
+                       zorder=None):
+        """ Draw the coastlines on `ax`, see :data:`DATASETS`. """
+        return self._drawDataset('coastlines',ax,linewidths=linewidth,
+                                 linestyles=linestyle,colors=color,zorder=zorder)
+
+    def drawcountries(self,linewidth=0.5,linestyle='solid',color='k',ax=None,
+                      zorder=None):
+        """ Draw the land borders of the countries on `ax`, see :data:`DATASETS`. """
+        return self._drawDataset('countries',ax,linewidths=linewidth,
+                                 linestyles=linestyle,colors=color,zorder=zorder)
+
+    def drawparallels(self,circles,color='k',linewidth=1.,dashes=(1,1),ax=None,
+                      zorder=None):
+        """ Draw parallels at latitudes `circles` in deg on `ax`. """
+        lon=numpy.append(numpy.arange(self.lonmin,self.lonmax,GRATICULE_STEP),self.lonmax)
+        lat=numpy.asarray(circles,dtype=float)
+        coords=numpy.column_stack((numpy.tile(lon,lat.size),numpy.repeat(lat,lon.size)))
+        return self._drawLines(self.projectLines(coords,numpy.arange(lat.size+1)*lon.size),
+                               ax,colors=color,linewidths=linewidth,
+                               linestyles=(0,dashes),zorder=zorder)
+
+    def drawmeridians(self,meridians,color='k',linewidth=1.,dashes=(1,1),ax=None,
+                      zorder=None):
+        """ Draw meridians at longitudes `meridians` in deg on `ax`. """
+        latmax=min(self.latmax,MAX_MERCATOR_LAT) if self.projection=='merc' else self.latmax
+        latmin=max(self.latmin,-MAX_MERCATOR_LAT) if self.projection=='merc' else self.latmin
+        lat=numpy.append(numpy.arange(latmin,latmax,GRATICULE_STEP),latmax)
+        lon=numpy.asarray(meridians,dtype=float)
+        coords=numpy.column_stack((numpy.repeat(lon,lat.size),numpy.tile(lat,lon.size)))
+        return self._drawLines(self.projectLines(coords,numpy.arange(lon.size+1)*lat.size),
+                               ax,colors=color,linewidths=linewidth,
+                               linestyles=(0,dashes),zorder=zorder)
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk cache of parsed shapefiles as memory-mapped NumPy arrays.
+
+:class:`shapefile.Reader` turns every point into a Python list, which makes
+reading the detailed GADM layers (e.g. JPN_adm2) slow and memory-hungry. Thus,
+every layer is converted once into a directory next to the shapefile with:
+
+* `coords.npy` - (N,2) float64 lon/lat of all the points of all the shapes,
+* `parts.npy` - (P+1,) int64 index in `coords` where every part starts, the
+  last entry is N,
+* `shapes.npy` - (S+1,) int64 index in `parts` where every shape starts, the
+  last entry is P,
+* `types.npy` - (S,) int32 shape types, e.g. :data:`shapefile.POLYGON`,
+* `records.npy` - (S,) structured array with one field per dBASE field,
+* `importance.npy` - (N,) float64 level-of-detail importance of every point,
+  see :func:`countrySize.simplify.vertexImportance`,
+* `meta.json` - size and modification time of the source shapefile and
+  :data:`CACHE_VERSION`.
+
+Later runs open the arrays with :func:`numpy.load` in `mmap_mode`, i.e. with
+no per-point Python objects and no copies. The directory is written under a
+temporary name and renamed into place once complete, so only directories with
+a `meta.json` are ever read.
+
+@author: Alek
+"""
+import numpy, shapefile, os, json, shutil, tempfile
+from .simplify import vertexImportance
+
+CACHE_SUFFIX='.cache' # Appended to the shapefile name to get the cache dir.
+CACHE_VERSION=4 # Caches written with other versions are rebuilt.
+
+class CachedShape(object):
+    """ Shape of a :class:`CachedLayer` that quacks like :class:`shapefile.Shape`.
+
+    Attributes
+    -------
+    * points - (N,2) view of the lon/lat of the shape in the layer `coords`,
+    * parts - (P,) int64 index in `points` where every part starts,
+    * shapeType (int): shapefile shape type,
+    * importance - (N,) view of the level-of-detail importance of `points`.
+    """
+    __slots__=('points','parts','shapeType','importance')
+
+    def __init__(self,points,parts,shapeType,importance):
+        self.points=points
+        self.parts=parts
+        self.shapeType=shapeType
+        self.importance=importance
+
+class CachedLayer(object):
+    """ Columnar, memory-mapped representation of one shapefile layer.
+
+    Attributes
+    -------
+    * coords - (N,2) float64 lon/lat of all the points,
+    * partStarts - (P+1,) int64 index in `coords` where every part starts,
+    * shapeStarts - (S+1,) int64 index in `partStarts` where every shape starts,
+    * shapeTypes - (S,) int32 shapefile shape types,
+    * recordTable - (S,) structured array with the dBASE records,
+    * importance - (N,) float64 level-of-detail importance of `coords`.
+    """
+    def __init__(self,coords,partStarts,shapeStarts,shapeTypes,recordTable,
+                 importance):
+        self.coords=coords
+        self.partStarts=partStarts
+        self.shapeStarts=shapeStarts
+        self.shapeTypes=shapeTypes
+        self.recordTable=recordTable
+        self.importance=importance
+
+    @property
+    def numRecords(self):
+        return self.shapeTypes.shape[0]
+
+    def shape(self,i):
+        """ Get the `i`th shape as a :class:`CachedShape` of views. """
+        firstPart,lastPart=self.shapeStarts[i],self.shapeStarts[i+1]
+        lower,upper=self.partStarts[firstPart],self.partStarts[lastPart]
+        return CachedShape(self.coords[lower:upper],
+                           self.partStarts[firstPart:lastPart]-lower,
+                           int(self.shapeTypes[i]),self.importance[lower:upper])
+
+    def shapes(self):
+        """ Get all the shapes, like :func:`shapefile.Reader.shapes`. """
+        return [self.shape(i) for i in range(self.numRecords)]
+
+    def records(self):
+        """ Get all the records, like :func:`shapefile.Reader.records`. """
+        return self.recordTable
+
+def _recordDtype(fields):
+    """ Get the structured dtype for dBASE `fields` of a :class:`shapefile.Reader`. """
+    dtype=[]
+    for name,kind,size,decimal in fields:
+        if kind=='N' and decimal==0:
+            dtype.append((name,numpy.int64))
+        elif kind in 'NF':
+            dtype.append((name,numpy.float64))
+        elif kind=='L':
+            dtype.append((name,numpy.bool_))
+        elif kind=='D': # Stored as 8 characters, but read as YYYY-MM-DD.
+            dtype.append((name,'U10'))
+        else: # Characters and memos.
+            dtype.append((name,'U{}'.format(max(size,1))))
+    return numpy.dtype(dtype)
+
+def _recordValue(value,fieldDtype):
+    """ Convert a dBASE record `value` so it can be stored as `fieldDtype`. """
+    if value is None: # Missing value.
+        return numpy.zeros((),dtype=fieldDtype).item()
+    elif fieldDtype.kind=='U': # Dates are datetime.date instances.
+        return str(value)
+    return value
+
+def buildLayer(fName,cacheDir=None):
+    """ Convert shapefile `fName` into the cache directory `cacheDir`.
+
+    Args
+    -------
+    * fName (str): shapefile name accepted by :class:`shapefile.Reader`,
+    * cacheDir (str): where to write the arrays, defaults to `fName` with
+      :data:`CACHE_SUFFIX`.
+    """
+    cacheDir=fName+CACHE_SUFFIX if cacheDir is None else cacheDir
+    shapeRdr=shapefile.Reader(fName)
+    shapes=shapeRdr.shapes()
+
+    nPoints=numpy.array([len(shp.points) for shp in shapes],dtype=numpy.int64)
+    nParts=numpy.array([len(shp.parts) for shp in shapes],dtype=numpy.int64)
+    pointStarts=numpy.concatenate(([0],numpy.cumsum(nPoints)))
+    shapeStarts=numpy.concatenate(([0],numpy.cumsum(nParts)))
+    partStarts=numpy.empty(shapeStarts[-1]+1,dtype=numpy.int64)
+    coords=numpy.empty((pointStarts[-1],2),dtype=numpy.float64)
+    for i,shp in enumerate(shapes):
+        partStarts[shapeStarts[i]:shapeStarts[i+1]]=numpy.asarray(shp.parts)+pointStarts[i]
+        if nPoints[i]>0:
+            coords[pointStarts[i]:pointStarts[i+1]]=shp.points
+    partStarts[-1]=pointStarts[-1]
+    shapeTypes=numpy.array([shp.shapeType for shp in shapes],dtype=numpy.int32)
+
+    fields=[f for f in shapeRdr.fields if f[0]!='DeletionFlag']
+    dtype=_recordDtype(fields)
+    recordTable=numpy.zeros(len(shapes),dtype=dtype)
+    for i,record in enumerate(shapeRdr.records()):
+        recordTable[i]=tuple(_recordValue(value,dtype[j]) for j,value in enumerate(record))
+
+    importance=vertexImportance(coords,partStarts)
+
+    shapeRdr.close()
+
+    # Write to a temporary sibling dir first and swap it in, so that arrays that
+    # are already memory-mapped, e.g. by other workers, are never overwritten.
+    parentDir=os.path.dirname(os.path.abspath(cacheDir))
+    baseName=os.path.basename(os.path.normpath(cacheDir))
+    tmpDir=tempfile.mkdtemp(prefix=baseName+'.',suffix='.tmp',dir=parentDir)
+    try:
+        for name,array in [('coords',coords),('parts',partStarts),('shapes',shapeStarts),
+                           ('types',shapeTypes),('records',recordTable),
+                           ('importance',importance)]:
+            numpy.save(os.path.join(tmpDir,name+'.npy'),array)
+        # Written last, so a half-written cache is never considered valid.
+        with open(os.path.join(tmpDir,'meta.json'),'w') as metaFile:
+            json.dump(_sourceStamp(fName),metaFile)
+        _swapDir(tmpDir,cacheDir,fName)
+    finally:
+        shutil.rmtree(tmpDir,ignore_errors=True)
+
+def _swapDir(newDir,cacheDir,fName):
+    """ Move complete directory `newDir` to `cacheDir`, unless another process
+    has already put a valid cache of `fName` there.
+
+    An outdated cache is renamed aside before it's deleted, so the files that
+    are still memory-mapped stay intact.
+    """
+    while not _isValid(fName,cacheDir):
+        try:
+            os.rename(newDir,cacheDir)
+            return
+        except OSError: # There's an outdated or half-written cache in the way.
+            oldDir=newDir+'.old'
+            try:
+                os.rename(cacheDir,oldDir)
+            except FileNotFoundError: # Another process has just moved it aside.
+                continue
+            shutil.rmtree(oldDir,ignore_errors=True)
+
+def _sourceStamp(fName):
+    """ Size and modification time of the .shp and .dbf files of `fName`. """
+    stamp={'version':CACHE_VERSION}
+    for ext in ('.shp','.dbf'):
+        stat=os.stat(fName+ext)
+        stamp[ext]=[stat.st_size,stat.st_mtime_ns]
+    return stamp
+
+def _isValid(fName,cacheDir):
+    """ Whether `cacheDir` has a complete cache of the current shapefile `fName`. """
+    try:
+        with open(os.path.join(cacheDir,'meta.json')) as metaFile:
+            return json.load(metaFile)==_sourceStamp(fName)
+    except (OSError,ValueError): # No cache or a corrupted one.
+        return False
+
+def loadLayer(fName,cacheDir=None):
+    """ Get a :class:`CachedLayer` with shapefile `fName`.
+
+    The shapefile is converted on the first call and whenever it changes,
+    otherwise the cached arrays are memory-mapped straight away.
+
+    Args
+    -------
+    * fName (str): shapefile name without the extension,
+    * cacheDir (str): where the arrays are, defaults to `fName` with
+      :data:`CACHE_SUFFIX`.
+    """
+    cacheDir=fName+CACHE_SUFFIX if cacheDir is None else cacheDir
+    if not _isValid(fName,cacheDir):
+        buildLayer(fName,cacheDir)
+
+    arrays=[numpy.load(os.path.join(cacheDir,name+'.npy'),mmap_mode='r')
+            for name in ('coords','parts','shapes','types','records','importance')]
+    return CachedLayer(*arrays)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Level-of-detail simplification of the GADM shapes tied to the map scale.
+
+Every vertex of a layer gets an importance - the Douglas-Peucker tolerance in
+degrees above which it would be removed. Keeping the vertices whose importance
+is at least a given tolerance yields one level of a nested, multi-resolution
+pyramid, so any level can be cut from one precomputed array with a mask.
+
+Topology between neighbouring prefectures is kept by pinning the nodes, i.e.
+the vertices where the number of rings sharing a vertex changes (e.g. where
+the border of two prefectures meets a third one or the coast). Every shared
+border is then simplified between the same two nodes in both prefectures and
+both get the same vertices.
+
+@author: Alek
+"""
+import numpy
+from plotTools import export
+
+DEG_PER_METRE=360./(2*numpy.pi*6371000.) # Along a great circle.
+
+def _nodes(coords,partStarts):
+    """ Get a mask of `coords` that must not be simplified away.
+
+    Args
+    -------
+    * coords - (N,2) lon/lat of all the points of a layer,
+    * partStarts - (P+1,) index in `coords` where every part starts, the last
+      entry is N.
+    """
+    nPoints=coords.shape[0]
+    fixed=numpy.zeros(nPoints,dtype=bool)
+    if nPoints==0:
+        return fixed
+    # Ends of the parts, i.e. of the rings.
+    firsts=partStarts[:-1][numpy.diff(partStarts)>0]
+    lasts=partStarts[1:][numpy.diff(partStarts)>0]-1
+    fixed[firsts]=True
+    fixed[lasts]=True
+
+    # Number of rings sharing every vertex, not counting the closing vertex.
+    _,inverse=numpy.unique(coords,axis=0,return_inverse=True)
+    inverse=inverse.reshape(-1)
+    closing=numpy.zeros(nPoints,dtype=bool)
+    closing[lasts]=True
+    counts=numpy.bincount(inverse[~closing],minlength=inverse.max()+1)[inverse]
+
+    # Nodes are where the count changes along a ring.
+    changes=counts[1:]!=counts[:-1]
+    fixed[1:]|=changes
+    fixed[:-1]|=changes
+    # A node of one ring, e.g. where it starts mid-border, is a node of all the
+    # rings that share it, so that both sides of the border are split there.
+    return numpy.bincount(inverse,weights=fixed,minlength=inverse.max()+1)[inverse]>0
+
+def _distances(points,starts,ends):
+    """ Distances of `points` from segments between `starts` and `ends`.
+    All arguments are (M,2) arrays, segments with coincident ends (e.g. whole
+    closed rings) give the distance from that point. """
+    segment=ends-starts
+    length2=numpy.einsum('ij,ij->i',segment,segment)
+    along=numpy.einsum('ij,ij->i',points-starts,segment)
+    along=numpy.divide(along,length2,out=numpy.zeros_like(along),where=length2>0)
+    closest=starts+numpy.clip(along,0,1)[:,numpy.newaxis]*segment
+    return numpy.hypot(*(points-closest).T)
+
+def vertexImportance(coords,partStarts):
+    """ Compute the Douglas-Peucker importance of every vertex of a layer.
+
+    All the chains between the nodes of all the parts are split in one
+    vectorised step per level of recursion. The importance of a vertex is the
+    distance at which it was chosen to split its chain, capped at the
+    importance of the parent split so that the levels are nested.
+
+    Args
+    -------
+    * coords - (N,2) lon/lat of all the points of a layer,
+    * partStarts - (P+1,) index in `coords` where every part starts, the last
+      entry is N.
+
+    Returns
+    -------
+    (N,) float64 array with the importance in degrees, infinite for the nodes.
+    """
+    coords=numpy.asarray(coords,dtype=numpy.float64)
+    partStarts=numpy.asarray(partStarts,dtype=numpy.int64)
+    fixed=_nodes(coords,partStarts)
+    importance=numpy.where(fixed,numpy.inf,0.)
+
+    # Chains are between consecutive nodes of the same part.
+    partIds=numpy.searchsorted(partStarts,numpy.arange(coords.shape[0]),side='right')
+    nodeIdx=numpy.flatnonzero(fixed)
+    sameParts=partIds[nodeIdx[:-1]]==partIds[nodeIdx[1:]]
+    starts,ends=nodeIdx[:-1][sameParts],nodeIdx[1:][sameParts]
+    caps=numpy.full(starts.shape,numpy.inf)
+
+    while True:
+        interior=ends-starts-1 # No. vertices inside every chain.
+        sel=interior>0
+        starts,ends,caps,interior=starts[sel],ends[sel],caps[sel],interior[sel]
+        if starts.size==0:
+            break
+        chain=numpy.repeat(numpy.arange(starts.size),interior)
+        offsets=numpy.concatenate(([0],numpy.cumsum(interior)[:-1]))
+        idx=starts[chain]+numpy.arange(chain.size)-offsets[chain]+1
+        dist=_distances(coords[idx],coords[starts[chain]],coords[ends[chain]])
+
+        # The farthest vertex of every chain splits it into two.
+        maxDist=numpy.maximum.reduceat(dist,offsets)
+        atMax=numpy.flatnonzero(dist==maxDist[chain])
+        firstAtMax=atMax[numpy.unique(chain[atMax],return_index=True)[1]]
+        splits=idx[firstAtMax]
+        values=numpy.minimum(maxDist,caps)
+        importance[splits]=values
+
+        starts,ends=numpy.concatenate((starts,splits)),numpy.concatenate((splits,ends))
+        caps=numpy.concatenate((values,values))
+    return importance
+
+def mapTolerance(bMap,axes,pixels=0.5):
+    """ Get the simplification tolerance that is invisible on a map.
+
+    Args
+    -------
+    * bMap - :class:`countrySize.projection.MapProjection` the shapes are
+      projected on,
+    * axes - :class:`matplotlib.pyplot.Axes` with the map, its size in pixels
+      depends on the figure size and the DPI it's saved at, see
+      :func:`plotTools.export.pixelScale`,
+    * pixels (float): how many pixels the simplified shapes may deviate by.
+
+    Returns
+    -------
+    Tolerance in degrees to compare with :func:`vertexImportance`, where the
+    map is stretched the most, e.g. at the highest latitude of Mercator maps.
+    """
+    widthPx=max(axes.get_window_extent().width*export.pixelScale(axes.figure),1.)
+    metresPerPx=(bMap.urcrnrx-bMap.llcrnrx)/widthPx/bMap.maxScaleFactor()
+    return pixels*metresPerPx*DEG_PER_METRE
+
+def simplifyMask(importance,tolerance):
+    """ Get a mask of the vertices with `importance` kept at `tolerance`. """
+    return numpy.asarray(importance)>=tolerance
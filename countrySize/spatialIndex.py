@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+Spatial index over the shapes of a :class:`countrySize.shapeCache.CachedLayer`.
+
+Geocoding points to prefectures, or finding the regions visible in a map
+window, by testing every shape scales with the number of shapes times the
+number of points, which is too slow for the adm2 layers. :class:`RegionIndex`
+packs the bounding boxes of all the parts of the shapes into an R-tree with
+Sort-Tile-Recursive (STR), so a query only visits the boxes that overlap it,
+and then tests the points against the candidate rings in NumPy:
+
+    index=RegionIndex(loadLayer('borders/gadm28_JPN_shp/JPN_adm1'))
+    shapes=index.locate([[130.83,33.89],[139.69,35.69]]) # Fukuoka, Tokyo.
+    visible=index.intersecting((129,30,142,40))
+
+Lon and lat are treated as planar coordinates, like in the shapefiles, so
+shapes that cross the antimeridian aren't handled.
+
+@author: Alek
+"""
+import numpy
+
+NODE_SIZE=16 # Children of every node of the R-tree.
+MAX_PAIRS=1<<22 # Edge and point pairs tested at once, to limit the memory.
+
+def _boxes(coords,starts):
+    """ (K,4) lonMin, latMin, lonMax, latMax of `coords` between (K+1,) `starts`.
+
+    Empty ranges get inverted infinite boxes, which intersect nothing.
+    """
+    boxes=numpy.empty((starts.size-1,4))
+    boxes[:,:2]=numpy.inf
+    boxes[:,2:]=-numpy.inf
+    full=numpy.flatnonzero(starts[1:]>starts[:-1])
+    if full.size:
+        boxes[full,:2]=numpy.minimum.reduceat(coords,starts[full],axis=0)
+        boxes[full,2:]=numpy.maximum.reduceat(coords,starts[full],axis=0)
+    return boxes
+
+def _overlap(a,b):
+    """ Whether (N,4) boxes `a` and `b` intersect, row by row. """
+    return (a[:,0]<=b[:,2]) & (a[:,2]>=b[:,0]) & (a[:,1]<=b[:,3]) & (a[:,3]>=b[:,1])
+
+def _strOrder(boxes,nodeSize):
+    """ Sort-Tile-Recursive order of `boxes`: vertical slices sorted by the
+    longitude of the box centres, every slice sorted by the latitude. """
+    n=boxes.shape[0]
+    nSlices=int(numpy.ceil(numpy.sqrt(numpy.ceil(n/nodeSize))))
+    perSlice=nodeSize*int(numpy.ceil(n/(nodeSize*nSlices)))
+    byLon=numpy.argsort(boxes[:,0]+boxes[:,2],kind='stable')
+    slices=numpy.empty(n,dtype=numpy.int64)
+    slices[byLon]=numpy.arange(n)//perSlice
+    return numpy.lexsort((boxes[:,1]+boxes[:,3],slices))
+
+def _groupBoxes(boxes,nodeSize):
+    """ Boxes of the nodes with `nodeSize` consecutive `boxes` each. """
+    starts=numpy.arange(0,boxes.shape[0],nodeSize)
+    return numpy.hstack([numpy.minimum.reduceat(boxes[:,:2],starts,axis=0),
+                         numpy.maximum.reduceat(boxes[:,2:],starts,axis=0)])
+
+def _ranges(starts,lengths):
+    """ Concatenated `arange(start,start+length)` of all the `starts` and `lengths`. """
+    total=lengths.sum()
+    offsets=numpy.arange(total)-numpy.repeat(numpy.cumsum(lengths)-lengths,lengths)
+    return numpy.repeat(starts,lengths)+offsets
+
+def _chunks(counts,size=MAX_PAIRS):
+    """ Slices of `counts` whose sums are about `size`. """
+    bounds=numpy.searchsorted(numpy.cumsum(counts),numpy.arange(size,counts.sum(),size))
+    bounds=numpy.unique(numpy.concatenate(([0],bounds+1,[counts.size])))
+    return [slice(lo,hi) for lo,hi in zip(bounds[:-1],bounds[1:]) if hi>lo]
+
+class RegionIndex(object):
+    """ STR-packed R-tree of the parts of the shapes of a layer, with vectorised
+    point-in-polygon and window queries.
+
+    Attributes
+    -------
+    * coords - (N,2) lon/lat of all the points, see :class:`countrySize.shapeCache.CachedLayer`,
+    * partStarts - (P+1,) index in `coords` where every part starts,
+    * partShapes - (P,) int64 index of the shape of every part,
+    * partBoxes - (P,4) lonMin, latMin, lonMax, latMax of every part,
+    * numShapes (int): number of shapes in the layer.
+    """
+    def __init__(self,layer,nodeSize=NODE_SIZE):
+        """
+        Args
+        -------
+        * layer - :class:`countrySize.shapeCache.CachedLayer` to index,
+        * nodeSize (int): children of every node of the R-tree.
+        """
+        self.coords=numpy.asarray(layer.coords)
+        self.partStarts=numpy.asarray(layer.partStarts,dtype=numpy.int64)
+        shapeStarts=numpy.asarray(layer.shapeStarts,dtype=numpy.int64)
+        self.numShapes=shapeStarts.size-1
+        self.partShapes=numpy.repeat(numpy.arange(self.numShapes),numpy.diff(shapeStarts))
+        self.partBoxes=_boxes(self.coords,self.partStarts)
+        self.nodeSize=nodeSize
+
+        # Bottom-up, node i of level k+1 holds items _orders[k][i*nodeSize:(i+1)*nodeSize]
+        # of level k. Level 0 are the parts.
+        self._levelBoxes=[self.partBoxes]
+        self._orders=[]
+        while self._levelBoxes[-1].shape[0]>nodeSize:
+            order=_strOrder(self._levelBoxes[-1],nodeSize)
+            self._orders.append(order)
+            self._levelBoxes.append(_groupBoxes(self._levelBoxes[-1][order],nodeSize))
+
+    def candidates(self,boxes):
+        """ Parts whose bounding boxes intersect `boxes`.
+
+        Args
+        -------
+        * boxes - (Q,4) lonMin, latMin, lonMax, latMax of the queries, points
+          are boxes with no extent.
+
+        Returns
+        -------
+        2-tuple of int64 numpy.ndarrays with the indices of the queries and of
+        the parts that intersect them.
+        """
+        boxes=numpy.atleast_2d(numpy.asarray(boxes,dtype=float))
+        top=self._levelBoxes[-1]
+        query,node=[a.ravel() for a in numpy.meshgrid(numpy.arange(boxes.shape[0]),
+                                                      numpy.arange(top.shape[0]),indexing='ij')]
+        keep=_overlap(boxes[query],top[node])
+        query,node=query[keep],node[keep]
+        for level in range(len(self._orders)-1,-1,-1):
+            order=self._orders[level]
+            first=node*self.nodeSize
+            lengths=numpy.minimum(first+self.nodeSize,order.size)-first
+            query=numpy.repeat(query,lengths)
+            node=order[_ranges(first,lengths)]
+            keep=_overlap(boxes[query],self._levelBoxes[level][node])
+            query,node=query[keep],node[keep]
+        return query,node
+
+    def _edges(self,parts):
+        """ Start and end indices in `coords` of the edges of the rings of `parts`,
+        and the part of every edge. The last point of every part is joined to
+        the first one, so the rings needn't be closed. """
+        lengths=self.partStarts[parts+1]-self.partStarts[parts]
+        edgeParts=numpy.repeat(parts,lengths)
+        start=_ranges(self.partStarts[parts],lengths)
+        end=start+1
+        last=end==self.partStarts[edgeParts+1]
+        end[last]=self.partStarts[edgeParts[last]]
+        return start,end,edgeParts
+
+    def _crossings(self,points,query,parts):
+        """ Number of crossings of the rays from `points[query]` towards +lon
+        with the rings of `parts`, for every pair of `query` and `parts`.
+
+        Every edge is only tested against the points in its latitude band:
+        pairs sorted by part and latitude are a sorted key, in which the band
+        of every edge is found with :func:`numpy.searchsorted`.
+        """
+        crossings=numpy.zeros(query.size,dtype=numpy.int64)
+        if not query.size:
+            return crossings
+        lat=points[query,1]
+        order=numpy.lexsort((lat,parts))
+        start,end,edgeParts=self._edges(numpy.unique(parts))
+        x1,y1=self.coords[start,0],self.coords[start,1]
+        x2,y2=self.coords[end,0],self.coords[end,1]
+        # Half-open bands, so a vertex at the latitude of a point is counted once.
+        lo,hi=numpy.minimum(y1,y2),numpy.maximum(y1,y2)
+        _,ranks=numpy.unique(numpy.concatenate([lat,lo,hi]),return_inverse=True)
+        nRanks=ranks.max()+1
+        pairKeys=parts[order]*nRanks+ranks[:lat.size][order]
+        first=numpy.searchsorted(pairKeys,edgeParts*nRanks+ranks[lat.size:lat.size+lo.size])
+        counts=numpy.searchsorted(pairKeys,edgeParts*nRanks+ranks[lat.size+lo.size:])-first
+
+        sortedCrossings=numpy.zeros(query.size,dtype=numpy.int64)
+        sortedPoints=points[query[order]]
+        for chunk in _chunks(counts):
+            edge=numpy.repeat(numpy.arange(chunk.start,chunk.stop),counts[chunk])
+            pair=_ranges(first[chunk],counts[chunk])
+            px,py=sortedPoints[pair,0],sortedPoints[pair,1]
+            xCross=x1[edge]+(py-y1[edge])*(x2[edge]-x1[edge])/(y2[edge]-y1[edge])
+            sortedCrossings+=numpy.bincount(pair[px<xCross],minlength=query.size)
+        crossings[order]=sortedCrossings
+        return crossings
+
+    def _inside(self,points,query,parts):
+        """ Unique pairs of queries and shapes for which `points[query]` is
+        inside the shape, even-odd over all the candidate `parts` of the shape. """
+        crossings=self._crossings(points,query,parts)
+        keys,inverse=numpy.unique(query*self.numShapes+self.partShapes[parts],
+                                  return_inverse=True)
+        odd=numpy.bincount(inverse.ravel(),weights=crossings,minlength=keys.size)%2==1
+        return keys[odd]//self.numShapes,keys[odd]%self.numShapes
+
+    def locate(self,points):
+        """ Shapes in which `points` are.
+
+        Args
+        -------
+        * points - (Q,2) lon/lat.
+
+        Returns
+        -------
+        (Q,) int64 numpy.ndarray with the index of the shape, i.e. of the record,
+        that contains every point, -1 outside all the shapes. If the shapes
+        overlap, the first one is returned.
+        """
+        points=numpy.atleast_2d(numpy.asarray(points,dtype=float))
+        query,parts=self.candidates(numpy.hstack([points,points]))
+        query,shapes=self._inside(points,query,parts)
+        located=numpy.full(points.shape[0],-1,dtype=numpy.int64)
+        located[query[::-1]]=shapes[::-1] # Sorted, so the first shape wins.
+        return located
+
+    def intersecting(self,window):
+        """ Shapes that intersect a lon/lat window.
+
+        Args
+        -------
+        * window (4-tuple of floats): lonMin, latMin, lonMax, latMax.
+
+        Returns
+        -------
+        Sorted int64 numpy.ndarray with the indices of the shapes that have a
+        point in the window, including shapes that contain the whole window.
+        """
+        lonMin,latMin,lonMax,latMax=window
+        _,parts=self.candidates(numpy.array([window],dtype=float))
+        if not parts.size:
+            return numpy.empty(0,dtype=numpy.int64)
+        # Edges that cross the window, clipped like Liang-Barsky.
+        start,end,edgeParts=self._edges(numpy.unique(parts))
+        x1,y1=self.coords[start,0],self.coords[start,1]
+        dx,dy=self.coords[end,0]-x1,self.coords[end,1]-y1
+        t0,t1=numpy.zeros(x1.size),numpy.ones(x1.size)
+        hit=numpy.ones(x1.size,dtype=bool)
+        with numpy.errstate(divide='ignore',invalid='ignore'):
+            for p,q in ((-dx,x1-lonMin),(dx,lonMax-x1),(-dy,y1-latMin),(dy,latMax-y1)):
+                hit&=~((p==0) & (q<0))
+                r=q/p
+                t0=numpy.where(p<0,numpy.maximum(t0,r),t0)
+                t1=numpy.where(p>0,numpy.minimum(t1,r),t1)
+        hit&=t0<=t1
+        shapes=numpy.unique(self.partShapes[edgeParts[hit]])
+        # Shapes with no edge in the window may still contain all of it.
+        corner=numpy.array([[lonMin,latMin]])
+        _,around=self._inside(corner,numpy.zeros(parts.size,dtype=numpy.int64),parts)
+        return numpy.union1d(shapes,around)
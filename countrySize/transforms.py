@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Move shapes around the globe before plotting them.
+
+Every function works on the flat (N,2) lon/lat buffer of a shape or a whole
+layer (see :mod:`countrySize.shapeCache`) in one pass, optionally in place,
+instead of on one part at a time. :func:`splitParts` then gives views of the
+parts without copying them.
+
+Raw lat/lon offsets distort the shapes on a sphere - a country moved north
+that way gets narrower in reality but not on the map. :func:`rotationMatrix`
+instead moves the shapes along a great circle, which keeps their true size.
+:func:`relocateCoords` and :func:`relocateShapes` build these rotations from
+the geodesic centroids of the shapes, see :mod:`countrySize.geodesy`, so the
+centre of mass of a shape ends up exactly at the target.
+
+@author: Alek
+"""
+import numpy
+from .geodesy import measure
+
+def splitParts(coords,partStarts):
+    """ Get views of `coords` with every part of a shape.
+
+    Args
+    -------
+    * coords - (N,2) lon/lat of all the points,
+    * partStarts - index in `coords` where every part starts.
+
+    Returns
+    -------
+    List of (M,2) views of `coords`, one per part.
+    """
+    return numpy.split(coords,numpy.asarray(partStarts,dtype=int)[1:])
+
+def toUnitVectors(coords):
+    """ Convert (N,2) lon/lat in degrees into (N,3) unit vectors. """
+    lon,lat=numpy.radians(coords[:,0]),numpy.radians(coords[:,1])
+    cosLat=numpy.cos(lat)
+    return numpy.column_stack((cosLat*numpy.cos(lon),cosLat*numpy.sin(lon),
+                               numpy.sin(lat)))
+
+def fromUnitVectors(vectors,out=None,lonCentre=None):
+    """ Convert (N,3) unit vectors into (N,2) lon/lat in degrees.
+
+    Args
+    -------
+    * vectors - (N,3) unit vectors,
+    * out - (N,2) array where to write the lon/lat, a new one by default,
+    * lonCentre (float): deg, wrap the longitudes to within 180 degrees of
+      this one to avoid jumps at the antimeridian. Default to (-180,180].
+    """
+    out=numpy.empty((vectors.shape[0],2)) if out is None else out
+    numpy.degrees(numpy.arctan2(vectors[:,1],vectors[:,0]),out=out[:,0])
+    numpy.degrees(numpy.arcsin(numpy.clip(vectors[:,2],-1,1)),out=out[:,1])
+    if lonCentre is not None:
+        out[:,0]=(out[:,0]-lonCentre+180.)%360.+lonCentre-180.
+    return out
+
+def rotationMatrices(sources,targets):
+    """ Get the rotations that move `sources` to `targets` along great circles.
+
+    Args
+    -------
+    * sources,targets - (S,2) lat and lon in degrees.
+
+    Returns
+    -------
+    (S,3,3) rotation matrices to be applied to unit vectors, see :func:`rotateCoords`.
+    """
+    sources=numpy.asarray(sources,dtype=float).reshape(-1,2)
+    targets=numpy.asarray(targets,dtype=float).reshape(-1,2)
+    a,b=toUnitVectors(sources[:,::-1]),toUnitVectors(targets[:,::-1])
+    axes=numpy.cross(a,b)
+    sinAngles,cosAngles=numpy.linalg.norm(axes,axis=1),numpy.einsum('ij,ij->i',a,b)
+    # Antipodes, rotate by 180 deg around any axis perpendicular to `a`.
+    antipodes=(sinAngles<1e-12) & (cosAngles<=0)
+    other=numpy.where((numpy.abs(a[:,0])<0.9)[:,None],[1.,0.,0.],[0.,1.,0.])
+    axes[antipodes]=numpy.cross(a[antipodes],other[antipodes])
+    sinAngles[antipodes]=0.
+    lengths=numpy.linalg.norm(axes,axis=1)
+    axes=numpy.divide(axes,lengths[:,None],out=numpy.zeros_like(axes),
+                      where=lengths[:,None]>0) # Same points, nothing to do.
+    cross=numpy.zeros((axes.shape[0],3,3))
+    cross[:,0,1],cross[:,0,2],cross[:,1,2]=-axes[:,2],axes[:,1],-axes[:,0]
+    cross-=cross.transpose(0,2,1)
+    # Rodrigues' formula.
+    return numpy.eye(3)+sinAngles[:,None,None]*cross+(1.-cosAngles)[:,None,None]*(cross@cross)
+
+def rotationMatrix(source,target):
+    """ Get the rotation that moves `source` to `target` along a great circle.
+
+    Args
+    -------
+    * source,target - 2-tuples with lat and lon in degrees.
+
+    Returns
+    -------
+    (3,3) rotation matrix to be applied to unit vectors, see :func:`rotateCoords`.
+    """
+    return rotationMatrices(source,target)[0]
+
+def rotateCoords(coords,matrix,out=None,lonCentre=None):
+    """ Rotate lon/lat `coords` on the sphere with a (3,3) rotation `matrix`.
+    See :func:`fromUnitVectors` for `out` and `lonCentre`. """
+    return fromUnitVectors(toUnitVectors(coords).dot(matrix.T),out=out,
+                           lonCentre=lonCentre)
+
+def transformCoords(coords,latOff=0,longOff=0,flipUpsideDown=False,
+                    rotation=None,lonCentre=None,out=None):
+    """ Flip, rotate and offset the lon/lat of shapes in one pass.
+
+    The operations are applied in this order to all the `coords` at once.
+
+    Args
+    -------
+    * coords - (N,2) lon/lat of all the points of the shapes,
+    * latOff,longOff - deg, by how much to offset the lattitudes and
+      longitudes,
+    * flipUpsideDown - whether to flip the shapes in lattitude to from one
+      hemisphere to the other,
+    * rotation - (3,3) matrix to move the shapes along a great circle, see
+      :func:`rotationMatrix`,
+    * lonCentre (float): deg, see :func:`fromUnitVectors`,
+    * out - (N,2) array where to write the result, may be `coords` to
+      transform them in place. A new array by default.
+
+    Returns
+    -------
+    (N,2) array with the transformed lon/lat.
+    """
+    coords=numpy.asarray(coords,dtype=float)
+    out=numpy.empty_like(coords) if out is None else out
+    if rotation is not None:
+        if flipUpsideDown: # Flip the rotation input, not to overwrite coords.
+            rotation=rotation.dot(numpy.diag([1.,1.,-1.]))
+        rotateCoords(coords,rotation,out=out,lonCentre=lonCentre)
+    else:
+        out[:,0]=coords[:,0]
+        numpy.multiply(coords[:,1],-1 if flipUpsideDown else 1,out=out[:,1])
+    if longOff!=0: out[:,0]+=longOff
+    if latOff!=0: out[:,1]+=latOff
+    return out
+
+def relocationMatrix(coords,partStarts,target,flipUpsideDown=False,relative=False):
+    """ Get the rotation that moves the centroid of a shape to `target`.
+
+    Args
+    -------
+    * coords - (N,2) lon/lat in deg of all the points of the shape,
+    * partStarts - (P+1,) index in `coords` where every part starts,
+    * target - 2-tuple with lat and lon in deg of the new centroid,
+    * flipUpsideDown (bool): whether the shape is flipped in latitude before
+      being rotated, like in :func:`transformCoords`,
+    * relative (bool): whether `target` is the lat and lon offset of the new
+      centroid from the (flipped) old one.
+
+    Returns
+    -------
+    (3,3) rotation matrix, see :func:`rotationMatrix`.
+    """
+    centroid=measure(coords,partStarts,[0,len(partStarts)-1])[0]
+    source=(-centroid['lat'] if flipUpsideDown else centroid['lat'],centroid['lon'])
+    if relative:
+        target=(source[0]+target[0],source[1]+target[1])
+    return rotationMatrix(source,target)
+
+def relocateCoords(coords,partStarts,target,flipUpsideDown=False,out=None,
+                   lonCentre=None):
+    """ Move a shape along a great circle so its centroid is at `target`.
+
+    Unlike offsetting the lat and lon, this keeps the distances between all the
+    points, hence the true size and shape, anywhere on the globe. See
+    :func:`relocationMatrix` for the arguments and :func:`fromUnitVectors`
+    for `out` and `lonCentre`.
+    """
+    rotation=relocationMatrix(coords,partStarts,target,flipUpsideDown)
+    return transformCoords(coords,flipUpsideDown=flipUpsideDown,rotation=rotation,
+                           lonCentre=lonCentre,out=out)
+
+def relocateShapes(coords,partStarts,shapeStarts,targets,out=None,lonCentre=None):
+    """ Move every shape of a layer along a great circle to its own target.
+
+    The centroids and the rotations of all the shapes are computed in one pass
+    and all the points are then rotated at once.
+
+    Args
+    -------
+    * coords - (N,2) lon/lat in deg of all the points,
+    * partStarts - (P+1,) index in `coords` where every part starts,
+    * shapeStarts - (S+1,) index in `partStarts` where every shape starts,
+    * targets - (S,2) lat and lon in deg of the new centroids of the shapes,
+    * out, lonCentre - see :func:`fromUnitVectors`.
+
+    Returns
+    -------
+    (N,2) array with the moved lon/lat.
+    """
+    coords=numpy.asarray(coords,dtype=float)
+    out=numpy.empty_like(coords) if out is None else out
+    partStarts=numpy.asarray(partStarts,dtype=numpy.int64)
+    shapeStarts=numpy.asarray(shapeStarts,dtype=numpy.int64)
+    centroids=measure(coords,partStarts,shapeStarts)
+    starts=partStarts[shapeStarts]
+    empty=~numpy.isfinite(centroids['lat']) # No points to move.
+    sources=numpy.column_stack((centroids['lat'],centroids['lon']))
+    sources[empty]=numpy.asarray(targets,dtype=float).reshape(-1,2)[empty]
+    rotations=rotationMatrices(sources,targets)
+    # Rotate all the points at once, one row of their shape's matrix at a time,
+    # not to make a (N,3,3) copy of the matrices.
+    shapes=numpy.repeat(numpy.arange(rotations.shape[0]),numpy.diff(starts))
+    lower,upper=starts[0],starts[-1]
+    vectors=toUnitVectors(coords[lower:upper])
+    rotated=numpy.empty_like(vectors)
+    for i in range(3):
+        rotated[:,i]=numpy.einsum('nj,nj->n',rotations[shapes,i],vectors)
+    fromUnitVectors(rotated,out=out[lower:upper],lonCentre=lonCentre)
+    return out
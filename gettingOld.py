@@ -5,10 +5,12 @@ are available on the [UN website](https://esa.un.org/unpd/wpp/Download/Standard/
 I decided to check when I'll be older than half of the people on the planet,
 which might be considered as one boundary of getting old.
 """
-import pandas, numpy, matplotlib.pyplot, matplotlib.ticker, scipy.interpolate
+from plotTools import plotSeries, export # Before pyplot to select the backend.
+import numpy, matplotlib.pyplot, matplotlib.ticker, wpp
 
 # Script controls.
 FNAME='WPP2015_POP_F05_MEDIAN_AGE.XLS' # What file to read the UN data from.
+BIRTH_YEAR=1990 # My approximate year of birth.
 
 # Various font sizes.
 ticksFontSize=18
@@ -32,9 +34,11 @@ def extractUNData(datFrm,countryCode):
     
     Args
     --------
-    * dataFrm (:class:`pandas.Dataframe`): dataframe with country codes and
-      UN prognoses. See :func:`getUNData` to see how to read the `dataFrm`
-      from an Excel workbook as avaialble from the UN website.
+    * dataFrm (:class:`pandas.Dataframe` or :class:`wpp.CountryIndex`):
+      dataframe with country codes and UN prognoses or its prebuilt index. See
+      :func:`getUNData` to see how to read the `dataFrm` from an Excel workbook
+      as avaialble from the UN website. Pass an index when extracting many
+      countries, otherwise one is built on every call.
     * countryCode (int): the code of the country for which to reac the data.
     
     Returns
@@ -42,11 +46,10 @@ def extractUNData(datFrm,countryCode):
     2-tuple of numpy.ndarrays with population data in the original units and
     the corresponding years. Shapes are (N,).
     """
-    # Not generic! But works for the UN World Outlook 2015 data.
-    countryData=datFrm[datFrm['Country code']==countryCode]
-    x=numpy.array(countryData[datFrm.columns[1:]],dtype=float).reshape(-1,)
-    t=numpy.array(datFrm.columns[1:].tolist(),dtype=float)
-    return x,t
+    if not isinstance(datFrm,wpp.CountryIndex):
+        # Not generic! But works for the UN World Outlook 2015 data.
+        datFrm=wpp.CountryIndex.fromDataFrame(datFrm)
+    return datFrm.series(countryCode) # O(1) row slice.
 
 def getUNData(fName,sheetName,countryCode,trimYear=None):
     """ Get UN Population Outlook data for a given country.
@@ -62,9 +65,9 @@ def getUNData(fName,sheetName,countryCode,trimYear=None):
     
     Args
     --------
-    * fName: string or file-like object accepted by :func:`pandas.read_excel`
-      from which the data will be read.
-    * sheetName: string with the sheet name in `fName` workbook or an int.
+    * fName: string with the workbook name accepted by :func:`pandas.read_excel`
+      from which the data will be read, see :func:`wpp.loadSheet`.
+    * sheetName: string with the sheet name in `fName` workbook.
       Defines the UN prognosis to be read.
     * countryCode (int): the code of the country for which to reac the data.
     * trimYear (int): whether to return only data older than a given year.
@@ -74,17 +77,11 @@ def getUNData(fName,sheetName,countryCode,trimYear=None):
     2-tuple of numpy.ndarrays with population data in the original units and
     the corresponding years. Shapes are (N,).
     """
-    # Not generic! But works for the UN World Outlook 2015 data.
-    df=pandas.read_excel(fName,sheetname=sheetName,header=0,skiprows=16)
-    # Could use parse_cols in read_excel to ignore the unwanted columns, but
-    # then it'd be tricky not to risk unintentionally trimming the data by
-    # selecting only some of the columns. So read everything and drop what we
-    # don't need.
-    df.drop('Index',axis=1,inplace=True)
-    df.drop('Variant',axis=1,inplace=True)
-    df.drop('Major area, region, country or area *',axis=1,inplace=True)
-    df.drop('Notes',axis=1,inplace=True)
-    x,t=extractUNData(df,countryCode)
+    # Read from the columnar cache of the workbook, which is only converted from
+    # the XLS the first time and whenever it changes. The 'Index', 'Variant',
+    # country name and 'Notes' columns are already dropped there, and the
+    # sheet is indexed by the country code.
+    x,t=extractUNData(wpp.indexSheet(fName,sheetName),countryCode)
     if not trimYear is None: # Trim the data by year.
         return x[t<=trimYear],t[t<=trimYear]
     else: # No trimming, return everything.
@@ -96,14 +93,16 @@ xLow,tLow=getUNData(FNAME,'LOW VARIANT',900,trimYear=2200)
 xHigh,tHigh=getUNData(FNAME,'HIGH VARIANT',900,trimYear=2200)
 xMedium,tMedium=getUNData(FNAME,'MEDIUM VARIANT',900,trimYear=2200)
 
-# Interpolate the predictions close to the region of itnerest.
-fLow=scipy.interpolate.interp1d(tLow,xLow)
-fHigh=scipy.interpolate.interp1d(tHigh,xHigh)
-fMedium=scipy.interpolate.interp1d(tMedium,xMedium)
+# Interpolate the predictions close to the region of itnerest. All the variants
+# share the years, so interpolate them together.
 tInterp=numpy.linspace(2015,2040,25)
-xLowInterp=fLow(tInterp)
-xHighInterp=fHigh(tInterp)
-xMediumInterp=fMedium(tInterp)
+xLowInterp,xHighInterp,xMediumInterp=wpp.interpolate(tMedium,
+                                        [xLow,xHigh,xMedium],tInterp)
+
+# Copy the figure from the cache if neither the data nor this script changed.
+if export.cached('gettingOld',inputs=[__file__],data=(tHistory,xHistory,tInterp,
+                 xLowInterp,xHighInterp,xMediumInterp,BIRTH_YEAR)):
+    raise SystemExit
 
 # Plot the historical data.
 fig,ax=matplotlib.pyplot.subplots(1,1,figsize=(14,8))
@@ -111,13 +110,14 @@ ax.scatter(tHistory,xHistory,c='indigo',marker='o',s=50,
            label=r'$Historical\ estimates$')
 
 # Plot the age and predictions interpolated close to the cross-over.
-ax.plot(tInterp,xLowInterp,ls='-',c='deepskyblue',lw=2.,
-        label=r'$UN\ low\ variant\ forecast$')
-ax.plot(tInterp,xHighInterp,ls='-',c='crimson',lw=2.,
-        label=r'$UN\ high\ variant\ forecast$')
-ax.plot(tInterp,xMediumInterp,ls='-',c='gold',lw=2.,
-        label=r'$UN\ medium\ variant\ forecast$')
-ax.plot([1990,2040],[0,50],ls='--',c='k',lw=3.,label=r'$My\ approx.\ age$')
+plotSeries(ax,tInterp,xLowInterp,ls='-',c='deepskyblue',lw=2.,
+           label=r'$UN\ low\ variant\ forecast$')
+plotSeries(ax,tInterp,xHighInterp,ls='-',c='crimson',lw=2.,
+           label=r'$UN\ high\ variant\ forecast$')
+plotSeries(ax,tInterp,xMediumInterp,ls='-',c='gold',lw=2.,
+           label=r'$UN\ medium\ variant\ forecast$')
+ax.plot([BIRTH_YEAR,2040],[0,2040-BIRTH_YEAR],ls='--',c='k',lw=3.,
+        label=r'$My\ approx.\ age$')
 
 # Zoom to the area of interest.
 ax.set_xlim(1990,2040)
@@ -135,4 +135,4 @@ ax.grid(linewidth=0.1,linestyle='--',which='minor')
 ax.legend(bbox_to_anchor=(0.5,1.23),loc='upper center',
           prop={'size':legendFontSize},fancybox=True,shadow=True,ncol=3)
 ax.tick_params(axis='both',reset=False,which='both',length=5,width=1.5)
-fig.show()
\ No newline at end of file
+export.show(fig,'gettingOld')
\ No newline at end of file
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+Tools shared by the plotting scripts in this repo, e.g. rendering many
+independent figures in parallel.
+
+@author: Alek
+"""
+from .scheduler import FigureSpec, SharedArray, renderFigures
+from .downsample import plotSeries, minMaxIndices, lttbIndices, pixelWidth
+from .sketch import freezeSketch, sketchPolyline
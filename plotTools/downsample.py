@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Downsample long time series to the pixel width of the axes before plotting.
+
+Every vertex of a line goes through the xkcd sketch filter, so plotting years
+of daily rows costs a lot and shows nothing more than a couple of points per
+pixel column would. Two selections of the points to plot are available:
+
+* :func:`minMaxIndices` - first, last, minimum and maximum point in every
+  pixel column, which draws the same line as all the points (M4),
+* :func:`lttbIndices` - Largest-Triangle-Three-Buckets, one point per bucket
+  that keeps the visual shape with even fewer points.
+
+@author: Alek
+"""
+import numpy
+from . import export
+
+PIXELS_PER_BIN=1 # Pixel columns per min/max bin.
+
+def _numeric(x):
+    """ `x` as floats, datetimes as nanoseconds since the epoch. """
+    x=numpy.asarray(x)
+    if x.dtype.kind=='M':
+        return x.astype('datetime64[ns]').astype(numpy.int64).astype(float)
+    return x.astype(float)
+
+def minMaxIndices(x,y,nBins):
+    """ Indices of the first, last, min and max points in `nBins` bins of `x`.
+
+    Args
+    -------
+    * x - (N,) increasing abscissae, numbers or datetimes,
+    * y - (N,) ordinates, NaNs are kept where they split the line,
+    * nBins (int): number of equal-width bins between `x[0]` and `x[-1]`.
+
+    Returns
+    -------
+    Sorted int64 numpy.ndarray with at most 4*`nBins` indices.
+    """
+    x=_numeric(x)
+    y=numpy.asarray(y,dtype=float)
+    if x.size<=4*nBins:
+        return numpy.arange(x.size)
+    span=x[-1]-x[0]
+    bins=numpy.zeros(x.size,dtype=numpy.int64) if span<=0 else \
+         numpy.minimum(((x-x[0])/span*nBins).astype(numpy.int64),nBins-1)
+    starts=numpy.flatnonzero(numpy.r_[True,bins[1:]!=bins[:-1]])
+    ends=numpy.r_[starts[1:],x.size]-1
+    extremes=[]
+    for fill,reduce in ((numpy.inf,numpy.minimum),(-numpy.inf,numpy.maximum)):
+        values=numpy.where(numpy.isnan(y),fill,y)
+        extreme=reduce.reduceat(values,starts) # Contiguous bins.
+        hits=numpy.flatnonzero(values==extreme[bins])
+        extremes.append(hits[numpy.r_[True,bins[hits][1:]!=bins[hits][:-1]]])
+    lowest,highest=extremes
+    gaps=numpy.flatnonzero(numpy.isnan(y)) # Keep the breaks in the line.
+    return numpy.unique(numpy.concatenate([starts,ends,lowest,highest,gaps]))
+
+def lttbIndices(x,y,nOut):
+    """ Indices of `nOut` points picked with Largest-Triangle-Three-Buckets.
+
+    Args
+    -------
+    * x - (N,) increasing abscissae, numbers or datetimes,
+    * y - (N,) finite ordinates,
+    * nOut (int): number of points to keep, including the first and the last.
+
+    Returns
+    -------
+    Sorted int64 numpy.ndarray with min(N,`nOut`) indices.
+    """
+    x=_numeric(x)
+    y=numpy.asarray(y,dtype=float)
+    if x.size<=nOut or nOut<3:
+        return numpy.arange(x.size)
+    # Buckets of the points between the first and the last one.
+    edges=numpy.floor(numpy.linspace(1,x.size-1,nOut-1)).astype(numpy.int64)
+    kept=numpy.empty(nOut,dtype=numpy.int64)
+    kept[0],kept[-1]=0,x.size-1
+    for i in range(nOut-2):
+        lo,hi=edges[i],edges[i+1]
+        # Average of the next bucket, or the last point.
+        nextLo,nextHi=(edges[i+1],edges[i+2]) if i+2<edges.size else (x.size-1,x.size)
+        xc,yc=x[nextLo:nextHi].mean(),y[nextLo:nextHi].mean()
+        a=kept[i]
+        area=numpy.abs((x[a]-xc)*(y[lo:hi]-y[a])-(x[a]-x[lo:hi])*(yc-y[a]))
+        kept[i+1]=lo+area.argmax()
+    return kept
+
+def pixelWidth(ax):
+    """ Width of axes `ax` in pixels of the saved figure, see
+    :func:`export.pixelScale`. """
+    width=ax.get_window_extent().width*export.pixelScale(ax.figure)
+    return max(int(numpy.ceil(width)),1)
+
+def plotSeries(ax,x,y,*args,method='minmax',**kwargs):
+    """ Plot a long series on `ax` with at most a few points per pixel column.
+
+    Args
+    -------
+    * ax - :class:`matplotlib.axes.Axes` to plot on,
+    * x, y - (N,) series, `x` increasing,
+    * method (str): 'minmax' for :func:`minMaxIndices`, which looks the same
+      as plotting all the points, or 'lttb' for :func:`lttbIndices`,
+    * args, kwargs - passed to :meth:`matplotlib.axes.Axes.plot`.
+
+    Returns
+    -------
+    List of :class:`matplotlib.lines.Line2D` like :meth:`matplotlib.axes.Axes.plot`.
+    """
+    x=numpy.asarray(x)
+    y=numpy.asarray(y)
+    pixels=pixelWidth(ax)
+    if method=='minmax':
+        i=minMaxIndices(x,y,pixels//PIXELS_PER_BIN)
+    elif method=='lttb':
+        i=lttbIndices(x,y,2*pixels)
+    else:
+        raise ValueError("Unknown method {}, use 'minmax' or 'lttb'".format(method))
+    return ax.plot(x[i],y[i],*args,**kwargs)
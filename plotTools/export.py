@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Batch export mode shared by all the plotting scripts.
+
+By default the scripts show their figures. Set the `XKCD_EXPORT` environment
+variable to a comma-separated list of formats, e.g. `png,svg,pdf`, to save the
+figures straight to files with the Agg backend instead. No GUI backend is
+imported and no windows are opened, so this works on headless machines::
+
+    XKCD_EXPORT=png,pdf XKCD_OUTPUT_DIR=out XKCD_DPI=150 python gettingOld.py
+
+* `XKCD_EXPORT` - formats to save the figures in, empty to show them,
+* `XKCD_OUTPUT_DIR` - where to save the figures, defaults to the CWD,
+* `XKCD_DPI` - resolution of the saved figures, defaults to the figure DPI.
+
+The xkcd jitter of the saved figures is precomputed with a fixed seed, see
+:mod:`plotTools.sketch`, so the same data always give the same files. Figures
+whose inputs didn't change are copied from :mod:`plotTools.figureCache`
+instead of being rendered again, see :func:`cached` and :func:`render`.
+
+This module has to be imported before :mod:`matplotlib.pyplot` for the
+backend to be selected before pyplot loads one.
+
+@author: Alek
+"""
+import matplotlib, os, contextlib
+from .sketch import freezeSketch, SEED
+from . import figureCache
+
+SUPPORTED_FORMATS=('png','svg','pdf','eps','ps') # Agg can save all of them.
+
+FORMATS=[fmt.strip().lower() for fmt in os.environ.get('XKCD_EXPORT','').split(',')
+         if fmt.strip()]
+OUTPUT_DIR=os.environ.get('XKCD_OUTPUT_DIR','.')
+DPI=float(os.environ['XKCD_DPI']) if os.environ.get('XKCD_DPI') else None
+EXPORTING=len(FORMATS)>0 # Whether we're in the batch export mode.
+
+_PENDING={} # Hashes of the figures to cache when they're saved, by name.
+_RENDER_DPI=[None] # Resolution of the figure being rendered, see savingAt().
+
+for fmt in FORMATS:
+    if not fmt in SUPPORTED_FORMATS:
+        raise ValueError('Unsupported XKCD_EXPORT format {}, use one of {}'.format(
+                         fmt,', '.join(SUPPORTED_FORMATS)))
+
+if EXPORTING: # Before pyplot picks an interactive backend.
+    matplotlib.use('Agg')
+
+@contextlib.contextmanager
+def savingAt(dpi):
+    """ Context in which the figures are plotted to be saved at `dpi`, e.g.
+    by :func:`plotTools.renderFigures`, which overrides :data:`DPI`. """
+    _RENDER_DPI.append(dpi)
+    try:
+        yield
+    finally:
+        _RENDER_DPI.pop()
+
+def pixelScale(fig):
+    """ Pixels of the saved `fig` per pixel of its canvas, e.g. to tie the
+    level of detail to the saved figure, see :func:`savingAt` and :data:`DPI`. """
+    dpi=_RENDER_DPI[-1]
+    if dpi is None and EXPORTING:
+        dpi=DPI
+    return 1. if dpi in (None,'figure') else float(dpi)/fig.dpi
+
+def fileNames(name,formats=None,outputDir=None):
+    """ Get the files where figure `name` is saved in the batch export mode.
+
+    Args
+    -------
+    * name (str): file name of the figure without the extension,
+    * formats (list of str): defaults to :data:`FORMATS`,
+    * outputDir (str): defaults to :data:`OUTPUT_DIR`.
+    """
+    formats=FORMATS if formats is None else formats
+    outputDir=OUTPUT_DIR if outputDir is None else outputDir
+    return [os.path.join(outputDir,'{}.{}'.format(name,fmt)) for fmt in formats]
+
+def show(fig,name):
+    """ Show `fig` or, in the batch export mode, save and close it.
+
+    Args
+    -------
+    * fig - :class:`matplotlib.figure.Figure` to show or save,
+    * name (str): file name of the figure without the extension.
+
+    Returns
+    -------
+    List of the files the figure was saved to, empty if it was shown.
+    """
+    if not EXPORTING:
+        fig.show()
+        return []
+    import matplotlib.pyplot
+    os.makedirs(OUTPUT_DIR,exist_ok=True)
+    fNames=fileNames(name)
+    freezeSketch(fig,dpi=DPI) # Once for all the formats.
+    for fName in fNames:
+        fig.savefig(fName,dpi='figure' if DPI is None else DPI)
+    matplotlib.pyplot.close(fig)
+    if name in _PENDING:
+        figureCache.store(_PENDING.pop(name),fNames)
+    return fNames
+
+def cached(name,inputs=(),**params):
+    """ Restore figure `name` from the cache in the batch export mode.
+
+    If the figure isn't cached, it will be cached when :func:`show` saves it.
+    Scripts that plot at the module level can skip the plotting with::
+
+        if export.cached('A',inputs=[__file__]): raise SystemExit
+
+    Args
+    -------
+    * name (str): file name of the figure without the extension,
+    * inputs (list of str): files whose contents define the figure, e.g. the
+      script and its data,
+    * params - anything else that defines the figure, see
+      :func:`plotTools.figureCache.figureKey`.
+
+    Returns
+    -------
+    Whether the figure was copied from the cache to :func:`fileNames`.
+    """
+    if not EXPORTING or figureCache.CACHE_DIR is None:
+        return False
+    key=figureCache.figureKey(name,FORMATS,DPI,SEED,params,inputs=inputs)
+    os.makedirs(OUTPUT_DIR,exist_ok=True)
+    if figureCache.fetch(key,fileNames(name)):
+        return True
+    _PENDING[name]=key
+    return False
+
+def render(name,function,kwargs=None,inputs=()):
+    """ Plot figure `name` with `function` and :func:`show` it, unless cached.
+
+    Args
+    -------
+    * name (str): file name of the figure without the extension,
+    * function - callable that returns a :class:`matplotlib.figure.Figure`,
+    * kwargs (dict): kwargs of `function`,
+    * inputs (list of str): files whose contents define the figure besides
+      the source of `function`.
+
+    Returns
+    -------
+    List of the files the figure was saved to, empty if it was shown.
+    """
+    kwargs={} if kwargs is None else kwargs
+    if cached(name,inputs,function=function,kwargs=kwargs):
+        return fileNames(name)
+    return show(function(**kwargs),name)
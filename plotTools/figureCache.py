@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed cache of the rendered figures.
+
+A figure is identified by the SHA-1 hash of everything that goes into it:
+
+* the contents of its input files, e.g. the shapefiles, XLS or CSV, and of the
+  source file of the function that plots it,
+* the contents of the sources of :mod:`plotTools`, which draw and save it,
+* its parameters, including NumPy arrays, by value,
+* the versions of Python and the plotting libraries.
+
+The saved files are kept in :data:`CACHE_DIR` under their hashes. When a
+figure with the same hash is requested again, the cached files are copied to
+where they'd be saved instead of rendering it.
+
+* `XKCD_CACHE_DIR` - where to cache the figures, defaults to `.figureCache`
+  in the CWD, empty not to cache them.
+
+@author: Alek
+"""
+import numpy, os, sys, json, shutil, hashlib, inspect, importlib.metadata
+
+CACHE_DIR=os.environ.get('XKCD_CACHE_DIR','.figureCache') or None
+# Distributions whose versions change the figures, if they're installed.
+LIBRARIES=('matplotlib','numpy','pandas','pyshp','Pillow')
+
+# Input files are identified relative to this dir, so keys don't depend on the checkout.
+REPO_DIR=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_DIGESTS={} # Hashes of the files read so far, keyed by their size and mtime.
+
+def libraryVersions():
+    """ Versions of Python and of the installed :data:`LIBRARIES`. """
+    versions={'python':sys.version}
+    for library in LIBRARIES:
+        try:
+            versions[library]=importlib.metadata.version(library)
+        except importlib.metadata.PackageNotFoundError:
+            pass
+    return versions
+
+def fileDigest(fName):
+    """ SHA-1 hash of the contents of file `fName`, hashed once per process. """
+    stat=os.stat(fName)
+    key=(os.path.abspath(fName),stat.st_size,stat.st_mtime_ns)
+    if not key in _DIGESTS:
+        digest=hashlib.sha1()
+        with open(fName,'rb') as dataFile:
+            for chunk in iter(lambda: dataFile.read(1<<20),b''):
+                digest.update(chunk)
+        _DIGESTS[key]=digest.hexdigest()
+    return _DIGESTS[key]
+
+def sourceDigests():
+    """ Hashes of the sources of :mod:`plotTools` keyed by the module name. """
+    packageDir=os.path.dirname(os.path.abspath(__file__))
+    return {fName:fileDigest(os.path.join(packageDir,fName))
+            for fName in sorted(os.listdir(packageDir)) if fName.endswith('.py')}
+
+def _inputName(fName):
+    """ Name of input file `fName` relative to :data:`REPO_DIR`, or its base
+    name if it's elsewhere, e.g. in a data directory. """
+    relative=os.path.relpath(os.path.abspath(fName),REPO_DIR)
+    if relative.startswith(os.pardir):
+        return os.path.basename(fName)
+    return relative.replace(os.sep,'/')
+
+def _update(digest,value):
+    """ Add `value` to `digest`, recursing into containers. """
+    array=getattr(value,'array',None) # E.g. SharedArray.
+    if isinstance(array,numpy.ndarray):
+        value=array
+    if isinstance(value,numpy.ndarray):
+        value=numpy.ascontiguousarray(value)
+        digest.update('ndarray{}{}'.format(value.dtype.str,value.shape).encode())
+        if value.dtype.hasobject:
+            _update(digest,value.tolist())
+        else:
+            digest.update(value.tobytes())
+    elif isinstance(value,dict):
+        digest.update(b'dict')
+        for key in sorted(value,key=repr):
+            _update(digest,key)
+            _update(digest,value[key])
+    elif isinstance(value,(list,tuple)):
+        digest.update('{}{}'.format(type(value).__name__,len(value)).encode())
+        for item in value:
+            _update(digest,item)
+    elif callable(value) and hasattr(value,'__qualname__'):
+        # The function and the code that defines it.
+        digest.update('{}.{}'.format(value.__module__,value.__qualname__).encode())
+        source=inspect.getsourcefile(value) if not inspect.isbuiltin(value) else None
+        if source is not None and os.path.isfile(source):
+            digest.update(fileDigest(source).encode())
+    else:
+        digest.update(repr(value).encode())
+
+def figureKey(*params,inputs=()):
+    """ Hash of a figure.
+
+    Args
+    -------
+    * params - anything that defines the figure, e.g. the plotting function,
+      its kwargs, DPI and format,
+    * inputs (list of str): files whose contents define the figure, wherever
+      they are.
+
+    Returns
+    -------
+    Hexadecimal SHA-1 hash.
+    """
+    digest=hashlib.sha1()
+    _update(digest,json.dumps(libraryVersions(),sort_keys=True))
+    _update(digest,sourceDigests())
+    _update(digest,list(params))
+    for name,fName in sorted((_inputName(fName),fName) for fName in inputs):
+        digest.update(name.encode()+fileDigest(fName).encode())
+    return digest.hexdigest()
+
+def _cacheFile(key,fName,cacheDir):
+    """ Cached copy of `fName`, which has the format of its extension. """
+    return os.path.join(cacheDir,key+os.path.splitext(fName)[1].lower())
+
+def fetch(key,fileNames,cacheDir=CACHE_DIR):
+    """ Copy the cached figure `key` to `fileNames` if it's cached in all of them.
+
+    Returns
+    -------
+    Whether the figure was cached.
+    """
+    if cacheDir is None:
+        return False
+    cached=[_cacheFile(key,fName,cacheDir) for fName in fileNames]
+    if not all(os.path.isfile(fName) for fName in cached):
+        return False
+    for source,fName in zip(cached,fileNames):
+        shutil.copyfile(source,fName)
+    return True
+
+def store(key,fileNames,cacheDir=CACHE_DIR):
+    """ Add the saved figure `key` in `fileNames` to the cache. """
+    if cacheDir is None:
+        return
+    os.makedirs(cacheDir,exist_ok=True)
+    for fName in fileNames:
+        cached=_cacheFile(key,fName,cacheDir)
+        # Copy to a temporary file first not to leave a half-written figure.
+        temporary='{}.{}.tmp'.format(cached,os.getpid())
+        shutil.copyfile(fName,temporary)
+        os.replace(temporary,cached)
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Render independent figures to files in a pool of processes.
+
+Every figure is described by a :class:`FigureSpec` - a module-level function
+that returns a :class:`matplotlib.figure.Figure`, its kwargs and the file name
+where to save it. The workers use the Agg backend, so no GUI is needed.
+
+Large arrays shouldn't be pickled for every figure. Wrap them in
+:class:`SharedArray` instead and the workers will get views of the same
+shared memory block.
+
+@author: Alek
+"""
+import numpy, collections, multiprocessing
+from multiprocessing import shared_memory
+from .sketch import freezeSketch, SEED
+from . import figureCache, export
+
+FigureSpec=collections.namedtuple('FigureSpec',['function','kwargs','fileName','inputs'],
+                                  defaults=((),))
+FigureSpec.__doc__=""" Figure to render with :func:`renderFigures`.
+
+* function - module-level callable that accepts `kwargs` and returns a
+  :class:`matplotlib.figure.Figure`,
+* kwargs (dict): kwargs of `function`, :class:`SharedArray` values are
+  replaced by their arrays in the worker,
+* fileName (str or list of str): where to save the figure, the format follows
+  the extension. The figure is saved to every file in a list,
+* inputs (list of str): files whose contents define the figure besides the
+  source of `function`, e.g. data files, see :mod:`plotTools.figureCache`.
+"""
+
+class SharedArray(object):
+    """ NumPy array in shared memory that is passed to other processes by name.
+
+    Attributes
+    -------
+    * array - :class:`numpy.ndarray` view of the shared memory block,
+    * name (str): name of the shared memory block.
+    """
+    def __init__(self,array):
+        """
+        Args
+        -------
+        * array - array to copy into a new shared memory block.
+        """
+        array=numpy.ascontiguousarray(array)
+        self._shm=shared_memory.SharedMemory(create=True,size=max(array.nbytes,1))
+        self.name=self._shm.name
+        self.array=numpy.ndarray(array.shape,dtype=array.dtype,buffer=self._shm.buf)
+        self.array[...]=array
+        self._owner=True
+
+    def __getstate__(self):
+        return dict(name=self.name,shape=self.array.shape,dtype=self.array.dtype.str)
+
+    def __setstate__(self,state):
+        # Workers share the resource tracker of the parent, which unlinks the
+        # block if the parent dies without calling unlink.
+        self._shm=shared_memory.SharedMemory(name=state['name'])
+        self.name=state['name']
+        self.array=numpy.ndarray(state['shape'],dtype=numpy.dtype(state['dtype']),
+                                 buffer=self._shm.buf)
+        self._owner=False
+
+    def unlink(self):
+        """ Free the shared memory block, only in the process that created it. """
+        if self._owner:
+            self.array=None # Release the buffer before closing.
+            self._shm.close()
+            self._shm.unlink()
+            self._owner=False
+
+def _initWorker(xkcd,rc):
+    """ Set up matplotlib in a worker process. """
+    import matplotlib
+    matplotlib.use('Agg',force=True)
+    import matplotlib.pyplot
+    if xkcd: matplotlib.pyplot.xkcd()
+    matplotlib.rcParams.update(rc)
+
+def _renderFigure(spec,dpi):
+    """ Render one :class:`FigureSpec` to its files and return their names. """
+    import matplotlib.pyplot
+    kwargs={key:value.array if isinstance(value,SharedArray) else value
+            for key,value in spec.kwargs.items()}
+    with export.savingAt(dpi): # E.g. for the level of detail.
+        fig=spec.function(**kwargs)
+    fNames=[spec.fileName] if isinstance(spec.fileName,str) else spec.fileName
+    freezeSketch(fig,dpi=dpi)
+    for fName in fNames:
+        fig.savefig(fName,dpi=dpi)
+    matplotlib.pyplot.close(fig)
+    return spec.fileName
+
+def renderFigures(specs,processes=None,dpi=None,xkcd=True,rc=None,cache=True):
+    """ Render `specs` to their files in a pool of processes.
+
+    Args
+    -------
+    * specs - sequence of :class:`FigureSpec` to render,
+    * processes (int): number of worker processes, defaults to the number of
+      CPUs. With 1 the figures are rendered in this process with the current
+      backend,
+    * dpi (float): resolution of the figures, defaults to the figure DPI,
+    * xkcd (bool): whether to render in the xkcd style,
+    * rc (dict): matplotlib rcParams to set in the workers, e.g. font sizes,
+    * cache (bool): whether to copy the figures whose `function`, `kwargs`,
+      `inputs` and settings didn't change from :mod:`plotTools.figureCache`
+      instead of rendering them.
+
+    Returns
+    -------
+    List with the `fileName` of every spec, in the order of `specs`.
+    """
+    specs=list(specs)
+    rc={} if rc is None else rc
+    dpi='figure' if dpi is None else dpi
+    keys={}
+    if cache and figureCache.CACHE_DIR is not None:
+        for i,spec in enumerate(specs):
+            key=figureCache.figureKey(spec.function,spec.kwargs,dpi,xkcd,rc,SEED,
+                                      inputs=spec.inputs)
+            fNames=[spec.fileName] if isinstance(spec.fileName,str) else spec.fileName
+            if not figureCache.fetch(key,fNames):
+                keys[i]=key
+    else:
+        keys={i:None for i in range(len(specs))}
+    toRender=[specs[i] for i in sorted(keys)]
+
+    processes=min(multiprocessing.cpu_count() if processes is None else processes,
+                  max(len(toRender),1))
+    if not toRender:
+        pass # All cached.
+    elif processes<=1:
+        import matplotlib, matplotlib.pyplot
+        with matplotlib.rc_context():
+            if xkcd: matplotlib.pyplot.xkcd()
+            matplotlib.rcParams.update(rc)
+            for spec in toRender: _renderFigure(spec,dpi)
+    else:
+        with multiprocessing.Pool(processes,initializer=_initWorker,
+                                  initargs=(xkcd,rc)) as pool:
+            pool.starmap(_renderFigure,[(spec,dpi) for spec in toRender],chunksize=1)
+
+    for i,key in keys.items():
+        if key is not None:
+            fNames=[specs[i].fileName] if isinstance(specs[i].fileName,str) \
+                   else specs[i].fileName
+            figureCache.store(key,fNames)
+    return [spec.fileName for spec in specs]
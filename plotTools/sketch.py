@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Precompute the xkcd sketch jitter of the figures once, with a seeded RNG.
+
+:func:`matplotlib.pyplot.xkcd` sets `path.sketch`, so Agg cuts every path of
+every artist into one-pixel segments and displaces them at random each time the
+figure is drawn, e.g. once per saved format. :func:`freezeSketch` applies the
+same displacement to the vertices of the lines, line collections and patches
+of a figure in NumPy instead, and turns their sketch off. The drawn paths are
+then plain, so repeated renders are cheaper, and the jitter is the same in all
+the saved formats.
+
+The displacement follows Agg's `PathSketcher`: the phase of a sine advances by
+a random step at every segment and the vertex is moved perpendicular to the
+segment by `scale` times the sine.
+
+@author: Alek
+"""
+import numpy
+
+SEED=0 # Seed of the jitter, the same figure always looks the same.
+
+def sketchPolyline(xy,scale=1.,length=100.,randomness=2.,rng=None,phase=0.):
+    """ Cut a polyline into one-pixel segments and jitter it like Agg.
+
+    Args
+    -------
+    * xy - (N,2) vertices in pixels,
+    * scale (float): amplitude of the jitter in pixels,
+    * length (float): length of the wiggle along the line in pixels,
+    * randomness (float): scale factor by which the length is shrunk or expanded,
+      the defaults are those of :func:`matplotlib.pyplot.xkcd`,
+    * rng - :class:`numpy.random.Generator`, seeded with :data:`SEED` if None,
+    * phase (float): phase of the wiggle at the first vertex.
+
+    Returns
+    -------
+    2-tuple with the (M,2) jittered vertices in pixels and the phase at the
+    last one, to continue the next polyline of the same path with.
+    """
+    rng=numpy.random.default_rng(SEED) if rng is None else rng
+    xy=numpy.asarray(xy,dtype=float)
+    if xy.shape[0]<2:
+        return xy.copy(),phase
+    d=numpy.diff(xy,axis=0)
+    n=numpy.maximum(numpy.ceil(numpy.hypot(d[:,0],d[:,1])).astype(numpy.int64),1)
+    # Points at 1/n, 2/n, ..., 1 of every segment, after the first vertex.
+    segment=numpy.repeat(numpy.arange(d.shape[0]),n)
+    step=numpy.arange(n.sum())-numpy.repeat(numpy.cumsum(n)-n,n)+1
+    points=numpy.vstack([xy[:1],xy[segment]+d[segment]*(step/n[segment])[:,None]])
+
+    phases=phase+numpy.cumsum(numpy.exp(rng.random(points.shape[0]-1)*
+                                        2*numpy.log(randomness)))
+    r=numpy.sin(phases*2*numpy.pi/(length*randomness))*scale
+    num=points[:-1,1]-points[1:,1]
+    den=points[:-1,0]-points[1:,0]
+    segmentLength=numpy.hypot(num,den)
+    ratio=numpy.divide(r,segmentLength,out=numpy.zeros_like(r),where=segmentLength>0)
+    jittered=points.copy()
+    jittered[1:,0]+=ratio*num
+    jittered[1:,1]-=ratio*den
+    return jittered,phases[-1]
+
+def _sketchParts(parts,transform,params,rng,pixels=1.):
+    """ Jitter polylines in the coordinates of `transform`, see :func:`sketchPolyline`. """
+    inverse=transform.inverted()
+    phase=0.
+    sketched=[]
+    for xy in parts:
+        if xy.shape[0]<2: # Nothing to jitter.
+            sketched.append(xy)
+            continue
+        display=transform.transform(xy)*pixels
+        display,phase=sketchPolyline(display,*params,rng=rng,phase=phase)
+        sketched.append(inverse.transform(display/pixels))
+    return sketched
+
+def _splitNaN(xy):
+    """ Split (N,2) `xy` at the NaNs like :class:`matplotlib.lines.Line2D` does. """
+    finite=numpy.isfinite(xy).all(axis=1)
+    breaks=numpy.flatnonzero(numpy.diff(finite.astype(numpy.int8))!=0)+1
+    return [part for part in numpy.split(xy,breaks) if numpy.isfinite(part).all()]
+
+def freezeSketch(fig,seed=SEED,dpi=None):
+    """ Precompute the sketch jitter of the artists of `fig` and turn it off.
+
+    Lines, line collections and patches of all the axes are jittered; markers,
+    text and axes decorations are left to Agg. Lines with markers are split
+    into a jittered line and a copy with only the markers, so the markers stay
+    at the data points. Call this when the figure is
+    complete, i.e. right before saving it, because the jitter is computed in
+    pixels. The figure is laid out first, e.g. the boxes or the limits of the
+    axes with a fixed aspect are adjusted, so the jitter is computed with the
+    transforms it's drawn with. The axis limits are then fixed so the jitter
+    doesn't change them.
+
+    Args
+    -------
+    * fig - :class:`matplotlib.figure.Figure` to freeze,
+    * seed (int): seed of the jitter,
+    * dpi (float): resolution at which the figure will be saved, defaults to
+      the figure DPI.
+
+    Returns
+    -------
+    Number of artists that were frozen.
+    """
+    import matplotlib.lines, matplotlib.collections, matplotlib.patches, matplotlib.path, \
+           matplotlib.transforms
+    rng=numpy.random.default_rng(seed)
+    pixels=1. if dpi in (None,'figure') else float(dpi)/fig.dpi
+    frozen=0
+    fig.draw_without_rendering() # Apply the aspects and the layout.
+    for ax in fig.axes:
+        ax.set_xlim(ax.get_xlim())
+        ax.set_ylim(ax.get_ylim())
+        for artist in list(ax.lines)+list(ax.collections)+list(ax.patches):
+            params=artist.get_sketch_params()
+            if params is None:
+                continue
+            if isinstance(artist,matplotlib.lines.Line2D):
+                if artist.get_linestyle() in ('None',' ','') or artist.get_linewidth()==0:
+                    continue # Only markers.
+                if artist.get_marker() not in ('None',' ','',None):
+                    markers=matplotlib.lines.Line2D(*artist.get_data())
+                    markers.update_from(artist)
+                    markers.set_linestyle('None')
+                    markers.set_zorder(artist.get_zorder())
+                    markers.set_label('_'+artist.get_label()) # Not in legends.
+                    ax.add_line(markers)
+                    artist.set_marker('None')
+                parts=_sketchParts(_splitNaN(artist.get_xydata()),artist.get_transform(),
+                                   params,rng,pixels)
+                xy=numpy.vstack(sum([[part,[[numpy.nan,numpy.nan]]] for part in parts],
+                                    [])[:-1]) if parts else numpy.empty((0,2))
+                artist.set_data(xy[:,0],xy[:,1])
+            elif isinstance(artist,matplotlib.collections.LineCollection):
+                segments=[numpy.asarray(s,dtype=float).reshape(-1,2) # Empty if all NaN.
+                          for s in artist.get_segments()]
+                artist.set_segments(_sketchParts(segments,artist.get_transform(),params,
+                                                 rng,pixels))
+            elif isinstance(artist,matplotlib.patches.Patch):
+                # Linearise the curves in pixels, not in the data units.
+                parts=_sketchParts(artist.get_path().to_polygons(artist.get_transform(),
+                                   closed_only=False),matplotlib.transforms.IdentityTransform(),
+                                   params,rng,pixels)
+                parts=[ax.transData.inverted().transform(part) for part in parts]
+                if not parts:
+                    continue
+                # Patches can't all change their paths, so replace them.
+                patch=matplotlib.patches.PathPatch(matplotlib.path.Path.make_compound_path(
+                                                   *[matplotlib.path.Path(p) for p in parts]))
+                patch.update_from(artist)
+                patch.set_transform(ax.transData)
+                patch.set_zorder(artist.get_zorder())
+                patch.set_label(artist.get_label())
+                artist.remove()
+                ax.add_patch(patch)
+                artist=patch
+            else:
+                continue
+            artist.set_sketch_params(None)
+            frozen+=1
+    return frozen
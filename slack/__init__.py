@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming, storing and aggregating the Slack analytics exports that
+slack/slack.py plots.
+
+@author: Alek
+"""
+from .ingest import readChunks, loadMessages, loadChannels, loadUsers
+from .store import Store, exportDate, weekEnd
+from .cube import periodStart, aggregate
+from .cohorts import dayNumbers, ages, monthCohorts, ageCohorts, groupStats, activityStats
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Ages and cohorts of the Slack users and channels.
+
+Creation dates are kept as int64 day numbers, i.e. days since 1970-01-01, so
+the ages, cohorts and statistics of activity against age are integer NumPy
+operations on whole arrays, without any datetime objects:
+
+    created=cohorts.dayNumbers(dfUsr['Account Creation Date'])
+    age=cohorts.ages(created,'2018-08-15')
+    stats=cohorts.activityStats(age,dfUsr['chats_sent'],edges=[0,90,180,365])
+
+@author: Alek
+"""
+import pandas, numpy
+
+PERCENTILES=(10,25,50,75,90) # Percentiles of activity in every cohort.
+
+def dayNumbers(dates):
+    """ Days since 1970-01-01 of `dates`.
+
+    Args
+    -------
+    * dates - array-like of dates or strings accepted by :func:`numpy.datetime64`,
+      or a single one.
+
+    Returns
+    -------
+    numpy.ndarray of int64 day numbers, same shape as `dates`.
+    """
+    dates=numpy.asarray(dates)
+    if dates.dtype.kind!='M':
+        dates=pandas.to_datetime(dates.ravel()).to_numpy().reshape(dates.shape)
+    return dates.astype('datetime64[D]').astype(numpy.int64)
+
+def ages(created,reference):
+    """ Ages in days on `reference` of things created on day numbers `created`.
+
+    Args
+    -------
+    * created - (N,) int64 day numbers, see :func:`dayNumbers`,
+    * reference - date at which to compute the ages, e.g. of the export.
+
+    Returns
+    -------
+    (N,) int64 numpy.ndarray, negative for things created after `reference`.
+    """
+    return dayNumbers(reference)-numpy.asarray(created,dtype=numpy.int64)
+
+def monthCohorts(created):
+    """ Months since 1970-01 in which day numbers `created` fall, as int64. """
+    return numpy.asarray(created,dtype=numpy.int64).astype('datetime64[D]').astype(
+        'datetime64[M]').astype(numpy.int64)
+
+def ageCohorts(age,edges):
+    """ Index of the age bucket of every one of `age`.
+
+    Args
+    -------
+    * age - (N,) ages in days,
+    * edges - (K+1,) increasing edges of K buckets, left-closed.
+
+    Returns
+    -------
+    (N,) int64 numpy.ndarray with bucket indices, -1 outside the edges.
+    """
+    edges=numpy.asarray(edges)
+    bucket=numpy.searchsorted(edges,age,side='right')-1
+    return numpy.where((bucket>=0) & (bucket<edges.size-1),bucket,-1).astype(numpy.int64)
+
+def groupStats(groups,values,percentiles=PERCENTILES):
+    """ Count, mean and percentiles of `values` in every group.
+
+    Args
+    -------
+    * groups - (N,) integer group of every value, negative ones are skipped,
+    * values - (N,) values, e.g. messages sent,
+    * percentiles (tuple of float): percentiles to compute, linearly
+      interpolated like :func:`numpy.percentile`.
+
+    Returns
+    -------
+    :class:`pandas.DataFrame` indexed by the groups with 'count', 'mean' and
+    one 'pX' column per percentile, e.g. 'p50' for the median.
+    """
+    groups=numpy.asarray(groups,dtype=numpy.int64)
+    values=numpy.asarray(values,dtype=float)
+    keep=groups>=0
+    groups,values=groups[keep],values[keep]
+    order=numpy.lexsort((values,groups)) # Sorted by group, then value.
+    groups,values=groups[order],values[order]
+    labels,starts,counts=numpy.unique(groups,return_index=True,return_counts=True)
+
+    stats={'count':counts}
+    with numpy.errstate(invalid='ignore'):
+        stats['mean']=numpy.add.reduceat(values,starts)/counts if labels.size else \
+                      numpy.zeros(0)
+    for q in percentiles:
+        position=(counts-1)*q/100.
+        lower=numpy.floor(position).astype(numpy.int64)
+        upper=numpy.minimum(lower+1,counts-1)
+        weight=position-lower
+        stats['p{:g}'.format(q)]=(values[starts+lower]*(1-weight)+
+                                  values[starts+upper]*weight)
+    return pandas.DataFrame(stats,index=pandas.Index(labels,name='cohort'))
+
+def activityStats(age,activity,edges=None,percentiles=PERCENTILES):
+    """ Statistics of `activity` in age cohorts.
+
+    Args
+    -------
+    * age - (N,) ages in days, see :func:`ages`,
+    * activity - (N,) e.g. 'chats_sent' of users or 'Messages Posted' of channels,
+    * edges - (K+1,) edges of the age cohorts in days, one cohort by default,
+    * percentiles (tuple of float): percentiles to compute.
+
+    Returns
+    -------
+    :class:`pandas.DataFrame` indexed by the left edges of the cohorts, see
+    :func:`groupStats`.
+    """
+    age=numpy.asarray(age)
+    if edges is None:
+        groups=numpy.zeros(age.shape,dtype=numpy.int64)
+        edges=numpy.array([age.min() if age.size else 0])
+    else:
+        edges=numpy.asarray(edges)
+        groups=ageCohorts(age,edges)
+    stats=groupStats(groups,activity,percentiles)
+    stats.index=pandas.Index(edges[stats.index.to_numpy()],name='age')
+    return stats
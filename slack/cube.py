@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Aggregate cube of the daily Slack workspace metrics.
+
+Every plot and query used to resample the daily rows again. The cube holds
+the metrics at daily, weekly and monthly granularity, each period labelled
+with its last day like `resample`:
+
+* :data:`SUMS` - messages and files, summed over the period,
+* :data:`LEVELS` - members, active, posting, inactive and silent users, at the
+  end of the period and their means over it (with a ' (mean)' suffix),
+* :data:`RATIOS` - inactive and silent users over the members at the end of
+  the period,
+* 'Days' - number of days with data in the period.
+
+:mod:`store` keeps the cube up to date with the new exports.
+
+@author: Alek
+"""
+import pandas, numpy
+from . import ingest
+
+# Pandas frequencies of the granularities.
+GRANULARITIES={'D':'D','W':'W-SUN','M':'ME'}
+SUMS=ingest.SUM_COLUMNS
+LEVELS=ingest.DAILY_COLUMNS+['Inactive Users','Silent Users']
+RATIOS={'Inactive Ratio':('Inactive Users','Full Members'),
+        'Silent Ratio':('Silent Users','Full Members')}
+COLUMNS=SUMS+LEVELS+[c+' (mean)' for c in LEVELS]+list(RATIOS)+['Days']
+
+def periodStart(dates,granularity):
+    """ First day of the `granularity` periods of `dates`. """
+    dates=pandas.DatetimeIndex(dates).normalize()
+    if granularity=='W': # Weeks start on Mondays.
+        return dates-pandas.to_timedelta(dates.dayofweek,unit='D')
+    elif granularity=='M':
+        return dates-pandas.to_timedelta(dates.day-1,unit='D')
+    return dates
+
+def aggregate(daily,granularity):
+    """ Aggregate daily metrics into periods.
+
+    Args
+    -------
+    * daily (:class:`pandas.DataFrame`): indexed by date with :data:`SUMS` and
+      :data:`LEVELS` columns, e.g. from :meth:`store.Store.daily`,
+    * granularity (str): one of :data:`GRANULARITIES`.
+
+    Returns
+    -------
+    :class:`pandas.DataFrame` with :data:`COLUMNS` indexed by the last day of
+    every period. Periods without data have zero sums and NaN levels.
+    """
+    resampler=daily.resample(GRANULARITIES[granularity])
+    cube=pandas.concat([resampler[SUMS].sum(),resampler[LEVELS].last(),
+                        resampler[LEVELS].mean().add_suffix(' (mean)')],axis=1)
+    for ratio,(part,total) in RATIOS.items():
+        cube[ratio]=cube[part]/cube[total]
+    cube['Days']=resampler.size().astype(numpy.int64)
+    return cube[COLUMNS]
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming loader of the Slack analytics exports.
+
+The exports grow with every day, user and channel of the workspace, so they're
+read in chunks of rows with explicit dtypes and fixed date formats, and only
+the aggregates used in the plots are kept:
+
+* workspace export, e.g. SlackAnalytics03Aug2018.csv - one row per day, kept
+  as the daily user counts and weekly sums of the message counts,
+* channel export, e.g. ChannelAnalytics03Aug2018.csv - one row per channel,
+* user export, e.g. UserAnalytics03Aug2018.csv - one row per user.
+
+Channels and users are aggregated by their IDs, or by their names in the older
+exports without the ID columns, so memory scales with the number of distinct
+days, channels and users, not with the size of the files.
+
+@author: Alek
+"""
+import pandas, numpy
+
+CHUNK_SIZE=50000 # Rows read at once.
+
+DATE_FORMAT='%Y-%m-%d' # Dates in the workspace export, e.g. 2017-02-06.
+CREATED_FORMAT='%b %d, %Y' # Creation dates of channels and users, e.g. Feb 6, 2017.
+
+# Daily user counts of the workspace, kept as they are.
+DAILY_COLUMNS=['Full Members','Weekly Active Users','Weekly Users Posting Messages']
+# Daily counts of the workspace, which are summed over weeks.
+SUM_COLUMNS=['Messages in Public Channels','Messages in Private Channels',
+             'Messages in Shared Channels','Messages in DMs','Files Uploaded',
+             'Messages Posted']
+MESSAGE_DTYPES={column:numpy.int64 for column in DAILY_COLUMNS+SUM_COLUMNS}
+
+# Stable IDs of the channels and users, which survive renaming them. Exports
+# that don't have them are keyed by the names.
+CHANNEL_ID='Channel ID'
+USER_ID='User ID'
+
+CHANNEL_SUMS=['Messages Posted','Messages from Users']
+CHANNEL_DTYPES={CHANNEL_ID:str,'Name':str,'Total Channel Members':numpy.int64,
+                'Messages Posted':numpy.int64,'Messages from Users':numpy.int64}
+
+USER_SUMS=['chats_sent']
+USER_DTYPES={USER_ID:str,'Name':str,'chats_sent':numpy.int64}
+
+def readChunks(fName,dateColumn,dateFormat,dtypes,usecols=None,chunksize=CHUNK_SIZE):
+    """ Read a CSV export in chunks of rows with explicit types.
+
+    Args
+    -------
+    * fName: string or file-like object accepted by :func:`pandas.read_csv`,
+    * dateColumn (str): column with the dates, parsed with `dateFormat`,
+    * dateFormat (str): :func:`datetime.datetime.strptime` format of the dates,
+    * dtypes (dict): column names as keys and their types as values,
+    * usecols (list of str or callable): columns to read, or a function that
+      says whether to read a column with a given name, all of them by default,
+    * chunksize (int): number of rows to read at once.
+
+    Yields
+    -------
+    :class:`pandas.DataFrame` with at most `chunksize` rows.
+    """
+    with pandas.read_csv(fName,sep=',',header=0,dtype=dtypes,usecols=usecols,
+                         chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk[dateColumn]=pandas.to_datetime(chunk[dateColumn],format=dateFormat)
+            yield chunk
+
+def loadMessages(fName,freq='1W',chunksize=CHUNK_SIZE):
+    """ Read the workspace export and sum the messages over `freq` periods.
+
+    Args
+    -------
+    * fName: workspace export, e.g. SlackAnalytics03Aug2018.csv,
+    * freq (str): pandas frequency of the sums, weekly by default,
+    * chunksize (int): number of rows to read at once.
+
+    Returns
+    -------
+    2-tuple of :class:`pandas.DataFrame` indexed by date:
+
+    * daily :data:`DAILY_COLUMNS`,
+    * :data:`SUM_COLUMNS` summed over `freq`, same as `resample(freq).sum()`
+      of the whole export.
+    """
+    daily=[]
+    sums=None
+    for chunk in readChunks(fName,'Date',DATE_FORMAT,MESSAGE_DTYPES,
+                            usecols=['Date']+DAILY_COLUMNS+SUM_COLUMNS,
+                            chunksize=chunksize):
+        chunk=chunk.set_index('Date')
+        daily.append(chunk[DAILY_COLUMNS])
+        # A period can span two chunks, so add their partial sums.
+        part=chunk[SUM_COLUMNS].resample(freq).sum()
+        sums=part if sums is None else sums.add(part,fill_value=0).astype(numpy.int64)
+    if sums is None: # No rows.
+        empty=pandas.DatetimeIndex([],name='Date')
+        return (pandas.DataFrame({c:[] for c in DAILY_COLUMNS},index=empty,dtype=numpy.int64),
+                pandas.DataFrame({c:[] for c in SUM_COLUMNS},index=empty,dtype=numpy.int64))
+    # Periods between the chunks with no rows at all, which resample fills too.
+    sums=sums.resample(freq).sum()
+    return pandas.concat(daily).sort_index(),sums
+
+def _aggregate(fName,idColumn,dateColumn,dtypes,sums,chunksize):
+    """ Aggregate an export by `idColumn`, or by 'Name' if there's no such
+    column - latest 'Name', earliest `dateColumn` and sums of `sums`. """
+    columns=[idColumn,'Name',dateColumn]+sums
+    aggregation={'Name':'last',dateColumn:'min',**{c:'sum' for c in sums}}
+    total=None
+    for chunk in readChunks(fName,dateColumn,CREATED_FORMAT,dtypes,
+                            usecols=lambda c: c in columns,chunksize=chunksize):
+        ids=chunk[idColumn] if idColumn in chunk else chunk['Name']
+        part=chunk.groupby(ids.rename('ID')).agg(aggregation)
+        if total is None:
+            total=part
+        else: # Same ID in many chunks.
+            total=pandas.concat([total,part]).groupby(level=0).agg(aggregation)
+    if total is None:
+        total=pandas.DataFrame({'Name':numpy.array([],dtype=object),
+                                dateColumn:pandas.to_datetime([]),
+                                **{c:numpy.array([],dtype=numpy.int64) for c in sums}},
+                               index=pandas.Index([],name='ID'))
+    return total
+
+def loadChannels(fName,chunksize=CHUNK_SIZE):
+    """ Read the channel export.
+
+    Returns
+    -------
+    :class:`pandas.DataFrame` indexed by channel ID, see :data:`CHANNEL_ID`,
+    with the 'Name', 'Created' date and :data:`CHANNEL_SUMS` columns.
+    """
+    return _aggregate(fName,CHANNEL_ID,'Created',CHANNEL_DTYPES,CHANNEL_SUMS,chunksize)
+
+def loadUsers(fName,chunksize=CHUNK_SIZE):
+    """ Read the user export.
+
+    Returns
+    -------
+    :class:`pandas.DataFrame` indexed by user ID, see :data:`USER_ID`, with the
+    'Name', 'Account Creation Date' and :data:`USER_SUMS` columns.
+    """
+    return _aggregate(fName,USER_ID,'Account Creation Date',USER_DTYPES,USER_SUMS,
+                      chunksize)
@@ -7,7 +7,13 @@ read of Slack, the communication tool a few weeks before joining that project.
 So we gave it a shot. And it worked. Slack, the app that puts rovers on other
 planets (or satellites in low-Earth orbit).
 """
+import os, sys
+# plotTools and this package are in the root of the repo.
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),os.pardir))
+from plotTools import FigureSpec, SharedArray, renderFigures, plotSeries
+from plotTools import export # Before pyplot.
 import pandas, numpy, matplotlib.pyplot, matplotlib.ticker
+from slack import store, cohorts
 
 # Various font sizes.
 ticksFontSize=18
@@ -15,188 +21,241 @@ labelsFontSizeSmall=20
 labelsFontSize=30
 titleFontSize=34
 legendFontSize=20
-matplotlib.rc('xtick',labelsize=ticksFontSize) 
+matplotlib.rc('xtick',labelsize=ticksFontSize)
 matplotlib.rc('ytick',labelsize=ticksFontSize)
 
 matplotlib.pyplot.xkcd() # C'est le shit.
+# Annotations give dates as strings, which needs pandas' converters. Older
+# pandas registered them on import.
+pandas.plotting.register_matplotlib_converters()
 
-SAVEFIG=True # Automatically save figures to CWD?
+SAVEFIG=True # Automatically save figures to CWD? See also plotTools.export.
+PROCESSES=1 # >1 to render the figures to PNGs in parallel, without showing them.
+STORE_FILE='slack.sqlite' # Where the exports in the CWD are merged, see store.
+# Date at which to compute the channel and user ages, None for the newest export.
+REFERENCE_DATE='2018-08-15'
 
-# Read the data from the message, channel and user statistics files.
-dfMsg=pandas.read_csv('SlackAnalytics03Aug2018.csv',sep=',',header=0,
-                      # First column (date) should be the index to enable resampling.
-                      index_col=0,
-                      # Interpret column 0 as dates, which it is.
-                      parse_dates=[0],infer_datetime_format=True)
-dfMsg1WkSum=dfMsg.resample('1W').sum() # Weekly sum of messages.
+def plotMessageHistory(t,public,private,direct):
+    """ Plot weekly sums of messages in public and private channels and DMs. """
+    t=pandas.DatetimeIndex(t)
+    fig,ax=matplotlib.pyplot.subplots(1,1,figsize=(14,8))
+    plotSeries(ax,t,public,c='indigo',
+    	ls='-',lw=3,marker=None,label=r'$Public\ channel$')
+    plotSeries(ax,t,private,c='deepskyblue',
+    	ls='-',lw=3,marker=None,label=r'$Private\ channel$')
+    plotSeries(ax,t,direct,c='crimson',
+    	ls='-',lw=3,marker=None,label=r'$Direct\ messages$')
+    ax.set_axisbelow(True)
+    ax.set_xlabel(r'$Date\ (JST)$',fontsize=labelsFontSize)
+    ax.set_ylabel(r'$Weekly\ messages$',fontsize=labelsFontSize)
+    fig.subplots_adjust(left=0.1,right=0.95,bottom=0.15,top=0.84)
+    ax.legend(bbox_to_anchor=(0.5,1.23),loc='upper center',
+              prop={'size':legendFontSize},fancybox=True,shadow=True,ncol=3)
+    ax.grid(linewidth=1,linestyle=':',which='major')
+    ax.grid(linewidth=0.1,linestyle='--',which='minor')
+    ax.tick_params(axis='both',reset=False,which='both',length=5,width=1.5)
+    ax.annotate(r'$FM\ AIT$',size=ticksFontSize,xy=('2018-7-7',875),
+                xytext=('2018-3-1',800),arrowprops=dict(facecolor='black',shrink=0.05))
+    ax.annotate(r'$Bounenkai$',size=ticksFontSize,xy=('2018-1-4',70),
+                xytext=('2017-10-1',500),arrowprops=dict(facecolor='black',shrink=0.05))
+    ax.annotate(r'$CDR$',size=ticksFontSize,xy=('2018-5-20',510),
+                xytext=('2018-1-1',600),arrowprops=dict(facecolor='black',shrink=0.05))
+    ax.annotate(r'$Summer\ ends$',size=ticksFontSize,xy=('2017-10-28',210),
+                xytext=('2017-6-1',400),arrowprops=dict(facecolor='black',shrink=0.05))
+    ax.annotate(r'$PDR$',size=ticksFontSize,xy=('2017-8-8',170),
+                xytext=('2017-4-1',300),arrowprops=dict(facecolor='black',shrink=0.05))
+    fig.autofmt_xdate()
+    return fig
 
-dfCh =pandas.read_csv('ChannelAnalytics03Aug2018.csv',sep=',',header=0,index_col=1,
-	parse_dates=[1],infer_datetime_format=True)
-dfUsr=pandas.read_csv('UserAnalytics03Aug2018.csv',sep=',',header=0,index_col=0,
-	parse_dates=[2],infer_datetime_format=True)
+def plotUserNumberHistory(t,registered,active,posting):
+    """ Plot the user data. File data aren't so interesting. """
+    t=pandas.DatetimeIndex(t)
+    fig,ax=matplotlib.pyplot.subplots(1,1,figsize=(14,8))
+    # Plot files uploaded per week - filr data (users as well) are too noisy to be
+    # interpreted on the time scale of days.
+    #ax.plot(dfMsg1WkSum.index,dfMsg1WkSum['Files Uploaded'],c='indigo',
+    #	ls='-',lw=3,marker=None,label=r'$Files\ uploaded$')
+    # Have weekly user data from Slack, so plot that w/o resampling.
+    plotSeries(ax,t,registered,c='deepskyblue',
+    	ls='-',lw=3,marker=None,label=r'$Registered$')
+    plotSeries(ax,t,active,c='crimson',
+    	ls='-',lw=3,marker=None,label=r'$Active$')
+    plotSeries(ax,t,posting,c='gold',
+    	ls='-',lw=3,marker=None,label=r'$Posting$')
+    ax.set_axisbelow(True)
+    ax.set_xlabel(r'$Date\ (JST)$',fontsize=labelsFontSize)
+    ax.set_ylabel(r'$Weekly\ users$',fontsize=labelsFontSize)
+    fig.subplots_adjust(left=0.1,right=0.95,bottom=0.15,top=0.83)
+    ax.legend(bbox_to_anchor=(0.5,1.23),loc='upper center',
+              prop={'size':legendFontSize},fancybox=True,shadow=True,ncol=3)
+    ax.grid(linewidth=1,linestyle=':',which='major')
+    ax.grid(linewidth=0.1,linestyle='--',which='minor')
+    ax.tick_params(axis='both',reset=False,which='both',length=5,width=1.5)
+    ax.set_ylim(bottom=-20)
+    ax.annotate(r'$Bounenkai$',size=ticksFontSize,xy=('2018-1-4',2),
+                xytext=('2018-3-1',-10),arrowprops=dict(facecolor='black',shrink=0.05))
+    ax.annotate(r'$Obon$',size=ticksFontSize,xy=('2017-8-19',0),
+                xytext=('2017-6-1',-15),arrowprops=dict(facecolor='black',shrink=0.05))
+    fig.autofmt_xdate()
+    return fig
 
-# Plot the message data.
-public=dfMsg1WkSum['Messages in Public Channels']
-private=dfMsg1WkSum['Messages in Private Channels']
-direct=dfMsg1WkSum['Messages in DMs']
+def plotActiveSilentUserNumberHistory(t,registered,active,posting,inactive,silent):
+    """ Plot the inactive user numbers. """
+    t=pandas.DatetimeIndex(t)
+    lower=min(registered.min(),active.min(),posting.min())
+    # Will only subtract, so won't exceed the original no. users in any series.
+    upper=min(registered.max(),active.max(),posting.max())
 
-fig,ax=matplotlib.pyplot.subplots(1,1,figsize=(14,8))
-ax.plot(dfMsg1WkSum.index,public,c='indigo',
-	ls='-',lw=3,marker=None,label=r'$Public\ channel$')
-ax.plot(dfMsg1WkSum.index,private,c='deepskyblue',
-	ls='-',lw=3,marker=None,label=r'$Private\ channel$')
-ax.plot(dfMsg1WkSum.index,direct,c='crimson',
-	ls='-',lw=3,marker=None,label=r'$Direct\ messages$')
-ax.set_axisbelow(True)
-ax.set_xlabel(r'$Date\ (JST)$',fontsize=labelsFontSize)
-ax.set_ylabel(r'$Weekly\ messages$',fontsize=labelsFontSize)
-matplotlib.pyplot.subplots_adjust(left=0.1,right=0.95,bottom=0.15,top=0.84)
-ax.legend(bbox_to_anchor=(0.5,1.23),loc='upper center',
-          prop={'size':legendFontSize},fancybox=True,shadow=True,ncol=3)
-ax.grid(linewidth=1,linestyle=':',which='major')
-ax.grid(linewidth=0.1,linestyle='--',which='minor')
-ax.tick_params(axis='both',reset=False,which='both',length=5,width=1.5)
-ax.annotate(r'$FM\ AIT$',size=ticksFontSize,xy=('2018-7-7',875),
-            xytext=('2018-3-1',800),arrowprops=dict(facecolor='black',shrink=0.05))
-ax.annotate(r'$Bounenkai$',size=ticksFontSize,xy=('2018-1-4',70),
-            xytext=('2017-10-1',500),arrowprops=dict(facecolor='black',shrink=0.05))
-ax.annotate(r'$CDR$',size=ticksFontSize,xy=('2018-5-20',510),
-            xytext=('2018-1-1',600),arrowprops=dict(facecolor='black',shrink=0.05))
-ax.annotate(r'$Summer\ ends$',size=ticksFontSize,xy=('2017-10-28',210),
-            xytext=('2017-6-1',400),arrowprops=dict(facecolor='black',shrink=0.05))
-ax.annotate(r'$PDR$',size=ticksFontSize,xy=('2017-8-8',170),
-            xytext=('2017-4-1',300),arrowprops=dict(facecolor='black',shrink=0.05))
-fig.autofmt_xdate()
-fig.show()
-if SAVEFIG: fig.savefig('globalMessageHistory.png')
+    fig,ax=matplotlib.pyplot.subplots(1,1,figsize=(14,8))
+    plotSeries(ax,t,inactive,c='deepskyblue',
+    	ls='-',lw=3,marker=None,label=r'$Inactive$')
+    plotSeries(ax,t,silent,c='crimson',
+    	ls='-',lw=3,marker=None,label=r'$Active\ not\ posting$')
+    ax.set_axisbelow(True)
+    ax.set_xlabel(r'$Date\ (JST)$',fontsize=labelsFontSize)
+    ax.set_ylabel(r'$Weekly\ users$',fontsize=labelsFontSize)
+    fig.subplots_adjust(left=0.1,right=0.95,bottom=0.15,top=0.84)
+    ax.legend(bbox_to_anchor=(0.5,1.23),loc='upper center',
+              prop={'size':legendFontSize},fancybox=True,shadow=True,ncol=2)
+    ax.grid(linewidth=1,linestyle=':',which='major')
+    ax.grid(linewidth=0.1,linestyle='--',which='minor')
+    ax.tick_params(axis='both',reset=False,which='both',length=5,width=1.5)
+    ax.set_yticks(numpy.arange(numpy.floor(lower),numpy.ceil(upper),5))
+    ax.annotate(r'$Bounenkai$',size=ticksFontSize,xy=('2018-1-4',16),
+                xytext=('2018-3-1',17),arrowprops=dict(facecolor='black',shrink=0.05))
+    ax.annotate(r'$Obon$',size=ticksFontSize,xy=('2017-8-19',17),
+                xytext=('2017-6-1',15),arrowprops=dict(facecolor='black',shrink=0.05))
+    fig.autofmt_xdate()
+    return fig
 
-# Plot the user data. File data aren't so interesting.
-fig,ax=matplotlib.pyplot.subplots(1,1,figsize=(14,8))
-# Plot files uploaded per week - filr data (users as well) are too noisy to be
-# interpreted on the time scale of days.
-#ax.plot(dfMsg1WkSum.index,dfMsg1WkSum['Files Uploaded'],c='indigo',
-#	ls='-',lw=3,marker=None,label=r'$Files\ uploaded$')
-# Have weekly user data from Slack, so plot that w/o resampling.
-ax.plot(dfMsg.index,dfMsg['Full Members'],c='deepskyblue',
-	ls='-',lw=3,marker=None,label=r'$Registered$')
-ax.plot(dfMsg.index,dfMsg['Weekly Active Users'],c='crimson',
-	ls='-',lw=3,marker=None,label=r'$Active$')
-ax.plot(dfMsg.index,dfMsg['Weekly Users Posting Messages'],c='gold',
-	ls='-',lw=3,marker=None,label=r'$Posting$')
-ax.set_axisbelow(True)
-ax.set_xlabel(r'$Date\ (JST)$',fontsize=labelsFontSize)
-ax.set_ylabel(r'$Weekly\ users$',fontsize=labelsFontSize)
-matplotlib.pyplot.subplots_adjust(left=0.1,right=0.95,bottom=0.15,top=0.83)
-ax.legend(bbox_to_anchor=(0.5,1.23),loc='upper center',
-          prop={'size':legendFontSize},fancybox=True,shadow=True,ncol=3)
-ax.grid(linewidth=1,linestyle=':',which='major')
-ax.grid(linewidth=0.1,linestyle='--',which='minor')
-ax.tick_params(axis='both',reset=False,which='both',length=5,width=1.5)
-ax.set_ylim(bottom=-20)
-ax.annotate(r'$Bounenkai$',size=ticksFontSize,xy=('2018-1-4',2),
-            xytext=('2018-3-1',-10),arrowprops=dict(facecolor='black',shrink=0.05))
-ax.annotate(r'$Obon$',size=ticksFontSize,xy=('2017-8-19',0),
-            xytext=('2017-6-1',-15),arrowprops=dict(facecolor='black',shrink=0.05))
-fig.autofmt_xdate()
-fig.show()
-if SAVEFIG: fig.savefig('userNumberHistory.png')
+def plotActiveSilentUserRatioHistory(t,inactive,silent):
+    """ Plot ratio of active and inactive users to all the registered ones. """
+    t=pandas.DatetimeIndex(t)
+    fig,ax=matplotlib.pyplot.subplots(1,1,figsize=(14,8))
+    plotSeries(ax,t,inactive,c='deepskyblue',
+    	ls='-',lw=3,marker=None,label=r'$Inactive$')
+    plotSeries(ax,t,silent,c='crimson',
+    	ls='-',lw=3,marker=None,label=r'$Active\ not\ posting$')
+    ax.set_axisbelow(True)
+    ax.set_xlabel(r'$Date\ (JST)$',fontsize=labelsFontSize)
+    ax.set_ylabel(r'$Weekly\ user\ ratio$',fontsize=labelsFontSize)
+    fig.subplots_adjust(left=0.1,right=0.95,bottom=0.15,top=0.84)
+    ax.legend(bbox_to_anchor=(0.5,1.23),loc='upper center',
+              prop={'size':legendFontSize},fancybox=True,shadow=True,ncol=2)
+    ax.grid(linewidth=1,linestyle=':',which='major')
+    ax.grid(linewidth=0.1,linestyle='--',which='minor')
+    ax.tick_params(axis='both',reset=False,which='both',length=5,width=1.5)
+    ax.annotate(r'$Bounenkai$',size=ticksFontSize,xy=('2018-1-4',0.67),
+                xytext=('2018-3-1',0.8),arrowprops=dict(facecolor='black',shrink=0.05))
+    ax.annotate(r'$Obon$',size=ticksFontSize,xy=('2017-8-19',0.85),
+                xytext=('2017-6-1',0.95),arrowprops=dict(facecolor='black',shrink=0.05))
+    ax.set_ylim(bottom=-0.1,top=1.1)
+    fig.autofmt_xdate()
+    return fig
 
-# Plot the inactive user numbers.
-registered=dfMsg['Full Members']
-active=dfMsg['Weekly Active Users']
-posting=dfMsg['Weekly Users Posting Messages']
-lower=min(registered.min(),active.min(),posting.min())
-# Will only subtract, so won't exceed the original no. users in any series.
-upper=min(registered.max(),active.max(),posting.max())
+def plotChannelPopularity(channelAges,messagesPosted):
+    """ Plot channel users & messages VS age (datetime.now()-date created). """
+    fig,ax=matplotlib.pyplot.subplots(1,1,figsize=(14,8))
+    ax.plot(channelAges,messagesPosted,c='indigo',lw=0,marker='o',ms=10)
+    ax.set_axisbelow(True)
+    ax.set_xlabel(r'$Channel\ age\ (days)$',fontsize=labelsFontSize)
+    ax.set_ylabel(r'$Messages\ posted$',fontsize=labelsFontSize)
+    fig.subplots_adjust(left=0.1,right=0.95,bottom=0.15,top=0.84)
+    ax.grid(linewidth=1,linestyle=':',which='major')
+    ax.grid(linewidth=0.1,linestyle='--',which='minor')
+    ax.tick_params(axis='both',reset=False,which='both',length=5,width=1.5)
+    ax.annotate(r'$random\ =\ we\ are\ to\ the\ point$',size=ticksFontSize,xy=(555,65),
+                xytext=(250,200),arrowprops=dict(facecolor='black',shrink=0.05))
+    return fig
 
-fig,ax=matplotlib.pyplot.subplots(1,1,figsize=(14,8))
-ax.plot(dfMsg.index,registered-active,c='deepskyblue',
-	ls='-',lw=3,marker=None,label=r'$Inactive$')
-ax.plot(dfMsg.index,active-posting,c='crimson',
-	ls='-',lw=3,marker=None,label=r'$Active\ not\ posting$')
-ax.set_axisbelow(True)
-ax.set_xlabel(r'$Date\ (JST)$',fontsize=labelsFontSize)
-ax.set_ylabel(r'$Weekly\ users$',fontsize=labelsFontSize)
-matplotlib.pyplot.subplots_adjust(left=0.1,right=0.95,bottom=0.15,top=0.84)
-ax.legend(bbox_to_anchor=(0.5,1.23),loc='upper center',
-          prop={'size':legendFontSize},fancybox=True,shadow=True,ncol=2)
-ax.grid(linewidth=1,linestyle=':',which='major')
-ax.grid(linewidth=0.1,linestyle='--',which='minor')
-ax.tick_params(axis='both',reset=False,which='both',length=5,width=1.5)
-ax.set_yticks(numpy.arange(numpy.floor(lower),numpy.ceil(upper),5))
-ax.annotate(r'$Bounenkai$',size=ticksFontSize,xy=('2018-1-4',16),
-            xytext=('2018-3-1',17),arrowprops=dict(facecolor='black',shrink=0.05))
-ax.annotate(r'$Obon$',size=ticksFontSize,xy=('2017-8-19',17),
-            xytext=('2017-6-1',15),arrowprops=dict(facecolor='black',shrink=0.05))
-fig.autofmt_xdate()
-fig.show()
-if SAVEFIG: fig.savefig('activeSilentUserNumberHistory.png')
+def plotUserVerboseness(userAges,chatsSent):
+    """ User age VS activity. Don't blame anyone. """
+    mean,median=chatsSent.mean(),numpy.median(chatsSent)
+    fig,ax=matplotlib.pyplot.subplots(1,1,figsize=(14,8))
+    ax.plot(userAges,chatsSent,c='indigo',lw=0,marker='o',ms=10,label=r'$User$')
+    ax.plot([userAges.min(),userAges.max()],[mean,mean],ls='--',lw=2,
+            c='deepskyblue',label=r"$Mean$")
+    ax.plot([userAges.min(),userAges.max()],[median,median],ls='--',lw=2,
+            c='crimson',label=r"$Median$")
+    ax.set_axisbelow(True)
+    ax.set_xlabel(r'$User\ age\ (days)$',fontsize=labelsFontSize)
+    ax.set_ylabel(r'$Chats\ sent$',fontsize=labelsFontSize)
+    fig.subplots_adjust(left=0.1,right=0.95,bottom=0.15,top=0.84)
+    ax.legend(bbox_to_anchor=(0.5,1.23),loc='upper center',
+              prop={'size':legendFontSize},fancybox=True,shadow=True,ncol=3)
+    ax.grid(linewidth=1,linestyle=':',which='major')
+    ax.grid(linewidth=0.1,linestyle='--',which='minor')
+    ax.tick_params(axis='both',reset=False,which='both',length=5,width=1.5)
+    ax.text(x=100,y=550,s=r'${0:.2f}$'.format(mean),
+            color='deepskyblue',size=ticksFontSize)
+    ax.text(x=100,y=250,s=r'${0:.2f}$'.format(median),
+            color='crimson',size=ticksFontSize)
+    return fig
 
-# Plot ratio of active and inactive users.
-fig,ax=matplotlib.pyplot.subplots(1,1,figsize=(14,8))
-ax.plot(dfMsg.index,(registered-active)/registered,c='deepskyblue',
-	ls='-',lw=3,marker=None,label=r'$Inactive$')
-ax.plot(dfMsg.index,(active-posting)/registered,c='crimson',
-	ls='-',lw=3,marker=None,label=r'$Active\ not\ posting$')
-ax.set_axisbelow(True)
-ax.set_xlabel(r'$Date\ (JST)$',fontsize=labelsFontSize)
-ax.set_ylabel(r'$Weekly\ user\ ratio$',fontsize=labelsFontSize)
-matplotlib.pyplot.subplots_adjust(left=0.1,right=0.95,bottom=0.15,top=0.84)
-ax.legend(bbox_to_anchor=(0.5,1.23),loc='upper center',
-          prop={'size':legendFontSize},fancybox=True,shadow=True,ncol=2)
-ax.grid(linewidth=1,linestyle=':',which='major')
-ax.grid(linewidth=0.1,linestyle='--',which='minor')
-ax.tick_params(axis='both',reset=False,which='both',length=5,width=1.5)
-ax.annotate(r'$Bounenkai$',size=ticksFontSize,xy=('2018-1-4',0.67),
-            xytext=('2018-3-1',0.8),arrowprops=dict(facecolor='black',shrink=0.05))
-ax.annotate(r'$Obon$',size=ticksFontSize,xy=('2017-8-19',0.85),
-            xytext=('2017-6-1',0.95),arrowprops=dict(facecolor='black',shrink=0.05))
-ax.set_ylim(bottom=-0.1,top=1.1)
-fig.autofmt_xdate()
-fig.show()
-if SAVEFIG: fig.savefig('activeSilentUserRatioHistory.png')
+if __name__=='__main__':
+    # Merge the new message, channel and user statistics files into the store,
+    # only the new exports are read, and get the data from there. The metrics
+    # are already aggregated by day and week there, see cube.
+    with store.Store(STORE_FILE) as db:
+        db.addExports('.')
+        dfMsg=db.cube('D')
+        dfMsg1WkSum=db.weekly() # Weekly sum of messages.
+        dfCh=db.channels()
+        dfUsr=db.users()
+        reference=db.lastExport() if REFERENCE_DATE is None else REFERENCE_DATE
 
-# Plot channel users & messages VS age (datetime.now()-date created)
-fig,ax=matplotlib.pyplot.subplots(1,1,figsize=(14,8))
-ax.plot( (pandas.Timestamp(2018,8,15)-dfCh.index).days, # Channel age.
-           dfCh['Messages Posted'],c='indigo',lw=0,marker='o',ms=10)
-ax.set_axisbelow(True)
-ax.set_xlabel(r'$Channel\ age\ (days)$',fontsize=labelsFontSize)
-ax.set_ylabel(r'$Messages\ posted$',fontsize=labelsFontSize)
-matplotlib.pyplot.subplots_adjust(left=0.1,right=0.95,bottom=0.15,top=0.84)
-ax.grid(linewidth=1,linestyle=':',which='major')
-ax.grid(linewidth=0.1,linestyle='--',which='minor')
-ax.tick_params(axis='both',reset=False,which='both',length=5,width=1.5)
-ax.annotate(r'$random\ =\ we\ are\ to\ the\ point$',size=ticksFontSize,xy=(555,65),
-            xytext=(250,200),arrowprops=dict(facecolor='black',shrink=0.05))
-fig.show()
-if SAVEFIG: fig.savefig('channelPopularityVSAge.png')
+    # Arrays needed to plot all the figures.
+    data={'tWeek':dfMsg1WkSum.index.values,
+          'public':dfMsg1WkSum['Messages in Public Channels'].values,
+          'private':dfMsg1WkSum['Messages in Private Channels'].values,
+          'direct':dfMsg1WkSum['Messages in DMs'].values,
+          't':dfMsg.index.values,
+          'registered':dfMsg['Full Members'].values,
+          'active':dfMsg['Weekly Active Users'].values,
+          'posting':dfMsg['Weekly Users Posting Messages'].values,
+          'inactive':dfMsg['Inactive Users'].values,
+          'silent':dfMsg['Silent Users'].values,
+          'inactiveRatio':dfMsg['Inactive Ratio'].values,
+          'silentRatio':dfMsg['Silent Ratio'].values,
+          'channelAges':cohorts.ages(cohorts.dayNumbers(dfCh['Created']),reference),
+          'messagesPosted':dfCh['Messages Posted'].values,
+          'userAges':cohorts.ages(cohorts.dayNumbers(dfUsr['Account Creation Date']),
+                                  reference),
+          'chatsSent':dfUsr['chats_sent'].values}
 
-# User age VS activity. Don't blame anyone.
-userAges=(pandas.Timestamp(2018,8,15)-dfUsr['Account Creation Date']).values/(1e9*24*3600)
+    # Plotting functions, their kwargs (names in data) and files.
+    users=dict(t='t',registered='registered',active='active',posting='posting')
+    figures=[(plotMessageHistory,dict(t='tWeek',public='public',private='private',
+                                      direct='direct'),'globalMessageHistory.png'),
+             (plotUserNumberHistory,users,'userNumberHistory.png'),
+             (plotActiveSilentUserNumberHistory,dict(users,inactive='inactive',
+                silent='silent'),'activeSilentUserNumberHistory.png'),
+             (plotActiveSilentUserRatioHistory,dict(t='t',inactive='inactiveRatio',
+                silent='silentRatio'),'activeSilentUserRatioHistory.png'),
+             (plotChannelPopularity,dict(channelAges='channelAges',
+                                         messagesPosted='messagesPosted'),
+              'channelPopularityVSAge.png'),
+             (plotUserVerboseness,dict(userAges='userAges',chatsSent='chatsSent'),
+              'userVerboseness.png')]
 
-fig,ax=matplotlib.pyplot.subplots(1,1,figsize=(14,8))
-ax.plot(userAges,dfUsr['chats_sent'],c='indigo',lw=0,marker='o',ms=10,label=r'$User$')
-ax.plot([userAges.min(),userAges.max()],
-        [dfUsr['chats_sent'].mean(),dfUsr['chats_sent'].mean()],ls='--',lw=2,
-        c='deepskyblue',label=r"$Mean$")
-ax.plot([userAges.min(),userAges.max()],
-        [dfUsr['chats_sent'].median(),dfUsr['chats_sent'].median()],ls='--',lw=2,
-        c='crimson',label=r"$Median$")
-ax.set_axisbelow(True)
-ax.set_xlabel(r'$User\ age\ (days)$',fontsize=labelsFontSize)
-ax.set_ylabel(r'$Chats\ sent$',fontsize=labelsFontSize)
-matplotlib.pyplot.subplots_adjust(left=0.1,right=0.95,bottom=0.15,top=0.84)
-ax.legend(bbox_to_anchor=(0.5,1.23),loc='upper center',
-          prop={'size':legendFontSize},fancybox=True,shadow=True,ncol=3)
-ax.grid(linewidth=1,linestyle=':',which='major')
-ax.grid(linewidth=0.1,linestyle='--',which='minor')
-ax.tick_params(axis='both',reset=False,which='both',length=5,width=1.5)
-ax.text(x=100,y=550,s=r'${0:.2f}$'.format(dfUsr['chats_sent'].mean()),
-        color='deepskyblue',size=ticksFontSize)
-ax.text(x=100,y=250,s=r'${0:.2f}$'.format(dfUsr['chats_sent'].median()),
-        color='crimson',size=ticksFontSize)
-fig.show()
-if SAVEFIG: fig.savefig('userVerboseness.png')
-
-input()
+    if PROCESSES>1:
+        # The figures are independent, render them in parallel. The workers get
+        # the data from shared memory instead of a pickled copy per figure.
+        shared={key:SharedArray(value) for key,value in data.items()}
+        try:
+            renderFigures([FigureSpec(function,{arg:shared[key] for arg,key in kwargs.items()},
+                    export.fileNames(os.path.splitext(fName)[0]) if export.EXPORTING else fName)
+                for function,kwargs,fName in figures],processes=PROCESSES,dpi=export.DPI,
+                rc={'xtick.labelsize':ticksFontSize,'ytick.labelsize':ticksFontSize})
+        finally:
+            for value in shared.values(): value.unlink()
+    else:
+        for function,kwargs,fName in figures:
+            kwargs={arg:data[key] for arg,key in kwargs.items()}
+            if export.EXPORTING: # Unless the data didn't change.
+                export.render(os.path.splitext(fName)[0],function,kwargs)
+                continue
+            fig=function(**kwargs)
+            if SAVEFIG: fig.savefig(fName)
+            export.show(fig,os.path.splitext(fName)[0])
+        if not export.EXPORTING: input()
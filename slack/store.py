@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental SQLite store of the Slack analytics exports.
+
+A new export is dropped every week and every export repeats the whole history,
+so instead of re-parsing all of them before every report, each export is merged
+into one SQLite database once:
+
+* `daily` - one row per date with :data:`ingest.DAILY_COLUMNS`,
+  :data:`ingest.SUM_COLUMNS` and :data:`DERIVED_COLUMNS`, the week it
+  belongs to and a hash of the row, see :func:`rowHashes`,
+* `cube` - the metrics aggregated by day, week and month, see :mod:`cube`,
+* `channels` and `users` - latest names and totals per channel and user ID,
+  see :data:`ingest.CHANNEL_ID` and :data:`ingest.USER_ID`,
+* `exports` - exports merged so far.
+
+Rows are deduplicated by their date, channel or user ID, newer exports
+replace the older data. Only the days that are new or differ from the stored
+ones are written, e.g. when Slack revises old days in a newer export, and only
+the periods with those days are aggregated again. To find them, the sums of
+the row hashes of every month of an export are compared with the stored ones,
+and only the rows of the months that differ, i.e. the latest one and the
+revised ones, are compared day by day. The database reads and writes of a
+report are thus proportional to the new data, not to the whole history.
+
+@author: Alek
+"""
+import pandas, numpy, os, re, sqlite3, datetime
+from . import ingest, cube
+
+STORE_FILE='slack.sqlite' # Default database.
+# Active and inactive users derived from the daily user counts.
+DERIVED_COLUMNS={'Inactive Users':('Full Members','Weekly Active Users'),
+                 'Silent Users':('Weekly Active Users','Weekly Users Posting Messages')}
+# Export files, e.g. SlackAnalytics03Aug2018.csv, with the date they were made.
+EXPORT_PATTERN=re.compile(r'^(SlackAnalytics|ChannelAnalytics|UserAnalytics)'
+                          r'(\d{2}[A-Z][a-z]{2}\d{4})\.csv$')
+
+def _quote(column):
+    """ SQL identifier of a dataframe column. """
+    return '"{}"'.format(column.replace('"','""'))
+
+def exportDate(fName):
+    """ Date when an export was made, from its name, e.g. 03Aug2018. """
+    match=EXPORT_PATTERN.match(os.path.basename(fName))
+    if match is None:
+        raise ValueError('{} is not a Slack analytics export.'.format(fName))
+    return datetime.datetime.strptime(match.group(2),'%d%b%Y').date()
+
+def rowHashes(dates,rows):
+    """ Hashes of the daily `rows` of a dataframe with their `dates` as strings.
+
+    The hashes have 58 bits, so the ones of a month can be summed in SQLite
+    without overflowing its 64-bit integers.
+    """
+    hashes=pandas.util.hash_pandas_object(rows.assign(Date=numpy.asarray(dates)),
+                                          index=False).to_numpy()
+    return (hashes>>numpy.uint64(6)).astype(numpy.int64)
+
+def weekEnd(dates):
+    """ Sunday that ends the week of every one of `dates`, as in `resample('1W')`. """
+    dates=pandas.DatetimeIndex(dates)
+    return dates+pandas.to_timedelta(6-dates.dayofweek,unit='D')
+
+class Store(object):
+    """ SQLite database with the merged Slack analytics exports.
+
+    Attributes
+    -------
+    * fName (str): database file,
+    * connection - :class:`sqlite3.Connection` to it,
+    * dailyColumns (list of str): data columns of the `daily` table.
+    """
+    def __init__(self,fName=STORE_FILE):
+        """
+        Args
+        -------
+        * fName (str): database file, created if it doesn't exist. ':memory:'
+          for a temporary one.
+        """
+        self.fName=fName
+        self.connection=sqlite3.connect(fName)
+        self.dailyColumns=ingest.DAILY_COLUMNS+ingest.SUM_COLUMNS+list(DERIVED_COLUMNS)
+        with self.connection:
+            self.connection.execute('CREATE TABLE IF NOT EXISTS daily (Date TEXT '
+                'PRIMARY KEY, Week TEXT NOT NULL, {}, Hash INTEGER)'.format(','.join(
+                '{} INTEGER'.format(_quote(c)) for c in self.dailyColumns)))
+            if not 'Hash' in [row[1] for row in self.connection.execute(
+                              'PRAGMA table_info(daily)')]:
+                # Stored before the hashes, the rows without one are written again.
+                self.connection.execute('ALTER TABLE daily ADD COLUMN Hash INTEGER')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS dailyWeek ON daily (Week)')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS cube (Granularity '
+                'TEXT, Period TEXT, {}, PRIMARY KEY (Granularity,Period))'.format(
+                ','.join('{} REAL'.format(_quote(c)) for c in cube.COLUMNS)))
+            self.connection.execute('CREATE TABLE IF NOT EXISTS exports (File TEXT '
+                                    'PRIMARY KEY, Export TEXT, Size INTEGER, Mtime INTEGER)')
+            for table,created,sums,prefix in (('channels','Created',ingest.CHANNEL_SUMS,
+                    'ChannelAnalytics'),('users','Account Creation Date',ingest.USER_SUMS,
+                    'UserAnalytics')):
+                columns=[row[1] for row in self.connection.execute(
+                         'PRAGMA table_info({})'.format(table))]
+                if columns and not 'ID' in columns: # Stored by name, merge them again.
+                    self.connection.execute('DROP TABLE {}'.format(table))
+                    self.connection.execute('DELETE FROM exports WHERE File LIKE ?',
+                                            (prefix+'%',))
+                self.connection.execute('CREATE TABLE IF NOT EXISTS {} (ID TEXT PRIMARY '
+                    'KEY, Name TEXT, {} TEXT, {}, Export TEXT)'.format(table,
+                    _quote(created),','.join('{} INTEGER'.format(_quote(c)) for c in sums)))
+            empty=self.connection.execute('SELECT COUNT(*) FROM cube').fetchone()[0]==0
+            first=self.connection.execute('SELECT MIN(Date) FROM daily').fetchone()[0]
+            if empty and first is not None: # Stored before there was a cube.
+                self._updateCube(pandas.Timestamp(first))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+    def close(self):
+        """ Close the database. """
+        self.connection.close()
+
+    def lastDate(self):
+        """ Last date in the `daily` table or None if it's empty. """
+        last=self.connection.execute('SELECT MAX(Date) FROM daily').fetchone()[0]
+        return None if last is None else pandas.Timestamp(last)
+
+    def addMessages(self,fName,chunksize=ingest.CHUNK_SIZE):
+        """ Merge a workspace export into the `daily` and `cube` tables.
+
+        Args
+        -------
+        * fName (str): workspace export, e.g. SlackAnalytics03Aug2018.csv,
+        * chunksize (int): number of rows to read at once.
+
+        Returns
+        -------
+        Number of days written, i.e. that are new or differ from the stored ones.
+        """
+        columns=ingest.DAILY_COLUMNS+ingest.SUM_COLUMNS
+        # Missing hashes, stored by older versions, aren't counted, so their
+        # months always differ.
+        digests=('SELECT substr(Date,1,7) AS Month,SUM(Hash) AS Hash,COUNT(Hash) AS Days '
+                 'FROM daily WHERE Date BETWEEN ? AND ? GROUP BY Month')
+        stored='SELECT Date,Hash FROM daily WHERE Date BETWEEN ? AND ?'
+        sql='INSERT OR REPLACE INTO daily (Date,Week,{},Hash) VALUES ({})'.format(
+            ','.join(_quote(c) for c in self.dailyColumns),
+            ','.join(['?']*(len(self.dailyColumns)+3)))
+        first=None # Earliest day written.
+        written=0
+        with self.connection:
+            for chunk in ingest.readChunks(fName,'Date',ingest.DATE_FORMAT,
+                    ingest.MESSAGE_DTYPES,usecols=['Date']+columns,chunksize=chunksize):
+                if chunk.empty:
+                    continue
+                for column,(total,part) in DERIVED_COLUMNS.items():
+                    chunk[column]=chunk[total]-chunk[part]
+                dates=chunk['Date'].dt.strftime('%Y-%m-%d').to_numpy()
+                hashes=rowHashes(dates,chunk[self.dailyColumns])
+                # Months of the chunk whose days differ from the stored ones. The
+                # chunk can end mid-month, so only its dates are summed.
+                months=dates.astype('U7')
+                sums=pandas.Series(hashes).groupby(months).agg(['sum','size'])
+                oldSums={month:(total,days) for month,total,days in
+                         self.connection.execute(digests,(dates.min(),dates.max()))}
+                changed=numpy.zeros(len(chunk),dtype=bool)
+                for month,total,days in sums.itertuples():
+                    if oldSums.get(month)==(total,days):
+                        continue
+                    # Compare the days of this month only, missing days differ.
+                    inMonth=months==month
+                    oldRows=set(self.connection.execute(stored,(dates[inMonth].min(),
+                                                                dates[inMonth].max())))
+                    changed[inMonth]=[row not in oldRows for row in
+                                      zip(dates[inMonth],hashes[inMonth].tolist())]
+                chunk,dates,hashes=chunk[changed],dates[changed],hashes[changed]
+                if chunk.empty:
+                    continue
+                week=weekEnd(chunk['Date']).strftime('%Y-%m-%d')
+                first=chunk['Date'].min() if first is None else min(first,chunk['Date'].min())
+                rows=zip(dates,week,*(chunk[c].tolist() for c in self.dailyColumns),
+                         hashes.tolist())
+                self.connection.executemany(sql,rows)
+                written+=len(chunk)
+            if first is not None:
+                self._updateCube(first)
+        return written
+
+    def _updateCube(self,first):
+        """ Aggregate the periods from the one with day `first` on again. """
+        # Read whole periods, a week can start in the previous month.
+        start=min(cube.periodStart([first],granularity)[0]
+                  for granularity in cube.GRANULARITIES)
+        daily=self.daily(since=start)
+        sql='INSERT OR REPLACE INTO cube (Granularity,Period,{}) VALUES ({})'.format(
+            ','.join(_quote(c) for c in cube.COLUMNS),','.join(['?']*(len(cube.COLUMNS)+2)))
+        for granularity in cube.GRANULARITIES:
+            periods=cube.aggregate(daily,granularity)
+            periods=periods[periods.index>=first] # Labelled with their last days.
+            self.connection.executemany(sql,zip([granularity]*len(periods),
+                periods.index.strftime('%Y-%m-%d'),
+                *(periods[c].astype(float).tolist() for c in cube.COLUMNS)))
+
+    def _addTotals(self,table,df,created,sums,export):
+        """ Upsert `df` aggregated by ID unless the stored rows are newer. """
+        columns=['Name',created]+sums
+        self.connection.executemany('INSERT INTO {0} (ID,{1},Export) VALUES ({2}) '
+            'ON CONFLICT(ID) DO UPDATE SET {3},Export=excluded.Export '
+            'WHERE excluded.Export>={0}.Export'.format(table,
+            ','.join(_quote(c) for c in columns),','.join(['?']*(len(columns)+2)),
+            ','.join('{0}=excluded.{0}'.format(_quote(c)) for c in columns)),
+            zip(df.index,df['Name'],df[created].dt.strftime('%Y-%m-%d'),
+                *(df[c].tolist() for c in sums),[export]*len(df)))
+        return len(df)
+
+    def addChannels(self,fName,export=None,chunksize=ingest.CHUNK_SIZE):
+        """ Merge a channel export made on date `export`, from `fName` by default. """
+        export=exportDate(fName) if export is None else export
+        with self.connection:
+            return self._addTotals('channels',ingest.loadChannels(fName,chunksize),
+                                   'Created',ingest.CHANNEL_SUMS,str(export))
+
+    def addUsers(self,fName,export=None,chunksize=ingest.CHUNK_SIZE):
+        """ Merge a user export made on date `export`, from `fName` by default. """
+        export=exportDate(fName) if export is None else export
+        with self.connection:
+            return self._addTotals('users',ingest.loadUsers(fName,chunksize),
+                                   'Account Creation Date',ingest.USER_SUMS,str(export))
+
+    def addExports(self,directory='.'):
+        """ Merge all the exports in `directory` that haven't been merged yet.
+
+        The exports are merged from the oldest one. An export is merged again
+        if its size or modification time change.
+
+        Returns
+        -------
+        List of the merged files.
+        """
+        exports=sorted((exportDate(f),f) for f in os.listdir(directory)
+                       if EXPORT_PATTERN.match(f))
+        merged=[]
+        for export,f in exports:
+            fName=os.path.join(directory,f)
+            stat=os.stat(fName)
+            stamp=(str(export),stat.st_size,stat.st_mtime_ns)
+            if self.connection.execute('SELECT Export,Size,Mtime FROM exports WHERE '
+                                       'File=?',(f,)).fetchone()==stamp:
+                continue # Already merged.
+            if f.startswith('SlackAnalytics'):
+                self.addMessages(fName)
+            elif f.startswith('ChannelAnalytics'):
+                self.addChannels(fName,export)
+            else:
+                self.addUsers(fName,export)
+            with self.connection:
+                self.connection.execute('INSERT OR REPLACE INTO exports VALUES (?,?,?,?)',
+                                        (f,)+stamp)
+            merged.append(fName)
+        return merged
+
+    def lastExport(self):
+        """ Date of the newest merged export or None if there aren't any. """
+        last=self.connection.execute('SELECT MAX(Export) FROM exports').fetchone()[0]
+        return None if last is None else pandas.Timestamp(last)
+
+    def _read(self,sql,index,dates,params=None):
+        """ Read a query into a dataframe indexed by `index` with `dates` parsed. """
+        df=pandas.read_sql_query(sql,self.connection,index_col=index,params=params)
+        for column in dates:
+            df[column]=pandas.to_datetime(df[column],format='%Y-%m-%d')
+        return df
+
+    def daily(self,since=None):
+        """ Daily user counts, message counts and active/inactive users.
+
+        Args
+        -------
+        * since - first date to get, all of them by default.
+
+        Returns
+        -------
+        :class:`pandas.DataFrame` indexed by date.
+        """
+        since='' if since is None else pandas.Timestamp(since).strftime('%Y-%m-%d')
+        df=self._read('SELECT Date,{} FROM daily WHERE Date>=? ORDER BY Date'.format(
+                      ','.join(_quote(c) for c in self.dailyColumns)),'Date',[],(since,))
+        df.index=pandas.to_datetime(df.index,format='%Y-%m-%d')
+        return df
+
+    def cube(self,granularity):
+        """ Metrics aggregated by `granularity`, see :mod:`cube`.
+
+        Args
+        -------
+        * granularity (str): one of :data:`cube.GRANULARITIES`.
+
+        Returns
+        -------
+        :class:`pandas.DataFrame` with :data:`cube.COLUMNS` indexed by the last
+        day of every period.
+        """
+        df=self._read('SELECT Period,{} FROM cube WHERE Granularity=? ORDER BY '
+                      'Period'.format(','.join(_quote(c) for c in cube.COLUMNS)),
+                      'Period',[],(granularity,))
+        df.index=pandas.to_datetime(df.index,format='%Y-%m-%d').rename('Date')
+        for column in cube.SUMS+['Days']:
+            df[column]=df[column].astype(numpy.int64)
+        return df
+
+    def weekly(self):
+        """ Weekly sums of the message counts, same as `resample('1W').sum()`.
+
+        Returns
+        -------
+        :class:`pandas.DataFrame` indexed by the last day of the week.
+        """
+        df=self.cube('W')[cube.SUMS]
+        if len(df)>0: # Weeks without any days as zeros.
+            df=df.asfreq('W-SUN',fill_value=0)
+        return df
+
+    def channels(self):
+        """ Latest names and totals of the channels indexed by ID. """
+        return self._read('SELECT ID,Name,Created,{} FROM channels'.format(
+                          ','.join(_quote(c) for c in ingest.CHANNEL_SUMS)),
+                          'ID',['Created'])
+
+    def users(self):
+        """ Latest names and totals of the users indexed by ID. """
+        return self._read('SELECT ID,Name,"Account Creation Date",{} FROM users'.format(
+                          ','.join(_quote(c) for c in ingest.USER_SUMS)),
+                          'ID',['Account Creation Date'])
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`slack.cohorts`.
+
+@author: Alek
+"""
+import pandas, numpy, datetime
+from slack import cohorts
+
+def test_ages():
+    """ Integer day numbers give the same ages as datetime objects. """
+    created=['2017-02-06','2017-12-31','2018-08-03','2018-08-20']
+    days=cohorts.dayNumbers(created)
+    assert days.dtype==numpy.int64
+    reference=datetime.date(2018,8,15)
+    expected=[(reference-datetime.date.fromisoformat(d)).days for d in created]
+    numpy.testing.assert_array_equal(cohorts.ages(days,reference),expected)
+    numpy.testing.assert_array_equal(cohorts.dayNumbers(pandas.to_datetime(created)),days)
+    numpy.testing.assert_array_equal(cohorts.monthCohorts(days),
+        [(int(d[:4])-1970)*12+int(d[5:7])-1 for d in created])
+
+def test_activityStats():
+    """ Cohort counts, means and percentiles are the same as per cohort with
+    pandas and NumPy. """
+    rng=numpy.random.default_rng(0)
+    age=rng.integers(-10,800,5000)
+    activity=rng.poisson(20,age.size)*(age>=0)
+    edges=numpy.array([0,90,180,365,730])
+    stats=cohorts.activityStats(age,activity,edges)
+    bucket=pandas.cut(age,edges,right=False,labels=edges[:-1])
+    grouped=pandas.Series(activity,dtype=float).groupby(bucket,observed=True)
+    numpy.testing.assert_array_equal(stats.index,edges[:-1])
+    numpy.testing.assert_array_equal(stats['count'],grouped.size())
+    numpy.testing.assert_allclose(stats['mean'],grouped.mean())
+    for q in cohorts.PERCENTILES:
+        numpy.testing.assert_allclose(stats['p{:g}'.format(q)],
+            [numpy.percentile(activity[bucket==edge],q) for edge in edges[:-1]])
+    everyone=cohorts.activityStats(age,activity)
+    assert everyone['count'].item()==age.size
+    assert everyone.index.item()==age.min()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`slack.cube`.
+
+@author: Alek
+"""
+import pandas, numpy, pytest
+from slack import cube
+
+def _daily(seed=0):
+    """ Daily metrics with a missing fortnight, like the store returns. """
+    rng=numpy.random.default_rng(seed)
+    dates=pandas.date_range('2017-02-06','2017-06-30',freq='D')
+    dates=dates[(dates<'2017-04-03') | (dates>'2017-04-16')]
+    daily=pandas.DataFrame({c:rng.integers(0,100,dates.size) for c in cube.SUMS},index=dates)
+    daily['Full Members']=rng.integers(50,60,dates.size)
+    daily['Weekly Active Users']=rng.integers(20,50,dates.size)
+    daily['Weekly Users Posting Messages']=rng.integers(0,20,dates.size)
+    daily['Inactive Users']=daily['Full Members']-daily['Weekly Active Users']
+    daily['Silent Users']=daily['Weekly Active Users']-daily['Weekly Users Posting Messages']
+    return daily
+
+@pytest.mark.parametrize('granularity',list(cube.GRANULARITIES))
+def test_aggregate(granularity):
+    """ Every period has the sums, last and mean levels and ratios of its days. """
+    daily=_daily()
+    periods=cube.aggregate(daily,granularity)
+    assert list(periods.columns)==cube.COLUMNS
+    for end,period in periods.iterrows():
+        days=daily[(daily.index<=end) & (daily.index>end-pandas.Timedelta(days=31))]
+        days=days[cube.periodStart(days.index,granularity)==
+                  cube.periodStart([end],granularity)[0]]
+        assert period['Days']==len(days)
+        if days.empty: # A week with no data.
+            assert (period[cube.SUMS]==0).all() and period[cube.LEVELS].isna().all()
+            continue
+        numpy.testing.assert_array_equal(period[cube.SUMS],days[cube.SUMS].sum())
+        numpy.testing.assert_array_equal(period[cube.LEVELS],days[cube.LEVELS].iloc[-1])
+        numpy.testing.assert_allclose(period[[c+' (mean)' for c in cube.LEVELS]].astype(float),
+                                      days[cube.LEVELS].mean())
+        assert period['Silent Ratio']==pytest.approx(days['Silent Users'].iloc[-1]/
+                                                     days['Full Members'].iloc[-1])
+    assert periods['Days'].sum()==len(daily)
+
+def test_periodStart():
+    """ Weeks start on Mondays and months on the 1st. """
+    dates=pandas.to_datetime(['2018-08-03 00:00','2018-08-05 00:00','2018-08-06 13:00'])
+    numpy.testing.assert_array_equal(cube.periodStart(dates,'W'),
+        pandas.to_datetime(['2018-07-30','2018-07-30','2018-08-06']))
+    numpy.testing.assert_array_equal(cube.periodStart(dates,'M'),
+        pandas.to_datetime(['2018-08-01']*3))
+    numpy.testing.assert_array_equal(cube.periodStart(dates,'D'),dates.normalize())
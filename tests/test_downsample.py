@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`plotTools.downsample`.
+
+@author: Alek
+"""
+import numpy, pytest
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot
+from plotTools import downsample, export
+
+def _series(n=20000,seed=0):
+    """ Uneven random walk with a few gaps. """
+    rng=numpy.random.default_rng(seed)
+    x=numpy.cumsum(rng.uniform(0.1,2,n))
+    y=numpy.cumsum(rng.normal(size=n))
+    y[[500,501,n//2]]=numpy.nan
+    return x,y
+
+@pytest.mark.parametrize('nBins',[1,7,300])
+def test_minMax(nBins):
+    """ Every bin keeps its first, last, min and max points and the gaps. """
+    x,y=_series()
+    i=downsample.minMaxIndices(x,y,nBins)
+    assert i.size<=4*nBins+3 and numpy.all(numpy.diff(i)>0)
+    bins=numpy.minimum(((x-x[0])/(x[-1]-x[0])*nBins).astype(int),nBins-1)
+    for b in range(nBins):
+        inBin=numpy.flatnonzero(bins==b)
+        kept=numpy.intersect1d(i,inBin)
+        assert inBin[0] in kept and inBin[-1] in kept
+        assert numpy.nanmin(y[kept])==numpy.nanmin(y[inBin])
+        assert numpy.nanmax(y[kept])==numpy.nanmax(y[inBin])
+    assert set(numpy.flatnonzero(numpy.isnan(y)))<=set(i)
+
+def test_minMaxDates():
+    """ Datetimes are binned like numbers, short series are kept whole. """
+    x,y=_series(5000)
+    dates=numpy.datetime64('2017-02-06')+(x*86400).astype('timedelta64[s]')
+    numpy.testing.assert_array_equal(downsample.minMaxIndices(dates,y,50),
+                                     downsample.minMaxIndices(x*86400,y,50))
+    numpy.testing.assert_array_equal(downsample.minMaxIndices(x[:40],y[:40],10),
+                                     numpy.arange(40))
+
+def test_lttb():
+    """ LTTB keeps the ends and one point per bucket. """
+    x,y=_series()
+    y=numpy.nan_to_num(y)
+    i=downsample.lttbIndices(x,y,100)
+    assert i.size==100 and i[0]==0 and i[-1]==x.size-1
+    assert numpy.all(numpy.diff(i)>0)
+    y[12345]=1e3 # A spike is always kept.
+    assert 12345 in downsample.lttbIndices(x,y,100)
+
+def test_plotSeries():
+    """ The plotted line has a few points per pixel column of the saved figure. """
+    x,y=_series()
+    fig,ax=matplotlib.pyplot.subplots(figsize=(4,3),dpi=50)
+    line,=downsample.plotSeries(ax,x,y)
+    width=downsample.pixelWidth(ax)
+    assert line.get_xdata().size<=4*width+3
+    with export.savingAt(200): # Four times as many pixels.
+        assert abs(downsample.pixelWidth(ax)-4*width)<=4
+    with pytest.raises(ValueError):
+        downsample.plotSeries(ax,x,y,method='every')
+    matplotlib.pyplot.close(fig)
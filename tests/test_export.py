@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`plotTools.export`.
+
+@author: Alek
+"""
+import os, sys, subprocess, pytest
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot
+from plotTools import export
+
+REPO_DIR=os.path.join(os.path.dirname(os.path.abspath(__file__)),os.pardir)
+
+def _python(code,**environ):
+    """ Run `code` in a new interpreter with `environ` set. """
+    return subprocess.run([sys.executable,'-c',code],cwd=REPO_DIR,capture_output=True,
+                          text=True,env=dict(os.environ,MPLBACKEND='',**environ))
+
+def test_headless():
+    """ The export mode selects Agg before pyplot is imported, and unknown
+    formats are refused. """
+    result=_python('import plotTools.export, matplotlib.pyplot;'
+                   'print(matplotlib.get_backend())',XKCD_EXPORT='png, PDF')
+    assert result.returncode==0 and result.stdout.strip().lower()=='agg'
+    result=_python('import plotTools.export',XKCD_EXPORT='gif')
+    assert result.returncode!=0 and 'Unsupported XKCD_EXPORT format gif' in result.stderr
+
+def test_show(tmp_path,monkeypatch):
+    """ Figures are saved in every format, with the sketch frozen, and closed. """
+    monkeypatch.setattr(export,'EXPORTING',True)
+    monkeypatch.setattr(export,'FORMATS',['png','svg'])
+    monkeypatch.setattr(export,'OUTPUT_DIR',os.path.join(tmp_path,'out'))
+    monkeypatch.setattr(export,'DPI',40.)
+    with matplotlib.pyplot.xkcd():
+        fig,ax=matplotlib.pyplot.subplots()
+        line,=ax.plot([0,1],[0,1])
+    fNames=export.show(fig,'figure')
+    assert fNames==[os.path.join(tmp_path,'out','figure.png'),
+                    os.path.join(tmp_path,'out','figure.svg')]
+    assert all(os.path.isfile(fName) for fName in fNames)
+    assert line.get_sketch_params() is None
+    assert not matplotlib.pyplot.fignum_exists(fig.number)
+    assert export.pixelScale(fig)==pytest.approx(40./fig.dpi)
+
+def test_interactive(monkeypatch):
+    """ Without the export mode, figures are shown and nothing is saved. """
+    monkeypatch.setattr(export,'EXPORTING',False)
+    fig,ax=matplotlib.pyplot.subplots()
+    shown=[]
+    monkeypatch.setattr(fig,'show',lambda: shown.append(fig))
+    assert export.show(fig,'figure')==[] and shown==[fig]
+    assert not export.cached('figure')
+    assert export.pixelScale(fig)==1.
+    matplotlib.pyplot.close(fig)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`plotTools.figureCache`.
+
+@author: Alek
+"""
+import numpy, os, pytest
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot
+from plotTools import figureCache, FigureSpec, renderFigures
+
+CALLS=[] # Titles of the figures plotted so far.
+
+def plotTitle(title):
+    """ Figure with a title, which counts the calls. """
+    CALLS.append(title)
+    fig,ax=matplotlib.pyplot.subplots(figsize=(2,2),dpi=30)
+    ax.set_title(title)
+    return fig
+
+def test_figureKey(tmp_path):
+    """ Keys depend on the values of the parameters and the contents of the
+    inputs, not on the objects or where the inputs are. """
+    a=numpy.arange(10.)
+    key=figureCache.figureKey(plotTitle,dict(x=a,n=3))
+    assert figureCache.figureKey(plotTitle,dict(n=3,x=a.copy()))==key
+    assert figureCache.figureKey(plotTitle,dict(x=a+1,n=3))!=key
+    assert figureCache.figureKey(plotTitle,dict(x=a.astype(numpy.float32),n=3))!=key
+    assert figureCache.figureKey(plotTitle,dict(x=a,n=3.))!=key
+    inputs=[]
+    for directory in ('a','b'):
+        os.makedirs(os.path.join(tmp_path,directory))
+        inputs.append(os.path.join(tmp_path,directory,'data.csv'))
+        with open(inputs[-1],'w') as dataFile:
+            dataFile.write('1,2\n')
+    assert figureCache.figureKey(key,inputs=inputs[:1])==figureCache.figureKey(
+                                 key,inputs=inputs[1:])
+    with open(inputs[1],'a') as dataFile:
+        dataFile.write('3,4\n')
+    assert figureCache.figureKey(key,inputs=inputs[:1])!=figureCache.figureKey(
+                                 key,inputs=inputs[1:])
+
+def test_fetchStore(tmp_path):
+    """ Stored figures are copied back to any files with the same formats. """
+    cacheDir=os.path.join(tmp_path,'cache')
+    fNames=[os.path.join(tmp_path,'figure.png'),os.path.join(tmp_path,'figure.svg')]
+    assert not figureCache.fetch('key',fNames,cacheDir)
+    for fName in fNames:
+        with open(fName,'w') as figureFile:
+            figureFile.write(fName)
+    figureCache.store('key',fNames,cacheDir)
+    copies=[os.path.join(tmp_path,'copy.png'),os.path.join(tmp_path,'copy.svg')]
+    assert figureCache.fetch('key',copies,cacheDir)
+    for fName,copy in zip(fNames,copies):
+        with open(copy) as figureFile:
+            assert figureFile.read()==fName
+    assert not figureCache.fetch('key',[os.path.join(tmp_path,'copy.pdf')],cacheDir)
+    assert not figureCache.fetch('key',fNames,None)
+
+@pytest.mark.skipif(figureCache.CACHE_DIR is None or os.path.isabs(figureCache.CACHE_DIR),
+                    reason='Figures are cached outside the CWD or not at all.')
+def test_renderCached(tmp_path,monkeypatch):
+    """ Unchanged figures are copied from the cache, changed ones are plotted. """
+    monkeypatch.chdir(tmp_path)
+    del CALLS[:]
+    for title in ('a','a','b'):
+        renderFigures([FigureSpec(plotTitle,dict(title=title),title+'.png')],processes=1)
+    assert CALLS==['a','b']
+    os.remove('a.png')
+    renderFigures([FigureSpec(plotTitle,dict(title='a'),'a.png')],processes=1)
+    assert CALLS==['a','b'] and os.path.isfile('a.png')
+    renderFigures([FigureSpec(plotTitle,dict(title='a'),'a.png')],processes=1,cache=False)
+    assert CALLS==['a','b','a']
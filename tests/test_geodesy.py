@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`countrySize.geodesy`.
+
+@author: Alek
+"""
+import numpy, pytest
+from countrySize import geodesy
+
+WGS84_AREA=510065621.7 # km^2, surface of the WGS84 ellipsoid.
+
+def _box(lonMin,latMin,lonMax,latMax,n=2000):
+    """ Clockwise ring along the meridians and parallels of a lon/lat box. """
+    lon=numpy.linspace(lonMin,lonMax,n)
+    lat=numpy.linspace(latMin,latMax,n)
+    return numpy.vstack([numpy.column_stack((numpy.full(n,lonMin),lat)),
+                         numpy.column_stack((lon,numpy.full(n,latMax))),
+                         numpy.column_stack((numpy.full(n,lonMax),lat[::-1])),
+                         numpy.column_stack((lon[::-1],numpy.full(n,latMin)))])
+
+def _bandArea(latMin,latMax,dLon):
+    """ Area of a WGS84 lon/lat box integrated numerically. """
+    integrate=pytest.importorskip('scipy.integrate')
+    e2=geodesy._E2
+    area=integrate.quad(lambda lat: numpy.cos(lat)/(1-e2*numpy.sin(lat)**2)**2,
+                        numpy.radians(latMin),numpy.radians(latMax))[0]
+    return numpy.radians(dLon)*geodesy.WGS84_A**2*(1-e2)*area
+
+def test_octant():
+    """ The triangle between the equator and two meridians is 1/8 of the globe. """
+    octant=numpy.array([[0.,0.],[0.,90.],[90.,0.]]) # Clockwise.
+    sphere=geodesy.measure(octant,[0,3],ellipsoid=False)[0]
+    assert sphere['area']==pytest.approx(numpy.pi/2*geodesy.EARTH_RADIUS**2,rel=1e-12)
+    assert sphere['perimeter']==pytest.approx(1.5*numpy.pi*geodesy.EARTH_RADIUS,rel=1e-12)
+    assert geodesy.measure(octant,[0,3])[0]['area']==pytest.approx(WGS84_AREA/8,rel=1e-9)
+    # The orientation doesn't matter.
+    assert geodesy.measure(octant[::-1],[0,3])[0]['area']==pytest.approx(WGS84_AREA/8,rel=1e-9)
+
+@pytest.mark.parametrize('box',[(10,20,30,40),(170,-50,200,-45),(-180,60,180,90)])
+def test_box(box):
+    """ Areas and extents of boxes are the closed-form ones, also across the
+    antimeridian and around a pole. """
+    lonMin,latMin,lonMax,latMax=box
+    ring=_box(*box)
+    sizes=geodesy.measure(ring,[0,len(ring)])[0]
+    assert sizes['area']==pytest.approx(_bandArea(latMin,latMax,lonMax-lonMin),rel=1e-5)
+    assert sizes['northSouth']==pytest.approx(geodesy.meridianDistance(numpy.radians(latMax))-
+                                             geodesy.meridianDistance(numpy.radians(latMin)))
+    sphere=geodesy.measure(ring,[0,len(ring)],ellipsoid=False)[0]
+    R=geodesy.EARTH_RADIUS
+    assert sphere['area']==pytest.approx(numpy.radians(lonMax-lonMin)*R**2*(
+        numpy.sin(numpy.radians(latMax))-numpy.sin(numpy.radians(latMin))),rel=1e-5)
+    if latMax<90:
+        assert geodesy._wrap(numpy.radians(sizes['lon']-(lonMin+lonMax)/2))==pytest.approx(0,abs=1e-9)
+        assert sizes['eastWest']==pytest.approx(geodesy.parallelRadius(numpy.radians(
+            sizes['lat']))*numpy.radians(lonMax-lonMin),rel=1e-9)
+    else:
+        assert sizes['lat']==pytest.approx(90)
+
+def test_shapes():
+    """ Holes are subtracted, every shape is measured on its own, and empty
+    shapes are zero with a NaN centroid. """
+    outer=_box(0,0,10,10,100)
+    hole=_box(4,4,6,6,100)[::-1] # Anticlockwise.
+    other=_box(100,-20,101,-19,100)
+    coords=numpy.vstack([outer,hole,other])
+    partStarts=numpy.cumsum([0,len(outer),len(hole),len(other)])
+    sizes=geodesy.measure(coords,partStarts,[0,2,3,3])
+    parts=geodesy.measure(coords,partStarts)
+    assert sizes['area'][0]==pytest.approx(parts['area'][0]-parts['area'][1],rel=1e-12)
+    assert sizes['perimeter'][0]==pytest.approx(parts['perimeter'][:2].sum(),rel=1e-12)
+    assert sizes['area'][1]==pytest.approx(parts['area'][2],rel=1e-12)
+    assert sizes['area'][2]==0 and numpy.isnan(sizes['lat'][2])
+    assert sizes['lon'][0]==pytest.approx(5,abs=1e-9) # Symmetric in lon.
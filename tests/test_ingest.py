@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`slack.ingest`.
+
+@author: Alek
+"""
+import pandas, numpy, os, io, pytest
+from slack import ingest
+
+DIRECTORY=os.path.join(os.path.dirname(__file__),'..','slack')
+
+@pytest.mark.parametrize('chunksize',[7,100000])
+def test_loadMessages(chunksize):
+    """ Chunked daily counts and weekly sums are the same as reading the whole
+    export and resampling it. """
+    fName=os.path.join(DIRECTORY,'SlackAnalytics03Aug2018.csv')
+    daily,weekly=ingest.loadMessages(fName,chunksize=chunksize)
+    df=pandas.read_csv(fName,index_col='Date',parse_dates=['Date'])
+    pandas.testing.assert_frame_equal(daily,df[ingest.DAILY_COLUMNS],check_freq=False)
+    pandas.testing.assert_frame_equal(weekly,df[ingest.SUM_COLUMNS].resample('1W').sum())
+
+def test_loadMessagesGap():
+    """ Weeks with no rows between two chunks are zeros, like in resample. """
+    fName=os.path.join(DIRECTORY,'SlackAnalytics03Aug2018.csv')
+    df=pandas.read_csv(fName,dtype=str)
+    df=df.drop(index=range(30,60))
+    daily,weekly=ingest.loadMessages(io.StringIO(df.to_csv(index=False)),chunksize=30)
+    expected=df.set_index(pandas.to_datetime(df['Date']))[ingest.SUM_COLUMNS].astype(
+        numpy.int64).resample('1W').sum()
+    pandas.testing.assert_frame_equal(weekly,expected,check_names=False)
+
+def test_loadChannels():
+    """ Channels are aggregated by ID across the chunks, with the latest name,
+    and by name in the exports without the IDs. """
+    csv=('Channel ID,Name,Created,Total Channel Members,Messages Posted,Messages from Users\n'
+         'C1,general,"Feb 6, 2017",10,5,4\n'
+         'C2,random,"Mar 1, 2017",3,1,1\n'
+         'C1,announcements,"Feb 7, 2017",12,7,6\n')
+    channels=ingest.loadChannels(io.StringIO(csv),chunksize=2)
+    assert sorted(channels.index)==['C1','C2']
+    assert channels.loc['C1','Name']=='announcements'
+    assert channels.loc['C1','Created']==pandas.Timestamp('2017-02-06')
+    assert channels.loc['C1',ingest.CHANNEL_SUMS].tolist()==[12,10]
+    fName=os.path.join(DIRECTORY,'ChannelAnalytics03Aug2018.csv')
+    channels=ingest.loadChannels(fName,chunksize=4)
+    df=pandas.read_csv(fName)
+    assert sorted(channels.index)==sorted(df['Name'].unique())
+    assert channels[ingest.CHANNEL_SUMS].sum().tolist()==df[ingest.CHANNEL_SUMS].sum().tolist()
+
+def test_loadUsers():
+    """ Users are read in chunks with the creation dates parsed. """
+    fName=os.path.join(DIRECTORY,'UserAnalytics03Aug2018.csv')
+    users=ingest.loadUsers(fName,chunksize=4)
+    df=pandas.read_csv(fName)
+    assert users['chats_sent'].sum()==df['chats_sent'].sum()
+    assert users['Account Creation Date'].min()==pandas.to_datetime(
+        df['Account Creation Date'],format=ingest.CREATED_FORMAT).min()
+    assert len(ingest.loadUsers(io.StringIO('Name,chats_sent,Account Creation Date\n')))==0
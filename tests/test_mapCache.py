@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`countrySize.mapCache`.
+
+@author: Alek
+"""
+import numpy
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot
+from countrySize import mapCache
+
+def test_getMap(tmp_path,monkeypatch):
+    """ The same map is reused for the same kwargs and projects the coastlines
+    only once, whatever the axes. """
+    mapCache.clearMaps()
+    kwargs=dict(projection='merc',llcrnrlat=20,urcrnrlat=50,llcrnrlon=120,urcrnrlon=150,
+                resolution='c',dataDir=str(tmp_path))
+    bMap=mapCache.getMap(**kwargs)
+    assert mapCache.getMap(**dict(reversed(list(kwargs.items())))) is bMap
+    assert mapCache.getMap(**dict(kwargs,llcrnrlat=21)) is not bMap
+    projected=[]
+    projectLines=bMap.projectLines
+    monkeypatch.setattr(bMap,'projectLines',lambda *args: projected.append(args) or
+                        projectLines(*args))
+    segments=[]
+    for i in range(2):
+        fig,ax=matplotlib.pyplot.subplots()
+        segments.append(bMap.drawcoastlines(ax=ax).get_segments())
+        assert list(ax.collections)[0].axes is ax
+        matplotlib.pyplot.close(fig)
+    assert len(projected)==1 and len(segments[0])>0
+    for a,b in zip(*segments):
+        numpy.testing.assert_array_equal(a,b)
+    mapCache.clearMaps()
+    assert mapCache.getMap(**kwargs) is not bMap
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`countrySize.overlay` on small synthetic GADM shapefiles.
+
+@author: Alek
+"""
+import numpy, shapefile, os, pytest
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot
+from countrySize import overlay
+from countrySize.geodesy import measure
+from countrySize.transforms import transformCoords
+
+# Prefectures of every country: lon, lat of the lower left corner, size and
+# type. The country is the box around them.
+PREFECTURES={'JPN':[(130,31,3,'Prefecture'),(134,33,3,'Prefecture'),(138,36,3,'Metropolis'),
+                    (140,39,2,'Prefecture')],
+             'ARG':[(-70,-50,5,''),(-66,-40,6,'')],
+             'BRA':[(-60,-20,10,''),(-50,-10,8,'')]}
+
+def _square(lon,lat,size):
+    """ Clockwise ring of a lon/lat square. """
+    return [[lon,lat],[lon,lat+size],[lon+size,lat+size],[lon+size,lat],[lon,lat]]
+
+@pytest.fixture(scope='module')
+def bordersDir(tmp_path_factory):
+    """ Directory with adm0 and adm1 shapefiles of all the countries. """
+    bordersDir=str(tmp_path_factory.mktemp('borders'))
+    for countryCode,prefectures in PREFECTURES.items():
+        country=overlay.COUNTRIES[countryCode]
+        os.makedirs(os.path.join(bordersDir,country['shpDir']))
+        corners=numpy.array([(lon,lat,lon+size,lat+size) for lon,lat,size,_ in prefectures])
+        lonMin,latMin=corners[:,:2].min(axis=0)
+        lonMax,latMax=corners[:,2:].max(axis=0)
+        for level,shapes in ((0,[(lonMin-1,latMin-1,max(lonMax-lonMin,latMax-latMin)+2,'')]),
+                             (1,prefectures)):
+            fName=overlay.levelFile(countryCode,level,bordersDir)
+            with shapefile.Writer(fName,shapeType=shapefile.POLYGON) as shapeWtr:
+                for i in range(10):
+                    shapeWtr.field('F{}'.format(i),'C',size=20)
+                for j,(lon,lat,size,kind) in enumerate(shapes):
+                    shapeWtr.poly([_square(lon,lat,size)])
+                    record=['{}{}'.format(countryCode,j)]*10
+                    record[country['nameField']]=countryCode
+                    record[9]=kind
+                    shapeWtr.record(*record)
+    return bordersDir
+
+def test_regionWindows(bordersDir):
+    """ Countries can move the corners of a region, which keeps its name. """
+    for countryCode,llcrnrlat in (('JPN',30),('ARG',20),('BRA',20)):
+        country=overlay.CountryOverlay(countryCode,bordersDir=bordersDir)
+        assert country.region['llcrnrlat']==llcrnrlat
+        assert country.region['urcrnrlat']==overlay.REGIONS['Europe']['urcrnrlat']
+        assert country.regionName()=='Europe'
+        assert country.name==countryCode
+    assert overlay.REGIONS['Europe']['llcrnrlat']==30 # Not modified.
+    region=dict(overlay.REGIONS['Europe'])
+    assert overlay.CountryOverlay('ARG',region,bordersDir=bordersDir).regionName()==r'the\ region'
+
+def test_prefectures(bordersDir):
+    """ Prefectures are selected by type, located and found in the region. """
+    country=overlay.CountryOverlay('JPN',bordersDir=bordersDir)
+    shapes,idx=country.prefectures()
+    numpy.testing.assert_array_equal(idx,[0,1,3])
+    assert len(shapes)==3
+    numpy.testing.assert_array_equal(country.locatePrefectures([[131,32],[139,37],[0,0]]),
+                                     [0,2,-1])
+    # Offset by (13,-128), i.e. the Europe window is lon -25..40-128, lat 30-13..75-13.
+    visible=[i for i,(lon,lat,size,_) in enumerate(PREFECTURES['JPN']) if
+             lon<=40+128 and lon+size>=-25+128 and lat<=75-13 and lat+size>=30-13]
+    numpy.testing.assert_array_equal(country.regionPrefectures(),visible)
+    country=overlay.CountryOverlay('ARG',offset=(35,60),bordersDir=bordersDir)
+    # Flipped first, i.e. the window is lon -85..-20, lat 35-75..35-20.
+    numpy.testing.assert_array_equal(country.regionPrefectures(),[1])
+
+@pytest.mark.parametrize('countryCode',['JPN','ARG'])
+def test_greatCircle(countryCode,bordersDir):
+    """ Along a great circle, the centroid moves by the offset and the area
+    stays the same. """
+    country=overlay.CountryOverlay(countryCode,greatCircle=True,bordersDir=bordersDir)
+    partStarts=numpy.append(country.shape.parts,len(country.shape.points))
+    moved=transformCoords(country.shape.points,**country.moveKwargs())
+    before=measure(country.shape.points,partStarts,[0,1])[0]
+    after=measure(moved,partStarts,[0,1],ellipsoid=False)[0]
+    lat=-before['lat'] if country.country['flipUpsideDown'] else before['lat']
+    assert after['lat']==pytest.approx(lat+country.latOff,abs=1e-6)
+    assert after['lon']==pytest.approx(before['lon']+country.longOff,abs=1e-6)
+    assert after['area']==pytest.approx(measure(country.shape.points,partStarts,[0,1],
+                                                ellipsoid=False)[0]['area'],rel=1e-9)
+    assert not overlay.CountryOverlay(countryCode,bordersDir=bordersDir).moveKwargs().get(
+        'rotation')
+
+@pytest.mark.filterwarnings('ignore:.*not found, drawing the')
+@pytest.mark.parametrize('figure',overlay.FIGURES)
+def test_plotComparison(figure,bordersDir):
+    """ Every figure is plotted with the shared coastlines and the region name. """
+    fig=overlay.plotComparison('ARG',figure,bordersDir=bordersDir)
+    assert all(ax.collections for ax in fig.axes)
+    assert 'Europe' in fig.axes[-1].get_title()
+    matplotlib.pyplot.close(fig)
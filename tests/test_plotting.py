@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`countrySize.plotting`.
+
+@author: Alek
+"""
+import numpy
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot, matplotlib.colors
+from countrySize.plotting import plotPrefectures, plotPrefecture
+from countrySize.projection import MapProjection
+
+class _Shape(object):
+    """ Shape like :class:`shapefile.Shape`, without the importance. """
+    def __init__(self,parts):
+        self.points=numpy.vstack(parts).tolist()
+        self.parts=numpy.cumsum([0]+[len(part) for part in parts[:-1]]).tolist()
+
+def _square(lon,lat,size=1.):
+    """ Clockwise ring of a lon/lat square with the lower left corner at `lon`,
+    `lat`. """
+    return [[lon,lat],[lon,lat+size],[lon+size,lat+size],[lon+size,lat],[lon,lat]]
+
+def test_oneCollection():
+    """ All the parts of all the shapes are one artist, with the colour of
+    their shape, and are moved before being projected. """
+    shps=[_Shape([_square(130,33),_square(132,34)]),_Shape([_square(139,35)])]
+    bMap=MapProjection('merc',llcrnrlat=20,urcrnrlat=50,llcrnrlon=120,urcrnrlon=150)
+    fig,ax=matplotlib.pyplot.subplots()
+    lines=plotPrefectures(shps=shps,colours=['r','b'],bMap=bMap,axes=ax,
+                          latOff=-5,longOff=2,pixelTolerance=None)
+    assert list(ax.collections)==[lines] and not ax.lines
+    segments=lines.get_segments()
+    assert len(segments)==3
+    numpy.testing.assert_array_equal(lines.get_colors(),
+                                     matplotlib.colors.to_rgba_array(['r','r','b']))
+    x,y=bMap(numpy.array(_square(132,28))[:,0],numpy.array(_square(132,28))[:,1])
+    numpy.testing.assert_allclose(segments[0],numpy.column_stack((x,y)))
+    assert ax.get_xlim()==(bMap.llcrnrx,bMap.urcrnrx)
+    matplotlib.pyplot.close(fig)
+
+def test_flipUpsideDown():
+    """ A flipped prefecture is mirrored about the equator. """
+    bMap=MapProjection('merc',llcrnrlat=-50,urcrnrlat=50,llcrnrlon=120,urcrnrlon=150)
+    fig,ax=matplotlib.pyplot.subplots()
+    lines=plotPrefecture(shp=_Shape([_square(130,33)]),colour='k',bMap=bMap,axes=ax,
+                         flipUpsideDown=True,pixelTolerance=None)
+    square=numpy.array(_square(130,33))
+    x,y=bMap(square[:,0],-square[:,1])
+    numpy.testing.assert_allclose(lines.get_segments()[0],numpy.column_stack((x,y)))
+    matplotlib.pyplot.close(fig)
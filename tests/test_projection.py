@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`countrySize.projection`.
+
+@author: Alek
+"""
+import numpy, pytest
+from countrySize import projection, geodesy
+from countrySize.geodesy import measure
+from countrySize.projection import MapProjection
+
+def test_bundledDatasets(tmp_path):
+    """ The shipped coastlines are drawn when none were downloaded, finer
+    resolutions fall back to them with a warning. """
+    for dataset in projection.DATASETS:
+        coords,partStarts=projection.loadDataset(dataset,'c',str(tmp_path))
+        assert coords.shape[0]>1000 and partStarts[-1]==coords.shape[0]
+        assert numpy.all(numpy.abs(coords)<=[180,90])
+        with pytest.warns(UserWarning):
+            fName=projection.findDataset(dataset,'l',str(tmp_path))
+        assert fName==projection.datasetFile(dataset,'c',projection.BUNDLED_DIR)
+
+def test_missingDataset(tmp_path,monkeypatch):
+    """ No coastlines anywhere is an error, not a map without them. """
+    monkeypatch.setattr(projection,'BUNDLED_DIR',str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        projection.findDataset('coastlines','c',str(tmp_path))
+
+def test_orthoHorizon():
+    """ Points behind the globe are hidden and lines are cut at the horizon. """
+    bMap=MapProjection('ortho',lat_0=0,lon_0=0)
+    x,y=bMap([0,180],[0,0])
+    assert numpy.isfinite([x[0],y[0]]).all() and numpy.isnan([x[1],y[1]]).all()
+    lon=numpy.linspace(-120,120,241)
+    segments,parts=bMap.clipLines(numpy.column_stack((lon,numpy.zeros_like(lon))),
+                                  numpy.array([0,lon.size]))
+    assert len(segments)==1 and numpy.all(parts==0)
+    xs=segments[0][:,0]-bMap.urcrnrx/2 # Relative to the centre of the disk.
+    assert xs.min()==pytest.approx(-bMap.rmajor) and xs.max()==pytest.approx(bMap.rmajor)
+
+def test_clipIntervals():
+    """ Kept intervals that meet are joined, the others start new polylines. """
+    edge,t,starts,parts=projection.clipIntervals([0,4,6],
+        numpy.array([0.,0.,0.5,0.,0.]),numpy.array([1.,0.5,1.,1.,1.]))
+    numpy.testing.assert_array_equal(edge,[0,0,1,2,2,4,4])
+    numpy.testing.assert_array_equal(t,[0.,1.,0.5,0.5,1.,0.,1.])
+    numpy.testing.assert_array_equal(starts,[0,3,5,7])
+    numpy.testing.assert_array_equal(parts,[0,0,1])
+
+def _walks(n=30,length=60,seed=0):
+    """ Random walks of `length` points all over the globe. """
+    rng=numpy.random.default_rng(seed)
+    start=numpy.column_stack((rng.uniform(-180,180,n),rng.uniform(-80,80,n)))
+    steps=rng.normal(0,6,(n,length,2))
+    walks=start[:,None,:]+numpy.cumsum(steps,axis=1)
+    walks[...,1]=numpy.clip(walks[...,1],-89,89)
+    return walks.reshape(-1,2),numpy.arange(0,n*length+1,length)
+
+def test_orthoCulling():
+    """ Every run of points on the near side of the globe is one piece, cut
+    where the edges cross the horizon, like a point by point check. """
+    bMap=MapProjection('ortho',lat_0=30,lon_0=40)
+    coords,partStarts=_walks()
+    segments,parts=bMap.clipLines(coords,partStarts)
+    assert len(segments)==parts.size
+    nPoints=0
+    pieces=0
+    for p,(lo,hi) in enumerate(zip(partStarts[:-1],partStarts[1:])):
+        visible=bMap.visible(coords[lo:hi,0],coords[lo:hi,1]).astype(int)
+        runStarts=numpy.flatnonzero(numpy.diff(numpy.r_[0,visible])==1)
+        runEnds=numpy.flatnonzero(numpy.diff(numpy.r_[visible,0])==-1)
+        assert numpy.sum(parts==p)==runStarts.size
+        pieces+=runStarts.size
+        # The visible points plus one at the horizon where a run is cut.
+        nPoints+=visible.sum()+numpy.sum(runStarts>0)+numpy.sum(runEnds<hi-lo-1)
+    assert pieces==len(segments)
+    assert sum(len(segment) for segment in segments)==nPoints
+    radius=numpy.hypot(*(numpy.vstack(segments)-[bMap.rmajor,bMap.rmajor]).T)
+    assert radius.max()<=bMap.rmajor*(1+1e-12)
+
+def test_mercatorClipping():
+    """ Lines are clipped to the corners of the map, and what's inside stays. """
+    bMap=MapProjection('merc',llcrnrlat=-30,urcrnrlat=40,llcrnrlon=-20,urcrnrlon=60)
+    coords,partStarts=_walks(seed=1)
+    segments,parts=bMap.clipLines(coords,partStarts)
+    xy=numpy.vstack(segments)
+    tol=1e-6*bMap.urcrnrx
+    assert numpy.all((xy>=[-tol,-tol]) & (xy<=[bMap.urcrnrx+tol,bMap.urcrnry+tol]))
+    x,y=bMap(coords[:,0],coords[:,1])
+    inside=(x>0) & (x<bMap.urcrnrx) & (y>0) & (y<bMap.urcrnry)
+    kept={tuple(point) for point in xy.round(3)}
+    assert all(tuple(point) in kept for point in numpy.column_stack((x,y))[inside].round(3))
+
+def test_projections():
+    """ Mercator is conformal with the true scale at `lat_ts`, the Lambert
+    azimuthal projection keeps the areas and orthographic the distances from
+    the centre along the radius up to the horizon. """
+    R=projection.EARTH_RADIUS
+    merc=MapProjection('merc',llcrnrlat=-60,urcrnrlat=70,llcrnrlon=-30,urcrnrlon=50,lat_ts=40)
+    x,y=merc([-30,50,10,10.001],[-60,70,40,40])
+    assert (x[0],y[0])==pytest.approx((0,0),abs=1e-6)
+    assert (x[1],y[1])==pytest.approx((merc.urcrnrx,merc.urcrnry))
+    # One thousandth of a degree along the parallel of true scale.
+    assert x[3]-x[2]==pytest.approx(R*numpy.radians(0.001)*numpy.cos(numpy.radians(40)),
+                                   rel=1e-6)
+    assert merc.maxScaleFactor()==pytest.approx(numpy.cos(numpy.radians(40))/
+                                                numpy.cos(numpy.radians(70)))
+
+    laea=MapProjection('laea',lat_0=50,lon_0=10)
+    t=numpy.linspace(0,2*numpy.pi,2001)
+    for lon,lat in ((10,50),(60,20),(-100,-20)):
+        ring=numpy.column_stack((lon+3*numpy.cos(t)/numpy.cos(numpy.radians(lat)),
+                                 lat+3*numpy.sin(t)))
+        x,y=laea(ring[:,0],ring[:,1])
+        planar=0.5*abs(numpy.dot(x[:-1],y[1:])-numpy.dot(x[1:],y[:-1]))
+        # km^2 on a sphere of geodesy.EARTH_RADIUS, rescaled to m^2 on this one.
+        sphere=measure(ring,[0,len(ring)],ellipsoid=False)[0]['area']*(
+               R/geodesy.EARTH_RADIUS)**2
+        assert planar==pytest.approx(sphere,rel=1e-4)
+
+    ortho=MapProjection('ortho',lat_0=-30,lon_0=120)
+    x,y=ortho([120,120,120],[-30,30,60])
+    distance=numpy.hypot(x-ortho.rmajor,y-ortho.rmajor)
+    numpy.testing.assert_allclose(distance,R*numpy.sin(numpy.radians([0,60,90])),atol=1e-6)
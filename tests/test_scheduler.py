@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`plotTools.scheduler`.
+
+@author: Alek
+"""
+import numpy, os, pickle
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot
+from plotTools import FigureSpec, SharedArray, renderFigures
+
+def plotWalk(walk,title):
+    """ Figure with a line, module-level so the workers can unpickle it. """
+    fig,ax=matplotlib.pyplot.subplots(figsize=(3,2),dpi=50)
+    ax.plot(walk)
+    ax.set_title(title)
+    return fig
+
+def test_sharedArray():
+    """ Unpickled arrays are views of the same memory, freed by the owner. """
+    shared=SharedArray(numpy.arange(12.).reshape(3,4))
+    try:
+        copy=pickle.loads(pickle.dumps(shared))
+        assert len(pickle.dumps(shared))<200 # Not the data.
+        numpy.testing.assert_array_equal(copy.array,shared.array)
+        shared.array[1,2]=-1
+        assert copy.array[1,2]==-1
+        copy.unlink() # Not the owner, nothing happens.
+        assert copy.array is not None
+        del copy
+    finally:
+        shared.unlink()
+    assert shared.array is None
+
+def test_renderFigures(tmp_path):
+    """ Figures rendered in a pool, in all their formats, are the same as in
+    this process. """
+    walk=SharedArray(numpy.cumsum(numpy.random.default_rng(0).normal(size=1000)))
+    try:
+        files={}
+        for processes in (1,2):
+            specs=[FigureSpec(plotWalk,dict(walk=walk,title=str(i)),
+                              [os.path.join(tmp_path,'{}_{}.{}'.format(processes,i,fmt))
+                               for fmt in ('png','svg')]) for i in range(3)]
+            fNames=renderFigures(specs,processes=processes,cache=False)
+            assert fNames==[spec.fileName for spec in specs]
+            files[processes]=[fName for spec in specs for fName in spec.fileName]
+    finally:
+        walk.unlink()
+    for single,pooled in zip(files[1],files[2]):
+        assert os.path.isfile(pooled)
+        if not single.endswith('.png'): # The others have the date in them.
+            continue
+        with open(single,'rb') as singleFile, open(pooled,'rb') as pooledFile:
+            assert singleFile.read()==pooledFile.read()
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`countrySize.shapeCache`.
+
+@author: Alek
+"""
+import numpy, shapefile, os, datetime
+from countrySize.shapeCache import loadLayer
+
+def _write(fName):
+    """ Shapefile with two polygons, one with a hole, and fields of every type. """
+    with shapefile.Writer(fName,shapeType=shapefile.POLYGON) as shapeWtr:
+        shapeWtr.field('NAME','C',size=12)
+        shapeWtr.field('COUNT','N',size=8,decimal=0)
+        shapeWtr.field('RATIO','N',size=10,decimal=3)
+        shapeWtr.field('FLAG','L')
+        shapeWtr.field('UPDATED','D')
+        shapeWtr.poly([[[0,0],[0,1],[1,1],[1,0],[0,0]]])
+        shapeWtr.record('first',3,0.5,True,datetime.date(2018,8,3))
+        shapeWtr.poly([[[2,0],[2,3],[5,3],[5,0],[2,0]],[[3,1],[4,1],[4,2],[3,2],[3,1]]])
+        shapeWtr.record('second',-7,1.25,False,None)
+
+def test_layer(tmp_path):
+    """ The cached layer has the same shapes and records as the shapefile. """
+    fName=os.path.join(tmp_path,'layer')
+    _write(fName)
+    layer=loadLayer(fName)
+    with shapefile.Reader(fName) as shapeRdr:
+        for i,shp in enumerate(shapeRdr.shapes()):
+            numpy.testing.assert_array_equal(layer.shape(i).points,shp.points)
+            numpy.testing.assert_array_equal(layer.shape(i).parts,shp.parts)
+    records=layer.records()
+    assert list(records['NAME'])==['first','second']
+    assert list(records['COUNT'])==[3,-7]
+    numpy.testing.assert_allclose(records['RATIO'],[0.5,1.25])
+    assert list(records['FLAG'])==[True,False]
+    assert list(records['UPDATED'])==['2018-08-03',''] # Not truncated.
+    assert os.path.isdir(fName+'.cache')
+    # Memory-mapped from the cache the second time.
+    assert isinstance(loadLayer(fName).coords,numpy.memmap)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`countrySize.simplify`.
+
+@author: Alek
+"""
+import numpy, pytest
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot
+from countrySize.simplify import vertexImportance, simplifyMask, mapTolerance
+from countrySize.projection import MapProjection
+from plotTools import export
+
+def _neighbours(start):
+    """ Two rings that share a wiggly border, the second one starts at vertex
+    `start` of the border. """
+    t=numpy.linspace(0,1,41)
+    border=numpy.column_stack((t,0.05*numpy.sin(t*37)+0.03*numpy.cos(t*91)))
+    ringA=numpy.vstack([border,[[1,1],[0,1]],border[:1]])
+    back=border[::-1]
+    ringB=numpy.vstack([back[start:],[[0,-1],[1,-1]],back[:start+1]])
+    coords=numpy.vstack([ringA,ringB])
+    return coords,numpy.array([0,len(ringA),len(coords)])
+
+@pytest.mark.parametrize('start',[0,1,17,40])
+@pytest.mark.parametrize('tolerance',[0.005,0.02,0.1])
+def test_sharedBorder(start,tolerance):
+    """ Both sides of a shared border keep the same vertices. """
+    coords,partStarts=_neighbours(start)
+    keep=simplifyMask(vertexImportance(coords,partStarts),tolerance)
+    sides=[]
+    for lower,upper in zip(partStarts[:-1],partStarts[1:]):
+        ring=coords[lower:upper][keep[lower:upper]]
+        sides.append({tuple(p) for p in ring if abs(p[1])<0.5})
+    assert sides[0]==sides[1]
+
+def test_nested():
+    """ Coarser levels are subsets of the finer ones. """
+    coords,partStarts=_neighbours(17)
+    importance=vertexImportance(coords,partStarts)
+    fine,coarse=simplifyMask(importance,0.005),simplifyMask(importance,0.05)
+    assert numpy.all(fine[coarse]) and coarse.sum()<fine.sum()
+
+def test_mapTolerance():
+    """ Finer at higher latitudes of Mercator maps and at higher save DPI. """
+    fig,ax=matplotlib.pyplot.subplots(figsize=(4,4),dpi=100)
+    low=MapProjection('merc',llcrnrlat=-10,urcrnrlat=10,llcrnrlon=0,urcrnrlon=20)
+    high=MapProjection('merc',llcrnrlat=50,urcrnrlat=60,llcrnrlon=0,urcrnrlon=20)
+    assert mapTolerance(high,ax)<mapTolerance(low,ax)
+    tolerance=mapTolerance(low,ax)
+    with export.savingAt(300):
+        assert mapTolerance(low,ax)==pytest.approx(tolerance/3)
+    matplotlib.pyplot.close(fig)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`plotTools.sketch`.
+
+@author: Alek
+"""
+import numpy, pytest
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot
+from plotTools.sketch import freezeSketch, sketchPolyline
+
+def test_sketchPolyline():
+    """ The line is cut into one-pixel segments and moved by at most `scale`. """
+    xy=numpy.array([[0.,0.],[100.,0.],[100.,50.]])
+    jittered,phase=sketchPolyline(xy,scale=3.)
+    assert jittered.shape[0]==151
+    assert numpy.abs(jittered[1:101,1]).max()<=3.
+    assert numpy.abs(jittered[1:101,1]).max()>1.
+    numpy.testing.assert_array_equal(jittered[0],xy[0])
+    numpy.testing.assert_array_equal(sketchPolyline(xy,scale=3.)[0],jittered) # Seeded.
+
+@pytest.mark.parametrize('adjustable',['box','datalim'])
+def test_aspect(adjustable):
+    """ The jitter is computed in the pixels of the laid out axes, e.g. with
+    an equal aspect the line is cut into as many segments as it has pixels. """
+    with matplotlib.pyplot.xkcd():
+        fig,ax=matplotlib.pyplot.subplots(figsize=(8,2),dpi=100)
+        ax.plot([0,1],[0.5,0.5])
+        ax.set_xlim(0,1)
+        ax.set_ylim(0,1)
+        ax.set_aspect('equal',adjustable=adjustable)
+        assert freezeSketch(fig)==1
+    line=ax.lines[0]
+    assert line.get_sketch_params() is None
+    fig.canvas.draw()
+    pixels=ax.transData.transform([[0,0.5],[1,0.5]])
+    assert abs(len(line.get_xdata())-1-numpy.ceil(numpy.diff(pixels[:,0])[0]))<=1
+    matplotlib.pyplot.close(fig)
+
+def test_markers():
+    """ Lines with markers are split, the markers stay at the data points. """
+    with matplotlib.pyplot.xkcd():
+        fig,ax=matplotlib.pyplot.subplots()
+        ax.plot([0,1,2],[0,1,0],'o-',label='data')
+        freezeSketch(fig)
+    line,markers=ax.lines
+    assert line.get_marker()=='None' and len(line.get_xdata())>3
+    assert markers.get_linestyle()=='None'
+    numpy.testing.assert_array_equal(markers.get_xydata(),[[0,0],[1,1],[2,0]])
+    assert [h.get_label() for h in ax.get_legend_handles_labels()[0]]==['data']
+    matplotlib.pyplot.close(fig)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`countrySize.spatialIndex`.
+
+@author: Alek
+"""
+import numpy, pytest
+import matplotlib.path, matplotlib.transforms
+from countrySize.shapeCache import CachedLayer
+from countrySize.spatialIndex import RegionIndex
+
+def _layer(nShapes=60,seed=0):
+    """ Star-shaped rings scattered on a plane, every third one with a hole
+    and every fifth one with a second, shifted part. """
+    rng=numpy.random.default_rng(seed)
+    rings,shapeParts=[],[]
+    for i in range(nShapes):
+        centre=rng.uniform([0,0],[40,20])
+        t=numpy.sort(rng.uniform(0,2*numpy.pi,rng.integers(5,30)))
+        radius=rng.uniform(0.5,2.5,t.size)
+        ring=centre+numpy.column_stack((radius*numpy.cos(t),radius*numpy.sin(t)))
+        parts=[numpy.vstack([ring,ring[:1]])]
+        if i%3==0: # Hole, anticlockwise.
+            hole=centre+0.2*numpy.array([[-1,-1],[1,-1],[1,1],[-1,1],[-1,-1]])
+            parts.append(hole)
+        if i%5==0:
+            parts.append(parts[0]+[3,1])
+        rings+=parts
+        shapeParts.append(len(parts))
+    coords=numpy.vstack(rings)
+    partStarts=numpy.concatenate(([0],numpy.cumsum([len(r) for r in rings])))
+    shapeStarts=numpy.concatenate(([0],numpy.cumsum(shapeParts)))
+    return CachedLayer(coords,partStarts,shapeStarts,numpy.full(nShapes,5),None,None)
+
+def _rings(layer,shape):
+    """ Paths of the parts of `shape`. """
+    parts=layer.partStarts[layer.shapeStarts[shape]:layer.shapeStarts[shape+1]+1]
+    return [matplotlib.path.Path(layer.coords[lo:hi]) for lo,hi in zip(parts[:-1],parts[1:])]
+
+def _inside(layer,points):
+    """ Brute-force even-odd test of all the points against all the shapes. """
+    return numpy.array([sum(ring.contains_points(points).astype(int) for ring in
+                            _rings(layer,shape))%2==1 for shape in range(layer.numRecords)])
+
+@pytest.mark.parametrize('nodeSize',[2,4,16])
+def test_locate(nodeSize):
+    """ Points are located in the same shapes as a brute-force search. """
+    layer=_layer()
+    index=RegionIndex(layer,nodeSize)
+    rng=numpy.random.default_rng(1)
+    points=numpy.vstack([rng.uniform([-3,-3],[43,23],(2000,2)),
+                         layer.coords[layer.partStarts[:-1]]+[0.01,0.013],[[100,100]]])
+    inside=_inside(layer,points)
+    expected=numpy.where(inside.any(axis=0),inside.argmax(axis=0),-1)
+    numpy.testing.assert_array_equal(index.locate(points),expected)
+
+@pytest.mark.parametrize('nodeSize',[2,16])
+def test_intersecting(nodeSize):
+    """ Shapes in a window are the ones with an edge in it or around it. """
+    layer=_layer()
+    index=RegionIndex(layer,nodeSize)
+    rng=numpy.random.default_rng(2)
+    for lon,lat,width,height in rng.uniform([-5,-5,0.1,0.1],[40,20,10,5],(50,4)):
+        window=(lon,lat,lon+width,lat+height)
+        box=matplotlib.transforms.Bbox.from_extents(*window)
+        around=_inside(layer,[[lon,lat]])[:,0]
+        expected=[shape for shape in range(layer.numRecords) if around[shape] or
+                  any(ring.intersects_bbox(box,filled=False) for ring in _rings(layer,shape))]
+        numpy.testing.assert_array_equal(index.intersecting(window),expected)
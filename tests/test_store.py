@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`slack.store`.
+
+@author: Alek
+"""
+import pandas, os
+from slack import store, ingest, cube
+
+EXPORT=os.path.join(os.path.dirname(__file__),'..','slack','SlackAnalytics03Aug2018.csv')
+
+def _exports(directory):
+    """ An older export with the first days of :data:`EXPORT` and a newer one
+    with all of them and a revised day, which is returned too. """
+    rows=pandas.read_csv(EXPORT,dtype=str)
+    older=os.path.join(directory,'SlackAnalytics01Mar2018.csv')
+    rows.iloc[:400].to_csv(older,index=False)
+    revised=100
+    rows.loc[revised,'Messages in DMs']=str(int(rows.loc[revised,'Messages in DMs'])+7)
+    newer=os.path.join(directory,'SlackAnalytics03Aug2018.csv')
+    rows.to_csv(newer,index=False)
+    return older,newer,pandas.Timestamp(rows.loc[revised,'Date'])
+
+def test_incremental(tmp_path):
+    """ Merging the exports one after the other gives the same days and cube as
+    resampling the newest one, and only writes the new and revised days. """
+    older,newer,revised=_exports(tmp_path)
+    with store.Store(os.path.join(tmp_path,'slack.sqlite')) as db:
+        assert db.addMessages(older,chunksize=45)==400
+        assert db.addMessages(older,chunksize=45)==0 # Nothing new.
+        assert db.addMessages(newer,chunksize=45)==541-400+1
+        daily,weekly=ingest.loadMessages(newer)
+        stored=db.daily()
+        pandas.testing.assert_frame_equal(stored[ingest.DAILY_COLUMNS],daily,
+                                          check_freq=False,check_names=False)
+        assert stored.loc[revised,'Messages in DMs']==pandas.read_csv(
+            newer,index_col='Date',parse_dates=True).loc[revised,'Messages in DMs']
+        pandas.testing.assert_frame_equal(db.weekly(),weekly,check_freq=False,
+                                          check_names=False)
+        for granularity in cube.GRANULARITIES:
+            pandas.testing.assert_frame_equal(db.cube(granularity),
+                cube.aggregate(stored,granularity),check_dtype=False,check_freq=False,
+                check_names=False) # The levels are stored as REAL.
+
+def test_withoutHashes(tmp_path):
+    """ Days stored before the row hashes are written again. """
+    older,newer,revised=_exports(tmp_path)
+    fName=os.path.join(tmp_path,'slack.sqlite')
+    with store.Store(fName) as db:
+        db.addMessages(older)
+        db.connection.execute('ALTER TABLE daily DROP COLUMN Hash')
+    with store.Store(fName) as db:
+        assert db.addMessages(older)==400
+        assert db.addMessages(older)==0
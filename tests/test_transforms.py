@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`countrySize.transforms`.
+
+@author: Alek
+"""
+import numpy
+from countrySize.transforms import (rotationMatrix, rotationMatrices, rotateCoords,
+    transformCoords, relocationMatrix, relocateShapes, toUnitVectors)
+from countrySize.geodesy import measure
+
+def _layer():
+    """ Three shapes, the second one with two parts, and an empty fourth one. """
+    rng=numpy.random.default_rng(3)
+    rings,partStarts=[],[0]
+    for lon,lat,n in [(10,40,7),(-70,-30,5),(-60,-35,9),(140,35,12)]:
+        t=numpy.linspace(0,2*numpy.pi,n)
+        radius=2+rng.random(n)
+        ring=numpy.column_stack((lon+radius*numpy.cos(t),lat+radius*numpy.sin(t)))
+        ring[-1]=ring[0]
+        rings.append(ring)
+        partStarts.append(partStarts[-1]+n)
+    partStarts.append(partStarts[-1])
+    return numpy.vstack(rings),numpy.array(partStarts),numpy.array([0,1,3,4,5])
+
+def test_rotationMatrices():
+    """ The batched rotations are the same as one at a time and move the sources
+    to the targets. """
+    sources=numpy.array([[40.,10.],[-30.,-70.],[0.,0.],[89.,179.]])
+    targets=numpy.array([[10.,100.],[30.,50.],[0.,0.],[-89.,-1.]])
+    rotations=rotationMatrices(sources,targets)
+    for source,target,rotation in zip(sources,targets,rotations):
+        numpy.testing.assert_allclose(rotation,rotationMatrix(source,target),atol=1e-12)
+        numpy.testing.assert_allclose(rotation.dot(rotation.T),numpy.eye(3),atol=1e-12)
+        moved=rotateCoords(numpy.array([source[::-1]]),rotation)
+        numpy.testing.assert_allclose(toUnitVectors(moved),
+                                      toUnitVectors(numpy.array([target[::-1]])),atol=1e-12)
+
+def test_relocateShapes():
+    """ Every shape is rotated with its own matrix, like one at a time, and
+    keeps its size on the sphere. """
+    coords,partStarts,shapeStarts=_layer()
+    targets=numpy.array([[0.,0.],[50.,20.],[-20.,150.],[0.,0.]])
+    moved=relocateShapes(coords,partStarts,shapeStarts,targets)
+    for i,target in enumerate(targets[:3]):
+        shapeParts=partStarts[shapeStarts[i]:shapeStarts[i+1]+1]
+        lower,upper=shapeParts[0],shapeParts[-1]
+        rotation=relocationMatrix(coords[lower:upper],shapeParts-lower,target)
+        expected=rotateCoords(coords[lower:upper],rotation)
+        numpy.testing.assert_allclose(toUnitVectors(moved[lower:upper]),
+                                      toUnitVectors(expected),atol=1e-12)
+    before=measure(coords,partStarts,shapeStarts,ellipsoid=False)
+    after=measure(moved,partStarts,shapeStarts,ellipsoid=False)
+    for key in ('area','perimeter'):
+        numpy.testing.assert_allclose(after[key][:3],before[key][:3],rtol=1e-9)
+    numpy.testing.assert_allclose(after['lat'][:3],targets[:3,0],atol=1e-6)
+    numpy.testing.assert_allclose(after['lon'][:3],targets[:3,1],atol=1e-6)
+
+def test_relativeTarget():
+    """ A relative target offsets the (flipped) centroid. """
+    coords,partStarts,shapeStarts=_layer()
+    shape,shapeParts=coords[:7],partStarts[:2]
+    centroid=measure(shape,shapeParts,[0,1])[0]
+    for flip in (False,True):
+        lat=-centroid['lat'] if flip else centroid['lat']
+        numpy.testing.assert_allclose(
+            relocationMatrix(shape,shapeParts,(5.,-20.),flip,relative=True),
+            relocationMatrix(shape,shapeParts,(lat+5.,centroid['lon']-20.),flip),
+            atol=1e-12)
+
+def test_transformCoords():
+    """ Flipping and offsetting are the same as per part, in place too, and
+    a rotation of the flipped shape is the same as rotating a flipped copy. """
+    coords,partStarts,shapeStarts=_layer()
+    expected=numpy.vstack([numpy.column_stack((part[:,0]+3,-part[:,1]-2)) for part in
+                           numpy.split(coords,partStarts[1:-1])])
+    numpy.testing.assert_array_equal(transformCoords(coords,latOff=-2,longOff=3,
+                                                     flipUpsideDown=True),expected)
+    original=coords.copy()
+    numpy.testing.assert_array_equal(transformCoords(coords,flipUpsideDown=True),
+                                     original*[1,-1])
+    numpy.testing.assert_array_equal(coords,original) # Not modified.
+    rotation=rotationMatrix((-40.,10.),(0.,0.))
+    numpy.testing.assert_allclose(transformCoords(coords,flipUpsideDown=True,rotation=rotation,
+                                                  lonCentre=0.),
+                                  rotateCoords(original*[1,-1],rotation,lonCentre=0.),atol=1e-12)
+    out=transformCoords(coords,latOff=1,out=coords)
+    assert out is coords
+    numpy.testing.assert_array_equal(coords,original+[0,1])
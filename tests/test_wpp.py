@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :mod:`wpp`.
+
+@author: Alek
+"""
+import pandas, numpy, os, pytest
+import wpp
+from wpp.interpolate import KINDS
+
+FNAME=os.path.join(os.path.dirname(os.path.abspath(__file__)),os.pardir,
+                   'WPP2015_POP_F05_MEDIAN_AGE.XLS')
+
+def _bruteForce(years,values,birthYear,step=1e-3):
+    """ First year on a fine grid when the age reaches every median age, NaN
+    if it's reached at the first year or right after missing median ages. """
+    grid=numpy.arange(years[0],years[-1]+step/2,step)
+    out=numpy.full(values.shape[0],numpy.nan)
+    for s,series in enumerate(values):
+        gap=grid-birthYear-numpy.interp(grid,years,series) # NaN next to missing ages.
+        older=numpy.flatnonzero(gap>=0)
+        if older.size and older[0]>0 and numpy.isfinite(gap[older[0]-1]):
+            out[s]=grid[older[0]]
+    return out
+
+def test_crossoverYears():
+    """ Closed-form roots are where a brute-force search finds them. """
+    rng=numpy.random.default_rng(0)
+    years=numpy.arange(1950,2101,5.)
+    # Median ages growing by less than a year per year, like the real ones.
+    values=20+numpy.cumsum(rng.uniform(0,4,(50,years.size)),axis=1)
+    values[3,7]=numpy.nan
+    birthYears=numpy.array([1900.,1950.,1990.,2050.])
+    t=wpp.crossoverYears(years,values,birthYears)
+    assert t.shape==(50,4)
+    for b,birthYear in enumerate(birthYears):
+        expected=_bruteForce(years,values,birthYear)
+        numpy.testing.assert_array_equal(numpy.isnan(t[:,b]),numpy.isnan(expected))
+        numpy.testing.assert_allclose(t[:,b],expected,atol=2e-3)
+
+@pytest.mark.skipif(not os.path.isfile(FNAME),reason='No UN workbook.')
+def test_crossoverTable():
+    """ The table has every variant, country and birth year, and the World
+    crossovers are where a brute-force search finds them. """
+    table=wpp.crossoverTable(FNAME,[1960,1990],variants=['MEDIUM VARIANT','LOW VARIANT'])
+    world=table.xs(900,level='Country code')['crossover']
+    workbook=wpp.loadWorkbook(FNAME)
+    history=wpp.CountryIndex(workbook['ESTIMATES']['codes'],workbook['ESTIMATES']['years'],
+                             workbook['ESTIMATES']['values'],dtype=float)
+    for variant in ('MEDIUM VARIANT','LOW VARIANT'):
+        sheet=wpp.joinHistory(history,wpp.CountryIndex(workbook[variant]['codes'],
+            workbook[variant]['years'],workbook[variant]['values'],dtype=float))
+        assert len(table.xs(variant,level='variant'))==2*sheet.codes.size
+        series=sheet.matrix([900])
+        for birthYear in (1960,1990):
+            assert world[(variant,birthYear)]==pytest.approx(
+                   _bruteForce(sheet.years,series,birthYear)[0],abs=2e-3)
+
+@pytest.mark.parametrize('kind',KINDS)
+def test_interpolate(kind):
+    """ Batched interpolation is the same as scipy's, series by series. """
+    interpolate=pytest.importorskip('scipy.interpolate')
+    rng=numpy.random.default_rng(1)
+    x=numpy.cumsum(rng.uniform(0.5,5,12))
+    values=rng.normal(30,5,(20,x.size))
+    values[0]=numpy.linspace(10,40,x.size) # Monotone.
+    values[1,4:8]=values[1,4] # Plateau.
+    xNew=numpy.concatenate([x,numpy.linspace(x[0],x[-1],301)])
+    y=wpp.interpolate(x,values,xNew,kind)
+    assert y.shape==(20,xNew.size)
+    for series,yS in zip(values,y):
+        expected=(interpolate.interp1d(x,series)(xNew) if kind=='linear' else
+                  interpolate.PchipInterpolator(x,series)(xNew))
+        numpy.testing.assert_allclose(yS,expected,rtol=1e-12,atol=1e-12)
+    numpy.testing.assert_allclose(y[1,(xNew>=x[4])&(xNew<=x[7])],values[1,4],rtol=1e-15)
+    assert numpy.isnan(wpp.interpolate(x,values,[x[0]-1,x[-1]+1],kind)).all()
+
+def test_interpolateErrors():
+    """ Unknown kinds and unsorted knots are refused. """
+    with pytest.raises(ValueError):
+        wpp.BatchInterpolator([0,1],[0,1],'cubic')
+    with pytest.raises(ValueError):
+        wpp.BatchInterpolator([0,2,1],[0,1,2])
+
+@pytest.mark.skipif(not os.path.isfile(FNAME),reason='No UN workbook.')
+def test_cache(tmp_path):
+    """ The cached sheets are the same as the workbook, are loaded once, and
+    a corrupted cache is converted again. """
+    cacheFile=os.path.join(tmp_path,'medianAge.npz')
+    df=wpp.loadSheet(FNAME,'ESTIMATES',cacheFile)
+    expected,names=wpp.tidySheet(pandas.read_excel(FNAME,sheet_name='ESTIMATES',header=0,
+                                                   skiprows=wpp.workbook.HEADER_ROWS))
+    pandas.testing.assert_frame_equal(df,expected,check_column_type=False)
+    workbook=wpp.loadWorkbook(FNAME,cacheFile)
+    assert list(workbook['ESTIMATES']['names'])==names.tolist()
+    assert wpp.loadWorkbook(FNAME,cacheFile) is workbook
+    with open(cacheFile,'wb') as npzFile:
+        npzFile.write(b'Not a cache.')
+    numpy.testing.assert_array_equal(wpp.loadWorkbook(FNAME,cacheFile)['ESTIMATES']['values'],
+                                     workbook['ESTIMATES']['values'])
+
+@pytest.mark.skipif(not os.path.isfile(FNAME),reason='No UN workbook.')
+def test_readSheets():
+    """ The sheets read in one pass are the same as one at a time, without the
+    notes, and their long format has every value once. """
+    sheets=wpp.readSheets(FNAME)
+    assert list(sheets)==['ESTIMATES','MEDIUM VARIANT','HIGH VARIANT','LOW VARIANT',
+        'CONSTANT-FERTILITY','INSTANT-REPLACEMENT','ZERO-MIGRATION','CONSTANT-MORTALITY',
+        'NO CHANGE']
+    for sheetName in ('ESTIMATES','LOW VARIANT'):
+        expected,names=wpp.tidySheet(pandas.read_excel(FNAME,sheet_name=sheetName,header=0,
+                                     skiprows=wpp.workbook.HEADER_ROWS))
+        pandas.testing.assert_frame_equal(sheets[sheetName][0],expected)
+        pandas.testing.assert_series_equal(sheets[sheetName][1],names)
+    long=wpp.toLongFormat({sheetName:df for sheetName,(df,names) in sheets.items()})
+    assert long.index.is_unique
+    assert len(long)==sum(df.shape[0]*(df.shape[1]-1) for df,names in sheets.values())
+    df=sheets['LOW VARIANT'][0]
+    assert long.loc[('LOW VARIANT',900,2050.),'value']==df.loc[df['Country code']==900,2050.].item()
+
+def test_countryIndex():
+    """ Lookups are the same as the boolean masks, also with duplicated codes. """
+    rng=numpy.random.default_rng(2)
+    codes=numpy.array([900,4,8,12,4,999])
+    years=numpy.arange(1950.,2016.,5.)
+    values=rng.uniform(10,50,(codes.size,years.size))
+    df=pandas.DataFrame(values,columns=years)
+    df.insert(0,'Country code',codes)
+    index=wpp.CountryIndex.fromDataFrame(df,dtype=float)
+    for code in (900,4,8,12,999):
+        series,seriesYears=index.series(code)
+        numpy.testing.assert_array_equal(series,
+            df[df['Country code']==code][years].to_numpy()[0]) # First match.
+        numpy.testing.assert_array_equal(seriesYears,years)
+    numpy.testing.assert_array_equal(index.matrix([12,900]),values[[3,0]])
+    with pytest.raises(KeyError):
+        index.series(5)
+
+@pytest.mark.skipif(not os.path.isfile(FNAME),reason='No UN workbook.')
+def test_indexSheet():
+    """ The sheet index is built once and matches the sheet. """
+    index=wpp.indexSheet(FNAME,'ESTIMATES',dtype=float)
+    assert wpp.indexSheet(FNAME,'ESTIMATES',dtype=float) is index
+    df=wpp.loadSheet(FNAME,'ESTIMATES')
+    numpy.testing.assert_array_equal(index.series(392)[0],
+        df[df['Country code']==392][df.columns[1:]].to_numpy()[0])
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+Fast access to the World Population Prospects data that are available on the
+[UN website](https://esa.un.org/unpd/wpp/Download/Standard/Population/), e.g.
+the median age used by gettingOld.py.
+
+@author: Alek
+"""
+from .cache import loadSheet, loadWorkbook, loadVariants, convertWorkbook
+from .workbook import readSheets, tidySheet, toLongFormat
+from .index import CountryIndex, indexSheet
+from .crossover import crossoverYears, crossoverTable, joinHistory
+from .interpolate import BatchInterpolator, interpolate, monotoneSlopes
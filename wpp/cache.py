@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar cache of the UN World Population Prospects Excel workbooks.
+
+Parsing the legacy XLS takes much longer than the analyses, so every sheet with
+country data is converted once into a NumPy `.npz` file next to the workbook
+with, per sheet:
+
+* `codes` - (C,) int64 country codes,
+* `names` - (C,) names of the countries and regions,
+* `years` - (Y,) float64 years of the columns,
+* `values` - (C,Y) float64 data.
+
+The cache is rebuilt when the size or modification time of the workbook
+change and its SHA-1 hash doesn't match the cached one. The workbook is read
+in one pass, see :mod:`wpp.workbook`, and the cache is loaded once per process.
+
+@author: Alek
+"""
+import pandas, numpy, os, json, hashlib
+from .workbook import readSheets, toLongFormat, CODE_COLUMN
+
+CACHE_SUFFIX='.npz' # Appended to the workbook name to get the cache file.
+
+_WORKBOOKS={} # Workbooks loaded so far and the stamps of their cache files.
+
+def _sha1(fName):
+    """ SHA-1 hash of the contents of file `fName`. """
+    digest=hashlib.sha1()
+    with open(fName,'rb') as dataFile:
+        for chunk in iter(lambda: dataFile.read(1<<20),b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _stamp(fName):
+    """ Size and modification time of file `fName`. """
+    stat=os.stat(fName)
+    return [stat.st_size,stat.st_mtime_ns]
+
+def convertWorkbook(fName,cacheFile=None):
+    """ Read every sheet of workbook `fName` once and save it to `cacheFile`.
+
+    Sheets without the 'Country code' column, e.g. the notes, are skipped.
+
+    Args
+    -------
+    * fName (str): UN workbook accepted by :func:`pandas.read_excel`,
+    * cacheFile (str): where to save the data, defaults to `fName` with
+      :data:`CACHE_SUFFIX`.
+    """
+    cacheFile=fName+CACHE_SUFFIX if cacheFile is None else cacheFile
+    arrays={}
+    sheetNames=[]
+    for i,(sheetName,(df,names)) in enumerate(readSheets(fName).items()):
+        sheetNames.append(sheetName)
+        arrays['codes{}'.format(i)]=df[CODE_COLUMN].to_numpy(dtype=numpy.int64)
+        arrays['names{}'.format(i)]=names.to_numpy(dtype=str)
+        arrays['years{}'.format(i)]=numpy.array(df.columns[1:].tolist(),dtype=float)
+        arrays['values{}'.format(i)]=df[df.columns[1:]].to_numpy(dtype=float)
+
+    meta=dict(sheets=sheetNames,stamp=_stamp(fName),sha1=_sha1(fName))
+    # Write to a temporary file first not to leave a half-written cache.
+    with open(cacheFile+'.tmp','wb') as npzFile:
+        numpy.savez(npzFile,meta=json.dumps(meta),**arrays)
+    os.replace(cacheFile+'.tmp',cacheFile)
+
+def _isValid(fName,meta):
+    """ Whether the cache with `meta` is up to date with workbook `fName`. """
+    if meta['stamp']==_stamp(fName):
+        return True
+    return meta['sha1']==_sha1(fName) # E.g. touched or copied, but the same.
+
+def loadWorkbook(fName,cacheFile=None):
+    """ Get all the sheets of a UN workbook, converting it if needed.
+
+    Args
+    -------
+    * fName (str): UN workbook accepted by :func:`pandas.read_excel`,
+    * cacheFile (str): where the data are cached, defaults to `fName` with
+      :data:`CACHE_SUFFIX`.
+
+    Returns
+    -------
+    Dict with the sheet names as keys and dicts with `codes`, `names`, `years`
+    and `values` arrays as values. The same dict is returned while neither the
+    workbook nor the cache change, so don't modify it.
+    """
+    cacheFile=fName+CACHE_SUFFIX if cacheFile is None else cacheFile
+    for attempt in range(2):
+        try:
+            stamp=_stamp(fName)+_stamp(cacheFile)
+            if cacheFile in _WORKBOOKS and _WORKBOOKS[cacheFile][0]==stamp:
+                return _WORKBOOKS[cacheFile][1] # Already loaded in this process.
+            with numpy.load(cacheFile) as npz:
+                meta=json.loads(str(npz['meta']))
+                if _isValid(fName,meta):
+                    sheets={sheetName:{key:npz['{}{}'.format(key,i)] for key in
+                                       ('codes','names','years','values')}
+                            for i,sheetName in enumerate(meta['sheets'])}
+                    _WORKBOOKS[cacheFile]=(stamp,sheets)
+                    return sheets
+        except (OSError,ValueError,KeyError): # No cache or a corrupted one.
+            pass
+        convertWorkbook(fName,cacheFile)
+    raise RuntimeError('Could not cache {} in {}'.format(fName,cacheFile))
+
+def loadSheet(fName,sheetName,cacheFile=None):
+    """ Get one sheet of a UN workbook as a dataframe.
+
+    The dataframe is the same as the one read with :func:`pandas.read_excel`
+    after dropping the 'Index', 'Variant', country name and 'Notes' columns,
+    i.e. it has the 'Country code' column followed by one column per year.
+
+    Args
+    -------
+    * fName (str): UN workbook accepted by :func:`pandas.read_excel`,
+    * sheetName (str): name of the sheet, e.g. 'ESTIMATES',
+    * cacheFile (str): where the data are cached, defaults to `fName` with
+      :data:`CACHE_SUFFIX`.
+
+    Returns
+    -------
+    :class:`pandas.DataFrame` with the data.
+    """
+    sheet=loadWorkbook(fName,cacheFile)[sheetName]
+    df=pandas.DataFrame(sheet['values'],columns=sheet['years'])
+    df.insert(0,CODE_COLUMN,sheet['codes'])
+    return df
+
+def loadVariants(fName,sheetNames=None,cacheFile=None):
+    """ Get many sheets of a UN workbook as one long-format dataframe.
+
+    Args
+    -------
+    * fName (str): UN workbook accepted by :func:`pandas.read_excel`,
+    * sheetNames (list of str): sheets to get, e.g. 'ESTIMATES' and
+      'LOW VARIANT', defaults to all of them,
+    * cacheFile (str): where the data are cached, defaults to `fName` with
+      :data:`CACHE_SUFFIX`.
+
+    Returns
+    -------
+    :class:`pandas.DataFrame` with one 'value' column and a (variant, country
+    code, year) :class:`pandas.MultiIndex`, see :func:`wpp.workbook.toLongFormat`.
+    """
+    workbook=loadWorkbook(fName,cacheFile)
+    sheetNames=list(workbook) if sheetNames is None else sheetNames
+    return toLongFormat({sheetName:loadSheet(fName,sheetName,cacheFile)
+                         for sheetName in sheetNames})
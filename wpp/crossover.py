@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Find when a person becomes older than the median age of a population.
+
+The age of someone born in year `b` is the line `t-b`, which only crosses the
+piecewise-linear median age `m(t)` given at the years of a UN workbook once,
+because the median age grows slower than one year per year. The crossover is
+the root of `t-b-m(t)` in the first interval where it changes sign, found in
+closed form for all the countries, variants and birth years at once.
+
+@author: Alek
+"""
+import pandas, numpy
+from .cache import loadWorkbook
+from .index import CountryIndex
+from .workbook import CODE_COLUMN
+
+HISTORY='ESTIMATES' # Sheet with the historical data preceding the forecasts.
+
+def crossoverYears(years,values,birthYears):
+    """ Years when people born in `birthYears` get older than the median age.
+
+    Args
+    -------
+    * years - (Y,) increasing years at which the median ages are given,
+    * values - (S,Y) median ages of S series, e.g. countries, linearly
+      interpolated between the `years`,
+    * birthYears - (B,) birth years.
+
+    Returns
+    -------
+    (S,B) numpy.ndarray with the crossover years. NaN where the age doesn't
+    reach the median age within `years`, or had already reached it at
+    `years[0]`, or where the median ages are missing.
+    """
+    years=numpy.asarray(years,dtype=float)
+    values=numpy.atleast_2d(numpy.asarray(values,dtype=float))
+    birthYears=numpy.atleast_1d(numpy.asarray(birthYears,dtype=float))
+    # Age minus the median age for every series, birth year and year, (S,B,Y).
+    gap=years[None,None,:]-birthYears[None,:,None]-values[:,None,:]
+    older=gap>=0
+    first=older.argmax(axis=2) # First year when older or 0 if never.
+    found=older.any(axis=2) & (first>0) # Crossover is inside the data.
+    i=numpy.where(found,first,1) # Valid interval end even if not found.
+    g0=numpy.take_along_axis(gap,(i-1)[...,None],axis=2)[...,0]
+    g1=numpy.take_along_axis(gap,i[...,None],axis=2)[...,0]
+    with numpy.errstate(invalid='ignore',divide='ignore'):
+        t=years[i-1]+(years[i]-years[i-1])*g0/(g0-g1) # Root in (t0,t1].
+    return numpy.where(found,t,numpy.nan)
+
+def joinHistory(history,forecast):
+    """ Prepend the historical data to a forecast for the same countries.
+
+    Args
+    -------
+    * history (:class:`wpp.CountryIndex`): historical data, e.g. 'ESTIMATES',
+    * forecast (:class:`wpp.CountryIndex`): forecast, e.g. 'MEDIUM VARIANT'.
+
+    Returns
+    -------
+    :class:`wpp.CountryIndex` with the countries of `forecast` and the years
+    of `history` before the first year of `forecast`, followed by its years.
+    Countries without the history have NaN there.
+    """
+    before=history.years<forecast.years[0]
+    past=numpy.full((forecast.codes.size,before.sum()),numpy.nan)
+    known=numpy.array([code in history.rows for code in forecast.codes.tolist()],
+                      dtype=bool)
+    past[known]=history.matrix(forecast.codes[known])[:,before]
+    return CountryIndex(forecast.codes,
+                        numpy.concatenate([history.years[before],forecast.years]),
+                        numpy.hstack([past,forecast.values]),
+                        dtype=forecast.values.dtype)
+
+def crossoverTable(fName,birthYears,variants=None,cacheFile=None,history=HISTORY):
+    """ Get the crossover years for all the countries in a median age workbook.
+
+    Every forecast variant is joined with the `history` sheet, so the crossover
+    can also be in the past.
+
+    Args
+    -------
+    * fName (str): UN median age workbook, e.g. WPP2015_POP_F05_MEDIAN_AGE.XLS,
+    * birthYears - (B,) birth years or a single one,
+    * variants (list of str): forecast sheets to use, e.g. 'MEDIUM VARIANT',
+      defaults to all the sheets other than `history`,
+    * cacheFile (str): where the data are cached, see :func:`wpp.loadWorkbook`,
+    * history (str): sheet with the historical data, None not to use it.
+
+    Returns
+    -------
+    :class:`pandas.DataFrame` with one 'crossover' column and a (variant,
+    country code, birth year) :class:`pandas.MultiIndex`, like the one from
+    :func:`wpp.loadVariants`. NaN where there's no crossover in the data.
+    """
+    workbook=loadWorkbook(fName,cacheFile)
+    if variants is None:
+        variants=[sheetName for sheetName in workbook if sheetName!=history]
+    birthYears=numpy.atleast_1d(numpy.asarray(birthYears,dtype=float))
+    past=None
+    if history is not None:
+        past=CountryIndex(workbook[history]['codes'],workbook[history]['years'],
+                          workbook[history]['values'],dtype=float)
+
+    frames=[]
+    for variant in variants:
+        sheet=CountryIndex(workbook[variant]['codes'],workbook[variant]['years'],
+                           workbook[variant]['values'],dtype=float)
+        if past is not None:
+            sheet=joinHistory(past,sheet)
+        t=crossoverYears(sheet.years,sheet.values,birthYears)
+        frames.append(pandas.DataFrame({
+            'variant':variant,
+            CODE_COLUMN:numpy.repeat(sheet.codes,birthYears.size),
+            'birth year':numpy.tile(birthYears,sheet.codes.size),
+            'crossover':t.reshape(-1)}))
+    if not frames:
+        return pandas.DataFrame({'crossover':[]},index=pandas.MultiIndex.from_arrays(
+                                [[],[],[]],names=['variant',CODE_COLUMN,'birth year']))
+    return pandas.concat(frames,ignore_index=True).set_index(
+                         ['variant',CODE_COLUMN,'birth year']).sort_index()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Country-indexed access to the sheets of the UN World Population Prospects.
+
+Selecting a country with a boolean mask, e.g. `df[df['Country code']==900]`,
+scans the whole sheet, so a sweep over all the countries scales with their
+number squared. :class:`CountryIndex` keeps a sheet as a dense
+(country x year) matrix and a dict from country codes to its rows instead,
+which makes every lookup an O(1) row slice.
+
+@author: Alek
+"""
+import numpy
+from .cache import loadWorkbook
+from .workbook import CODE_COLUMN
+
+_INDICES={} # Indices built so far, keyed by the workbook arrays they index.
+
+class CountryIndex(object):
+    """ Dense (country x year) matrix of one sheet with a country code index.
+
+    Attributes
+    -------
+    * codes - (C,) int64 country codes in the order of the rows,
+    * years - (Y,) float64 years of the columns,
+    * values - (C,Y) data,
+    * rows (dict): country codes as keys and row indices in `values` as values.
+    """
+    def __init__(self,codes,years,values,dtype=numpy.float32):
+        """
+        Args
+        -------
+        * codes - (C,) country codes of the rows of `values`,
+        * years - (Y,) years of the columns of `values`,
+        * values - (C,Y) data,
+        * dtype - data type of `values` to store.
+        """
+        self.codes=numpy.asarray(codes,dtype=numpy.int64)
+        self.years=numpy.asarray(years,dtype=numpy.float64)
+        self.values=numpy.ascontiguousarray(values,dtype=dtype)
+        self.rows={}
+        for row,code in enumerate(self.codes.tolist()):
+            self.rows.setdefault(code,row) # Keep the first one like the masks.
+
+    @classmethod
+    def fromDataFrame(cls,datFrm,dtype=numpy.float32):
+        """ Index a dataframe with the 'Country code' column followed by one
+        column per year, e.g. from :func:`wpp.loadSheet`. """
+        return cls(datFrm[CODE_COLUMN].to_numpy(),
+                   numpy.array(datFrm.columns[1:].tolist(),dtype=float),
+                   datFrm[datFrm.columns[1:]].to_numpy(dtype=float),dtype=dtype)
+
+    def series(self,countryCode):
+        """ Get the data of one country.
+
+        Returns
+        -------
+        2-tuple of numpy.ndarrays with a view of the data and the corresponding
+        years. Shapes are (Y,).
+
+        Raises
+        -------
+        KeyError if there's no country with code `countryCode`.
+        """
+        return self.values[self.rows[countryCode]],self.years
+
+    def matrix(self,countryCodes):
+        """ Get the (len(countryCodes),Y) data of many countries at once. """
+        return self.values[[self.rows[code] for code in countryCodes]]
+
+def indexSheet(fName,sheetName,cacheFile=None,dtype=numpy.float32):
+    """ Get a :class:`CountryIndex` of a sheet of a UN workbook.
+
+    The index is built once per process from the cache in :mod:`wpp.cache`,
+    and rebuilt only when the cache changes.
+
+    Args
+    -------
+    * fName (str): UN workbook accepted by :func:`pandas.read_excel`,
+    * sheetName (str): name of the sheet, e.g. 'ESTIMATES',
+    * cacheFile (str): where the data are cached, see :func:`wpp.loadWorkbook`,
+    * dtype - data type of the indexed values.
+    """
+    sheet=loadWorkbook(fName,cacheFile)[sheetName]
+    key=(id(sheet['values']),numpy.dtype(dtype).str)
+    if not key in _INDICES or _INDICES[key][0] is not sheet['values']:
+        _INDICES[key]=(sheet['values'],CountryIndex(sheet['codes'],sheet['years'],
+                                                    sheet['values'],dtype=dtype))
+    return _INDICES[key][1]
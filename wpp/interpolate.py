@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Interpolate many series that share their knots, e.g. all the countries in a
+sheet of a UN workbook, with one vectorised call instead of one
+:class:`scipy.interpolate.interp1d` per series.
+
+Two kinds of interpolation are supported:
+
+* `linear` - piecewise-linear, same as :class:`scipy.interpolate.interp1d`,
+* `monotone` - piecewise-cubic Hermite with the Fritsch-Carlson slopes, same as
+  :class:`scipy.interpolate.PchipInterpolator`. It's smooth, but doesn't
+  overshoot the data, so e.g. a median age that plateaus stays flat.
+
+@author: Alek
+"""
+import numpy
+
+KINDS=('linear','monotone')
+
+def monotoneSlopes(x,values):
+    """ Slopes at the knots of the monotone cubic interpolation of every series.
+
+    Args
+    -------
+    * x - (K,) increasing knots,
+    * values - (S,K) values of S series at the knots.
+
+    Returns
+    -------
+    (S,K) numpy.ndarray with the derivatives at the knots.
+    """
+    h=numpy.diff(x)
+    delta=numpy.diff(values,axis=1)/h
+    if x.size==2: # Straight line.
+        return numpy.hstack([delta,delta])
+
+    slopes=numpy.zeros_like(values)
+    # Weighted harmonic mean of the neighbouring secants, zero at extrema.
+    w1=2*h[1:]+h[:-1]
+    w2=h[1:]+2*h[:-1]
+    same=numpy.sign(delta[:,:-1])*numpy.sign(delta[:,1:])>0
+    with numpy.errstate(divide='ignore',invalid='ignore'):
+        mean=(w1+w2)/(w1/delta[:,:-1]+w2/delta[:,1:])
+    slopes[:,1:-1]=numpy.where(same,mean,0.)
+
+    # One-sided three-point estimates at the ends, kept shape-preserving.
+    for end,(h0,h1,d0,d1) in ((0,(h[0],h[1],delta[:,0],delta[:,1])),
+                              (-1,(h[-1],h[-2],delta[:,-1],delta[:,-2]))):
+        d=((2*h0+h1)*d0-h0*d1)/(h0+h1)
+        d=numpy.where(numpy.sign(d)!=numpy.sign(d0),0.,d)
+        d=numpy.where((numpy.sign(d0)!=numpy.sign(d1)) & (abs(d)>abs(3*d0)),3*d0,d)
+        slopes[:,end]=d
+    return slopes
+
+class BatchInterpolator(object):
+    """ Interpolate S series sharing K knots at any query points at once.
+
+    Attributes
+    -------
+    * x - (K,) knots, e.g. the years of a UN workbook,
+    * values - (S,K) values of the series at the knots,
+    * kind (str): one of :data:`KINDS`,
+    * slopes - (S,K) derivatives at the knots for the `monotone` kind, else None.
+    """
+    def __init__(self,x,values,kind='linear'):
+        """
+        Args
+        -------
+        * x - (K,) increasing knots, at least two,
+        * values - (S,K) values of S series at the knots or (K,) for one,
+        * kind (str): one of :data:`KINDS`.
+        """
+        if not kind in KINDS:
+            raise ValueError('Unknown kind {}, use one of {}'.format(
+                             kind,', '.join(KINDS)))
+        self.x=numpy.asarray(x,dtype=float)
+        self.values=numpy.atleast_2d(numpy.asarray(values,dtype=float))
+        if self.x.ndim!=1 or self.x.size<2 or self.values.shape[1]!=self.x.size:
+            raise ValueError('Need (K,) knots and (S,K) values with K>=2, got '
+                             '{} and {}'.format(self.x.shape,self.values.shape))
+        if numpy.any(numpy.diff(self.x)<=0):
+            raise ValueError('The knots must be strictly increasing.')
+        self.kind=kind
+        self.slopes=monotoneSlopes(self.x,self.values) if kind=='monotone' else None
+
+    def __call__(self,xNew):
+        """ Evaluate all the series at `xNew`.
+
+        Args
+        -------
+        * xNew - (Q,) query points.
+
+        Returns
+        -------
+        (S,Q) numpy.ndarray with the interpolated values, NaN outside the knots.
+        """
+        xNew=numpy.atleast_1d(numpy.asarray(xNew,dtype=float))
+        # Interval of every query point, the last one includes its right end.
+        i=numpy.clip(numpy.searchsorted(self.x,xNew,side='right')-1,0,self.x.size-2)
+        h=self.x[i+1]-self.x[i]
+        s=(xNew-self.x[i])/h
+        y0=self.values[:,i]
+        y1=self.values[:,i+1]
+        if self.kind=='linear':
+            y=y0+(y1-y0)*s
+        else: # Cubic Hermite basis.
+            s2=s*s
+            s3=s2*s
+            y=((2*s3-3*s2+1)*y0+(s3-2*s2+s)*h*self.slopes[:,i]+
+               (-2*s3+3*s2)*y1+(s3-s2)*h*self.slopes[:,i+1])
+        outside=(xNew<self.x[0]) | (xNew>self.x[-1])
+        y[:,outside]=numpy.nan
+        return y
+
+def interpolate(x,values,xNew,kind='linear'):
+    """ Interpolate S series sharing K knots at `xNew` in one call.
+
+    Args
+    -------
+    * x - (K,) increasing knots,
+    * values - (S,K) values of S series at the knots,
+    * xNew - (Q,) query points,
+    * kind (str): one of :data:`KINDS`.
+
+    Returns
+    -------
+    (S,Q) numpy.ndarray with the interpolated values, NaN outside the knots.
+    """
+    return BatchInterpolator(x,values,kind)(xNew)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Read the UN World Population Prospects Excel workbooks in one pass.
+
+Every call to :func:`pandas.read_excel` opens and decodes the whole legacy XLS,
+so all the requested sheets are read with one call and tidied up in one place.
+
+@author: Alek
+"""
+import pandas
+
+HEADER_ROWS=16 # Rows above the column names in the UN workbooks.
+NAME_COLUMN='Major area, region, country or area *'
+CODE_COLUMN='Country code'
+# Columns without the data. Could use usecols in read_excel to ignore them, but
+# then it'd be tricky not to risk unintentionally trimming the data by
+# selecting only some of the columns. So read everything and drop these.
+DROP_COLUMNS=['Index','Variant','Notes']
+
+def tidySheet(df):
+    """ Drop the columns without the data from a sheet of a UN workbook.
+
+    Args
+    -------
+    * df (:class:`pandas.DataFrame`): sheet read with :data:`HEADER_ROWS`.
+
+    Returns
+    -------
+    2-tuple with a :class:`pandas.DataFrame` with the 'Country code' column
+    followed by one float column per year, and a :class:`pandas.Series` with
+    the names of the countries and regions.
+    """
+    names=df[NAME_COLUMN]
+    df=df.drop(DROP_COLUMNS+[NAME_COLUMN],axis=1,errors='ignore')
+    years=df.columns.drop(CODE_COLUMN)
+    # Missing data become NaN.
+    values=df[years].apply(pandas.to_numeric,errors='coerce').astype(float)
+    values.columns=[float(year) for year in years]
+    values.insert(0,CODE_COLUMN,df[CODE_COLUMN].astype('int64'))
+    return values,names
+
+def readSheets(fName,sheetNames=None):
+    """ Read the sheets with country data from a UN workbook in one pass.
+
+    Sheets without the 'Country code' column, e.g. the notes, are skipped.
+
+    Args
+    -------
+    * fName: string or file-like object accepted by :func:`pandas.read_excel`,
+    * sheetNames (list of str): sheets to read, e.g. 'ESTIMATES' and
+      'MEDIUM VARIANT', defaults to all of them.
+
+    Returns
+    -------
+    Dict with sheet names as keys and 2-tuples returned by :func:`tidySheet`
+    as values.
+    """
+    # Not generic! But works for the UN World Outlook 2015 data.
+    sheets=pandas.read_excel(fName,sheet_name=sheetNames,header=0,
+                             skiprows=HEADER_ROWS)
+    return {sheetName:tidySheet(df) for sheetName,df in sheets.items()
+            if CODE_COLUMN in df.columns}
+
+def toLongFormat(sheets):
+    """ Stack sheets of a UN workbook into one tidy, long-format dataframe.
+
+    Args
+    -------
+    * sheets (dict): sheet names as keys and dataframes returned by
+      :func:`tidySheet` as values.
+
+    Returns
+    -------
+    :class:`pandas.DataFrame` with one 'value' column and a (variant, country
+    code, year) :class:`pandas.MultiIndex`, where variant is the sheet name.
+    """
+    frames=[]
+    for sheetName,df in sheets.items():
+        long=df.melt(id_vars=CODE_COLUMN,var_name='year',value_name='value')
+        long.insert(0,'variant',sheetName)
+        frames.append(long)
+    if not frames:
+        return pandas.DataFrame({'value':[]},index=pandas.MultiIndex.from_arrays(
+                                [[],[],[]],names=['variant',CODE_COLUMN,'year']))
+    return pandas.concat(frames,ignore_index=True).set_index(
+                         ['variant',CODE_COLUMN,'year']).sort_index()